@@ -1,36 +1,52 @@
-from flask import Flask
-from flask_sqlalchemy import SQLAlchemy
+from flask import Flask, Response
 from flask_bcrypt import Bcrypt
 from flask_jwt_extended import JWTManager
 from flask_cors import CORS
 from datetime import timedelta
 import os
 from dotenv import load_dotenv
-from database import init_db
+from database import db, init_db
+from utils import db_routing
 
 # Load environment variables
 load_dotenv()
 
+# Shared so models can import it before the app exists
+bcrypt = Bcrypt()
+
 def create_app():
     app = Flask(__name__)
     CORS(app)
 
     # Configure app
     app.config['SECRET_KEY'] = os.getenv('SECRET_KEY', 'your-secret-key-here')
-    app.config['SQLALCHEMY_DATABASE_URI'] = os.getenv('DATABASE_URL', 'postgresql://localhost/cleanwave')
+    # Primary plus optional read replicas (DATABASE_REPLICA_URLS), each with its own pool settings
+    db_routing.configure(app, os.getenv('DATABASE_URL', 'postgresql://localhost/cleanwave'))
     app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
     app.config['JWT_SECRET_KEY'] = os.getenv('JWT_SECRET_KEY', 'jwt-secret-key-here')
     app.config['JWT_ACCESS_TOKEN_EXPIRES'] = timedelta(hours=1)
     app.config['JWT_REFRESH_TOKEN_EXPIRES'] = timedelta(days=30)
 
     # Initialize extensions
-    db = SQLAlchemy(app)
-    bcrypt = Bcrypt(app)
+    bcrypt.init_app(app)
     jwt = JWTManager(app)
 
     # Initialize database
     init_db(app)
 
+    # Request, SQL and cache instrumentation served on /metrics. Registered
+    # first so the timing covers every other request hook.
+    from services.metrics_service import metrics_service
+    with app.app_context():
+        metrics_service.init_app(app, db.engines.values())
+    db_routing.init_app(app)
+
+    @app.route('/metrics')
+    def metrics():
+        if not metrics_service.scrape_allowed():
+            return {'error': 'Forbidden'}, 403
+        return Response(metrics_service.render(), mimetype='text/plain; version=0.0.4')
+
     # Import and register blueprints
     from routes.auth import auth_bp
     from routes.events import events_bp
@@ -42,6 +58,67 @@ def create_app():
     app.register_blueprint(users_bp, url_prefix='/api/users')
     app.register_blueprint(waste_logs_bp, url_prefix='/api/waste-logs')
 
+    # Maintenance commands
+    @app.cli.command('reconcile-participants')
+    def reconcile_participants():
+        """Repair drift in Event.participant_count"""
+        from services.participant_service import participant_service
+        fixed = participant_service.reconcile_counts()
+        print(f"Reconciled participant counts for {fixed} events")
+
+    @app.cli.command('geocode-worker')
+    def geocode_worker():
+        """Drain the geocoding job queue"""
+        from services.geocoding_worker import geocoding_worker
+        geocoding_worker.run_forever()
+
+    @app.cli.command('rebuild-geohashes')
+    def rebuild_geohashes():
+        """Backfill Event.geohash from stored coordinates"""
+        from services.geocoding_worker import geocoding_worker
+        updated = geocoding_worker.rebuild_geohashes()
+        print(f"Rebuilt geohashes for {updated} events")
+
+    @app.cli.command('rebuild-waste-rollups')
+    def rebuild_waste_rollups():
+        """Recompute event_waste_totals from waste_logs"""
+        from services.waste_rollup_service import waste_rollup_service
+        rows = waste_rollup_service.rebuild()
+        print(f"Rebuilt {rows} waste rollup rows")
+
+    @app.cli.command('rebuild-user-stats')
+    def rebuild_user_stats():
+        """Recompute user_stats and leaderboard_entries from source tables"""
+        from services.user_stats_service import user_stats_service
+        users = user_stats_service.rebuild()
+        print(f"Rebuilt stats for {users} users")
+
+    @app.cli.command('rebuild-tags')
+    def rebuild_tags():
+        """Decode legacy JSON-string columns and rebuild event_tags and tag_counts"""
+        from services.tag_service import tag_service
+        tagged = tag_service.rebuild()
+        print(f"Rebuilt tags for {tagged} events")
+
+    @app.cli.command('rebuild-search-index')
+    def rebuild_search_index():
+        """Re-index every active event for full-text search"""
+        from services.search_service import search_service
+        indexed = search_service.rebuild()
+        print(f"Indexed {indexed} events for search")
+
+    @app.cli.command('social-post-worker')
+    def social_post_worker():
+        """Generate queued social media posts with a pool of threads"""
+        from services.social_post_service import social_post_service
+        social_post_service.run_forever()
+
+    @app.cli.command('dump-schema')
+    def dump_schema():
+        """Print PostgreSQL DDL for the models (regenerates schema.sql)"""
+        from utils.schema import render_schema
+        print(render_schema(db.metadata), end='')
+
     # Error handlers
     @app.errorhandler(404)
     def not_found(error):
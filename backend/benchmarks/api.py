@@ -0,0 +1,389 @@
+"""
+Reproducible latency benchmark for the HTTP API.
+
+Builds the app with create_app against a scratch database, seeds it with a
+fixed random seed, replaces the geocoding and LLM services with deterministic
+fakes, then drives every endpoint through the Flask test client. Reports
+latency percentiles, throughput and SQL queries per request, and writes the
+results as JSON so two runs can be diffed with --compare.
+
+The target database is wiped and recreated: by default a SQLite file in the
+temp directory, or any DATABASE_URL given with --database-url.
+
+Usage: python -m benchmarks.api [--users 200] [--events 2000] [--registrations 5000]
+    [--waste-logs 20000] [--requests 200] [--cold] [--output results.json]
+    [--compare previous.json] [--database-url postgresql://localhost/cleanwave_bench]
+"""
+import argparse
+import hashlib
+import json
+import os
+import platform
+import random
+import subprocess
+import tempfile
+import time
+from contextlib import contextmanager
+from datetime import date, datetime, time as time_of_day, timedelta
+
+DEFAULT_OUTPUT_DIR = os.path.join(os.path.dirname(__file__), 'results')
+
+WASTE_TYPES = ['plastic', 'glass', 'metal', 'paper', 'organic', 'other']
+TAGS = ['beach', 'river', 'park', 'urban', 'forest', 'kids', 'recycling', 'weekend']
+CITIES = [
+    ('San Diego', 'CA', 32.72, -117.16), ('Austin', 'TX', 30.27, -97.74),
+    ('Seattle', 'WA', 47.61, -122.33), ('Miami', 'FL', 25.76, -80.19),
+    ('Chicago', 'IL', 41.88, -87.63), ('Portland', 'OR', 45.52, -122.68),
+]
+WORDS = ['cleanup', 'shore', 'trail', 'litter', 'community', 'volunteer', 'ocean',
+         'plastic', 'restoration', 'neighborhood', 'sweep', 'creek']
+
+@contextmanager
+def patched(target, **attributes):
+    """Temporarily replace attributes on a service singleton."""
+    originals = {name: getattr(target, name) for name in attributes}
+    for name, value in attributes.items():
+        setattr(target, name, value)
+    try:
+        yield
+    finally:
+        for name, value in originals.items():
+            setattr(target, name, value)
+
+def _digest(text):
+    return int(hashlib.sha256(text.encode('utf-8')).hexdigest()[:12], 16)
+
+def fake_coordinates(address):
+    """Stable pseudo-coordinates inside the continental US for an address."""
+    value = _digest(address)
+    return (25 + (value % 2400) / 100, -124 + ((value // 2400) % 5600) / 100)
+
+def fake_address_components(address):
+    return {'road': address.split(',')[0], 'country_code': 'us'}
+
+def fake_generate_text(prompt, system_prompt=None, *args, **kwargs):
+    return f"Generated response {_digest(prompt) % 10000}"
+
+def fake_stream_text(prompt, system_prompt=None, *args, **kwargs):
+    yield from fake_generate_text(prompt).split(' ')
+
+def percentile(sorted_values, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return None
+    index = max(0, min(len(sorted_values) - 1, int(round(fraction * len(sorted_values))) - 1))
+    return sorted_values[index]
+
+def seed(db, rng, users, events, registrations, waste_logs):
+    """Insert the requested volumes and rebuild every derived table. Returns ids used by scenarios."""
+    from sqlalchemy import insert
+    from models.event import Event, EventRegistration, event_participants
+    from models.user import User
+    from models.waste_log import WasteLog
+    from services.password_service import password_service
+    from services.participant_service import participant_service
+    from services.search_service import search_service
+    from services.tag_service import tag_service
+    from services.user_stats_service import user_stats_service
+    from services.waste_rollup_service import waste_rollup_service
+
+    # Hash once: seeding thousands of users should not be dominated by bcrypt
+    password_hash = password_service.hash_password('benchmark-password')
+    with patched(password_service, hash_password=lambda password: password_hash):
+        organizers = [
+            User(full_name=f'Organizer {i}', email=f'organizer{i}@bench.test',
+                 password='benchmark-password', user_type='organizer')
+            for i in range(max(1, users // 10))
+        ]
+        volunteers = [
+            User(full_name=f'Volunteer {i}', email=f'volunteer{i}@bench.test',
+                 password='benchmark-password', user_type='volunteer')
+            for i in range(users)
+        ]
+    db.session.add_all(organizers + volunteers)
+    db.session.flush()
+
+    start_date = date(2025, 1, 1)
+    event_rows = []
+    for i in range(events):
+        city, state, lat, lon = rng.choice(CITIES)
+        event = Event(
+            title=' '.join(rng.sample(WORDS, 3)).title(),
+            description=' '.join(rng.choices(WORDS, k=30)),
+            location=f'{rng.randint(1, 9999)} {rng.choice(WORDS).title()} St',
+            date=start_date + timedelta(days=rng.randint(0, 365)),
+            time_start=time_of_day(9), time_end=time_of_day(12),
+            city=city, state=state,
+            organizer_id=rng.choice(organizers).id,
+            what_to_bring=['gloves', 'water'], safety_protocols=['sunscreen'],
+            tags=rng.sample(TAGS, rng.randint(1, 3)),
+            max_participants=rng.randint(20, 200), is_active=True,
+            latitude=lat + rng.uniform(-0.3, 0.3), longitude=lon + rng.uniform(-0.3, 0.3)
+        )
+        event_rows.append(event)
+    db.session.add_all(event_rows)
+    db.session.flush()
+
+    pairs = set()
+    while len(pairs) < min(registrations, events * len(volunteers)):
+        pairs.add((rng.choice(event_rows).id, rng.choice(volunteers).id))
+    pairs = sorted(pairs)
+    if pairs:
+        db.session.add_all([EventRegistration(event_id, user_id) for event_id, user_id in pairs])
+        db.session.execute(
+            insert(event_participants),
+            [{'event_id': event_id, 'user_id': user_id} for event_id, user_id in pairs]
+        )
+
+    for _ in range(waste_logs):
+        event_id, user_id = rng.choice(pairs) if pairs else (event_rows[0].id, volunteers[0].id)
+        db.session.add(WasteLog(
+            event_id=event_id, user_id=user_id, waste_type=rng.choice(WASTE_TYPES),
+            quantity=round(rng.uniform(0.1, 25), 2), unit='kg'
+        ))
+    db.session.commit()
+
+    participant_service.reconcile_counts()
+    waste_rollup_service.rebuild()
+    user_stats_service.rebuild()
+    tag_service.rebuild()
+    search_service.rebuild()
+    db.session.commit()
+
+    return {
+        'organizer': organizers[0],
+        'volunteer': volunteers[0],
+        'event_ids': [event.id for event in event_rows],
+        'organizer_event_ids': [event.id for event in event_rows if event.organizer_id == organizers[0].id],
+    }
+
+def scenarios(context):
+    """
+    (name, method, path, auth, body) factories. Each takes the seeded rng so
+    the request sequence is identical across runs.
+    """
+    event_ids = context['event_ids']
+    own_event_ids = context['organizer_event_ids'] or event_ids
+
+    def random_point(rng):
+        _, _, lat, lon = rng.choice(CITIES)
+        return lat, lon
+
+    def nearby(rng):
+        lat, lon = random_point(rng)
+        return f'/api/events/nearby?lat={lat}&lon={lon}&radius_km=25'
+
+    def map_tiles(rng):
+        lat, lon = random_point(rng)
+        return f'/api/events/map-data?bbox={lon - 1},{lat - 1},{lon + 1},{lat + 1}&zoom=9'
+
+    return [
+        ('events_list', 'GET', lambda rng: '/api/events?limit=50', None, None),
+        ('events_list_fields', 'GET', lambda rng: '/api/events?limit=50&fields=title,city,volunteer_count', None, None),
+        ('events_by_tag', 'GET', lambda rng: f'/api/events?tags={rng.choice(TAGS)}', None, None),
+        ('event_detail', 'GET', lambda rng: f'/api/events/{rng.choice(event_ids)}', None, None),
+        ('events_map_data', 'GET', lambda rng: '/api/events/map-data', None, None),
+        ('events_map_tiles', 'GET', map_tiles, None, None),
+        ('events_nearby', 'GET', nearby, None, None),
+        ('events_search', 'GET', lambda rng: f'/api/events/search?q={rng.choice(WORDS)[:4]}', None, None),
+        ('events_tag_facets', 'GET', lambda rng: '/api/events/tags', None, None),
+        ('user_events', 'GET', lambda rng: '/api/users/events', 'volunteer', None),
+        ('user_stats', 'GET', lambda rng: '/api/users/stats', 'volunteer', None),
+        ('leaderboard', 'GET', lambda rng: '/api/users/leaderboard', 'volunteer', None),
+        ('waste_analytics', 'GET', lambda rng: f'/api/waste-logs/event/{rng.choice(own_event_ids)}/analytics', 'organizer', None),
+        ('waste_export', 'GET', lambda rng: '/api/waste-logs/export?format=ndjson', 'organizer', None),
+        ('ask_ecobot', 'POST', lambda rng: f'/api/{rng.choice(event_ids)}/ask-ecobot', 'volunteer',
+         lambda rng: {'question': 'What should I bring?'}),
+        ('login', 'POST', lambda rng: '/api/auth/login', None,
+         lambda rng: {'email': 'volunteer0@bench.test', 'password': 'benchmark-password'}),
+    ]
+
+class QueryCounter:
+    """Counts statements executed on an engine."""
+
+    def __init__(self, engine):
+        from sqlalchemy import event
+        self.count = 0
+        event.listen(engine, 'before_cursor_execute', self._on_execute)
+
+    def _on_execute(self, *args, **kwargs):
+        self.count += 1
+
+class ScenarioFailed(Exception):
+    """A benchmark request returned a non-2xx status."""
+
+def run_scenario(client, counter, cold_cache, scenario, headers, rng, requests):
+    from services.response_cache_service import response_cache_service
+
+    name, method, path_fn, auth, body_fn = scenario
+    latencies = []
+    statuses = {}
+    queries = 0
+    started = time.perf_counter()
+    for _ in range(requests):
+        path = path_fn(rng)
+        body = body_fn(rng) if body_fn else None
+        if cold_cache:
+            response_cache_service.local.clear()
+        before = counter.count
+        start = time.perf_counter()
+        response = client.open(path, method=method, json=body, headers=headers.get(auth, {}))
+        response.get_data()  # Drain streamed bodies inside the timing
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if not 200 <= response.status_code < 300:
+            # A fast 404 or 500 would pass for a fast endpoint
+            raise ScenarioFailed(
+                f"{name}: {method} {path} returned {response.status_code}: "
+                f"{response.get_data(as_text=True)[:200]}"
+            )
+        latencies.append(elapsed_ms)
+        queries += counter.count - before
+        statuses[str(response.status_code)] = statuses.get(str(response.status_code), 0) + 1
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    return {
+        'method': method,
+        'requests': requests,
+        'status_codes': statuses,
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p90_ms': round(percentile(latencies, 0.90), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(sum(latencies) / len(latencies), 3),
+        'max_ms': round(latencies[-1], 3),
+        'throughput_rps': round(requests / elapsed, 1),
+        'queries_per_request': round(queries / requests, 2),
+    }
+
+def _git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(previous, current):
+    """Print per-endpoint p50/p99/query deltas between two result files."""
+    print(f"\n{'endpoint':<22}{'p50 ms':>18}{'p99 ms':>18}{'queries':>14}")
+    for name, result in current['endpoints'].items():
+        old = previous['endpoints'].get(name)
+        if old is None:
+            print(f"{name:<22}{'(new)':>18}")
+            continue
+
+        def delta(key):
+            before, after = old[key], result[key]
+            change = f"{(after - before) / before * 100:+.0f}%" if before else ''
+            return f"{after:.2f} {change}"
+
+        print(f"{name:<22}{delta('p50_ms'):>18}{delta('p99_ms'):>18}{delta('queries_per_request'):>14}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--database-url', default=None)
+    parser.add_argument('--users', type=int, default=200)
+    parser.add_argument('--events', type=int, default=2000)
+    parser.add_argument('--registrations', type=int, default=5000)
+    parser.add_argument('--waste-logs', type=int, default=20000)
+    parser.add_argument('--requests', type=int, default=200, help='Measured requests per endpoint')
+    parser.add_argument('--warmup', type=int, default=10, help='Unmeasured requests per endpoint')
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--cold', action='store_true', help='Clear the in-process response cache before every request')
+    parser.add_argument('--only', help='Comma separated endpoint names to run')
+    parser.add_argument('--output', help='Result file (default: benchmarks/results/api-<timestamp>.json)')
+    parser.add_argument('--compare', help='Earlier result file to diff against')
+    args = parser.parse_args()
+
+    database_url = args.database_url or 'sqlite:///' + os.path.join(tempfile.gettempdir(), 'cleanwave_bench.sqlite3')
+    os.environ['DATABASE_URL'] = database_url
+
+    from flask_jwt_extended import create_access_token
+    from app import create_app, db
+    from services.geocoding_service import geocoding_service
+    from services.llm_service import llm_service
+    from services.user_cache_service import user_cache_service
+    from utils import serialization
+
+    app = create_app()
+    rng = random.Random(args.seed)
+
+    with patched(geocoding_service, get_coordinates=fake_coordinates,
+                 get_address_components=fake_address_components), \
+            patched(llm_service, generate_text=fake_generate_text, stream_text=fake_stream_text):
+        # Seed inside an app context, then pop it: requests issued while a
+        # context is pushed would share g and the session between them.
+        with app.app_context():
+            db.drop_all()
+            db.create_all()
+
+            print(f"Seeding {args.users} users, {args.events} events, {args.registrations} registrations, "
+                  f"{args.waste_logs} waste logs into {db.engine.dialect.name}...")
+            seed_started = time.perf_counter()
+            context = seed(db, rng, args.users, args.events, args.registrations, args.waste_logs)
+            seed_seconds = time.perf_counter() - seed_started
+
+            headers = {
+                user_type: {'Authorization': 'Bearer ' + create_access_token(
+                    identity=str(context[user_type].id),
+                    additional_claims=user_cache_service.token_claims(user_type)
+                )}
+                for user_type in ('organizer', 'volunteer')
+            }
+            counter = QueryCounter(db.engine)
+            dialect = db.engine.dialect.name
+
+        selected = set(args.only.split(',')) if args.only else None
+        client = app.test_client()
+        results = {}
+        for scenario in scenarios(context):
+            if selected and scenario[0] not in selected:
+                continue
+            # Every endpoint gets its own rng so adding one does not shift the others
+            scenario_rng = random.Random(f'{args.seed}:{scenario[0]}')
+            run_scenario(client, counter, args.cold, scenario, headers, scenario_rng, args.warmup)
+            results[scenario[0]] = run_scenario(client, counter, args.cold, scenario, headers, scenario_rng, args.requests)
+            result = results[scenario[0]]
+            print(f"{scenario[0]:<22} p50 {result['p50_ms']:>8.2f} ms  p99 {result['p99_ms']:>8.2f} ms  "
+                  f"{result['throughput_rps']:>8.1f} req/s  {result['queries_per_request']:>6.2f} queries  "
+                  f"{result['status_codes']}")
+
+        if 'events_list' in results and results['events_list']['queries_per_request'] < 1:
+            # The listing resolves the events version on every request; zero
+            # queries means requests are sharing a memoized g
+            raise ScenarioFailed('events_list: versioned GET ran no version query')
+
+    report = {
+        'meta': {
+            'timestamp': datetime.utcnow().isoformat(),
+            'git_commit': _git_commit(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'database': dialect,
+            'json_backend': 'orjson' if serialization.orjson is not None else 'json',
+            'seed': args.seed,
+            'cold_cache': args.cold,
+            'seed_seconds': round(seed_seconds, 2),
+            'volumes': {
+                'users': args.users, 'events': args.events,
+                'registrations': args.registrations, 'waste_logs': args.waste_logs,
+            },
+            'requests_per_endpoint': args.requests,
+        },
+        'endpoints': results,
+    }
+
+    output = args.output or os.path.join(
+        DEFAULT_OUTPUT_DIR, f"api-{datetime.utcnow().strftime('%Y%m%dT%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2, sort_keys=True)
+    print(f"\nWrote {output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            compare(json.load(f), report)
+
+if __name__ == '__main__':
+    main()
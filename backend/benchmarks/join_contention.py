@@ -0,0 +1,90 @@
+"""
+Load test for atomic capacity reservation: fire hundreds of concurrent joins
+at one event and check that nothing is overbooked and overflow is waitlisted.
+
+Needs a database with real row locking (PostgreSQL); SQLite serializes writers.
+The users and event are created in DATABASE_URL and left there.
+
+Usage: DATABASE_URL=postgresql://localhost/cleanwave_loadtest \
+    python -m benchmarks.join_contention [--users 500] [--capacity 100] [--threads 64]
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, time as time_of_day
+from sqlalchemy import select, func
+from app import create_app, db
+from models.event import Event, event_participants
+from models.user import User
+from models.waitlist import EventWaitlistEntry
+from services.participant_service import participant_service
+from services.password_service import password_service
+from benchmarks.api import patched
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--users', type=int, default=500)
+    parser.add_argument('--capacity', type=int, default=100)
+    parser.add_argument('--threads', type=int, default=64)
+    args = parser.parse_args()
+
+    app = create_app()
+    with app.app_context():
+        db.create_all()
+        # Hash once: the test is about joins, not bcrypt
+        password_hash = password_service.hash_password('load-test')
+        with patched(password_service, hash_password=lambda password: password_hash):
+            organizer = User(full_name='Load Test', email=f'organizer-{time.time()}@example.com',
+                             password='load-test', user_type='organizer')
+            volunteers = [
+                User(full_name=f'Volunteer {i}', email=f'volunteer-{i}-{time.time()}@example.com',
+                     password='load-test', user_type='volunteer')
+                for i in range(args.users)
+            ]
+        db.session.add(organizer)
+        db.session.flush()
+        event = Event(
+            title='Join contention', description='Load test', location='Beach',
+            date=date.today(), time_start=time_of_day(9), time_end=time_of_day(12),
+            city='Testville', state='TS', organizer_id=organizer.id,
+            what_to_bring=[], safety_protocols=[], tags=[],
+            max_participants=args.capacity, is_active=True
+        )
+        db.session.add(event)
+        db.session.add_all(volunteers)
+        db.session.commit()
+        event_id = event.id
+        user_ids = [user.id for user in volunteers]
+
+    def join(user_id):
+        with app.app_context():
+            status, _ = participant_service.join(event_id, user_id)
+            db.session.commit()
+            return status
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.threads) as pool:
+        statuses = list(pool.map(join, user_ids))
+    elapsed = time.perf_counter() - start
+
+    with app.app_context():
+        counter = db.session.execute(
+            select(Event.participant_count).where(Event.id == event_id)
+        ).scalar()
+        rows = db.session.execute(
+            select(func.count()).select_from(event_participants)
+            .where(event_participants.c.event_id == event_id)
+        ).scalar()
+        waitlisted = EventWaitlistEntry.query.filter_by(event_id=event_id).count()
+
+    expected_joined = min(args.capacity, args.users)
+    print(f"{args.users} joins in {elapsed:.2f}s ({args.users / elapsed:.0f}/s) with {args.threads} threads")
+    print(f"joined: {statuses.count('joined')}, waitlisted: {statuses.count('waitlisted')}")
+    print(f"participant_count: {counter}, participant rows: {rows}, waitlist rows: {waitlisted}")
+
+    assert counter == rows == expected_joined, 'participant count does not match capacity'
+    assert waitlisted == args.users - expected_joined, 'overflow was not waitlisted'
+    print('OK: no overbooking')
+
+if __name__ == '__main__':
+    main()
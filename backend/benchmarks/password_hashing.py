@@ -0,0 +1,45 @@
+"""
+Compare login (bcrypt verify) throughput with hashing on the request thread
+versus the PasswordService process pool.
+
+Usage: python -m benchmarks.password_hashing [--requests 200] [--threads 16]
+"""
+import argparse
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+import bcrypt
+from services.password_service import password_service
+
+def run(verify, password_hash, requests, threads):
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        results = list(pool.map(lambda _: verify('correct horse', password_hash), range(requests)))
+    elapsed = time.perf_counter() - start
+    assert all(results)
+    return requests / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--requests', type=int, default=200)
+    parser.add_argument('--threads', type=int, default=16)
+    args = parser.parse_args()
+
+    cores = os.cpu_count() or 1
+    password_hash = bcrypt.hashpw(b'correct horse', bcrypt.gensalt(password_service.rounds)).decode('utf-8')
+
+    def inline(password, hashed):
+        return bcrypt.checkpw(password.encode('utf-8'), hashed.encode('utf-8'))
+
+    # Warm the pool so process start-up is not measured
+    password_service.check_password('correct horse', password_hash)
+
+    before = run(inline, password_hash, args.requests, args.threads)
+    after = run(password_service.check_password, password_hash, args.requests, args.threads)
+
+    print(f"cost factor: {password_service.rounds}, cores: {cores}, pool size: {password_service.pool_size}")
+    print(f"request thread: {before:.1f} logins/s ({before / cores:.1f} per core)")
+    print(f"process pool:   {after:.1f} logins/s ({after / cores:.1f} per core)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,10 @@
+from flask_sqlalchemy import SQLAlchemy
+from utils import db_routing
+
+# Created unbound so models can import it before the app exists
+db = SQLAlchemy(session_options={'class_': db_routing.RoutingSession})
+Base = db.Model
+
+def init_db(app):
+    """Bind the shared SQLAlchemy instance to app."""
+    db.init_app(app)
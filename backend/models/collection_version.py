@@ -0,0 +1,21 @@
+from app import db
+from datetime import datetime
+
+class CollectionVersion(db.Model):
+    """Monotonic version stamp per collection, bumped in the same transaction as writes"""
+    __tablename__ = 'collection_versions'
+
+    name = db.Column(db.String(50), primary_key=True)
+    version = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, name, version=0):
+        self.name = name
+        self.version = version
+
+    def to_dict(self):
+        return {
+            'name': self.name,
+            'version': self.version,
+            'updated_at': self.updated_at.isoformat()
+        }
@@ -1,18 +1,26 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Table, Float, Date, Time, JSON, Boolean
+from sqlalchemy import Column, Integer, String, DateTime, Text, ForeignKey, Table, Float, Date, Time, JSON, Boolean, Index
 from sqlalchemy.orm import relationship
 from database import Base
+from utils.geo import geohash_encode
+from utils.serialization import serializers
 
 # Association table for event participants
 event_participants = Table(
     'event_participants',
     Base.metadata,
-    Column('event_id', Integer, ForeignKey('events.id')),
-    Column('user_id', Integer, ForeignKey('users.id'))
+    Column('event_id', Integer, ForeignKey('events.id'), primary_key=True),
+    Column('user_id', Integer, ForeignKey('users.id'), primary_key=True)
 )
 
 class Event(Base):
     __tablename__ = 'events'
+    __table_args__ = (
+        # Keyset pagination walks active events in (date, id) order
+        Index('ix_events_active_date_id', 'is_active', 'date', 'id'),
+        Index('ix_events_city_state', 'city', 'state'),
+        Index('ix_events_lat_lon', 'latitude', 'longitude'),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String(255), nullable=False)
@@ -20,6 +28,7 @@ class Event(Base):
     location = Column(String(255), nullable=False)
     latitude = Column(Float, nullable=True)  # Added for map support
     longitude = Column(Float, nullable=True)  # Added for map support
+    geohash = Column(String(12), nullable=True, index=True)  # Spatial prefix index for radius queries
     date = Column(Date, nullable=False)
     time_start = Column(Time, nullable=False)
     time_end = Column(Time, nullable=False)
@@ -39,14 +48,15 @@ class Event(Base):
     safety_protocols = Column(JSON, nullable=False)
     tags = Column(JSON, nullable=True)
     max_participants = Column(Integer, default=100)
+    # Denormalized count of event_participants rows, maintained by ParticipantService
+    participant_count = Column(Integer, nullable=False, default=0, server_default='0')
     is_active = Column(Boolean, default=True)
 
     def __init__(self, title, description, location, date, time_start, time_end, city, state, organizer_id, what_to_bring, safety_protocols, tags, max_participants, is_active, latitude=None, longitude=None):
         self.title = title
         self.description = description
         self.location = location
-        self.latitude = latitude
-        self.longitude = longitude
+        self.set_coordinates(latitude, longitude)
         self.date = date
         self.time_start = time_start
         self.time_end = time_end
@@ -57,31 +67,31 @@ class Event(Base):
         self.safety_protocols = safety_protocols
         self.tags = tags
         self.max_participants = max_participants
+        self.participant_count = 0
         self.is_active = is_active
 
+    def set_coordinates(self, latitude, longitude):
+        """Set latitude/longitude and keep the geohash in sync"""
+        self.latitude = latitude
+        self.longitude = longitude
+        self.geohash = Event.compute_geohash(latitude, longitude)
+
+    @staticmethod
+    def compute_geohash(latitude, longitude):
+        if latitude is None or longitude is None:
+            return None
+        return geohash_encode(latitude, longitude)
+
     def to_dict(self):
-        return {
-            'id': self.id,
-            'title': self.title,
-            'description': self.description,
-            'location': self.location,
-            'latitude': self.latitude,
-            'longitude': self.longitude,
-            'date': self.date.isoformat(),
-            'time_start': self.time_start.isoformat(),
-            'time_end': self.time_end.isoformat(),
-            'city': self.city,
-            'state': self.state,
-            'organizer_id': self.organizer_id,
-            'what_to_bring': self.what_to_bring,
-            'safety_protocols': self.safety_protocols,
-            'tags': self.tags,
-            'max_participants': self.max_participants,
-            'is_active': self.is_active,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'volunteer_count': len(self.participants)
-        }
+        return serializers.encoder(Event)(self)
+
+serializers.register(Event, [
+    'id', 'title', 'description', 'location', 'latitude', 'longitude',
+    'date', 'time_start', 'time_end', 'city', 'state', 'organizer_id',
+    'what_to_bring', 'safety_protocols', 'tags', 'max_participants',
+    'is_active', 'created_at', 'updated_at',
+    ('volunteer_count', 'participant_count'),
+])
 
 class EventRegistration(Base):
     __tablename__ = 'event_registrations'
@@ -99,11 +109,8 @@ class EventRegistration(Base):
         self.status = status
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'event_id': self.event_id,
-            'user_id': self.user_id,
-            'status': self.status,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat()
-        } 
\ No newline at end of file
+        return serializers.encoder(EventRegistration)(self)
+
+serializers.register(EventRegistration, [
+    'id', 'event_id', 'user_id', 'status', 'created_at', 'updated_at',
+]) 
\ No newline at end of file
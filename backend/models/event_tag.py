@@ -0,0 +1,38 @@
+from app import db
+
+class EventTag(db.Model):
+    """
+    One row per (event, tag). The (tag, event_id) index serves tag filters
+    without reading the events table.
+    """
+    __tablename__ = 'event_tags'
+    __table_args__ = (
+        db.Index('ix_event_tags_tag_event', 'tag', 'event_id'),
+    )
+
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), primary_key=True)
+    tag = db.Column(db.String(50), primary_key=True)
+
+    def __init__(self, event_id, tag):
+        self.event_id = event_id
+        self.tag = tag
+
+class TagCount(db.Model):
+    """Number of active events carrying each tag, maintained on event writes"""
+    __tablename__ = 'tag_counts'
+    __table_args__ = (
+        db.Index('ix_tag_counts_event_count', 'event_count'),
+    )
+
+    tag = db.Column(db.String(50), primary_key=True)
+    event_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, tag, event_count=0):
+        self.tag = tag
+        self.event_count = event_count
+
+    def to_dict(self):
+        return {
+            'tag': self.tag,
+            'count': self.event_count
+        }
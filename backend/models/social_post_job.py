@@ -0,0 +1,39 @@
+from app import db
+from datetime import datetime
+import uuid
+
+class SocialPostJob(db.Model):
+    __tablename__ = 'social_post_jobs'
+
+    id = db.Column(db.UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False, index=True)
+    status = db.Column(db.String(20), nullable=False, default='pending', index=True)
+    # Fingerprint of the event data the post was generated from
+    input_hash = db.Column(db.String(64))
+    post = db.Column(db.Text)
+    error = db.Column(db.Text)
+    # When a worker claimed the job; running jobs past their lease are requeued
+    locked_at = db.Column(db.DateTime(timezone=True))
+    # Workers skip the job until then: debounced pre-generation and overload backoff
+    run_after = db.Column(db.DateTime(timezone=True))
+    # Times the provider was overloaded; each one doubles the backoff
+    attempts = db.Column(db.Integer, nullable=False, default=0)
+    created_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow)
+    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, event_id, status='pending'):
+        self.id = uuid.uuid4()
+        self.event_id = event_id
+        self.status = status
+        self.attempts = 0
+
+    def to_dict(self):
+        return {
+            'id': str(self.id),
+            'event_id': str(self.event_id),
+            'status': self.status,
+            'post': self.post,
+            'error': self.error,
+            'created_at': self.created_at.isoformat(),
+            'updated_at': self.updated_at.isoformat()
+        }
@@ -1,8 +1,10 @@
-from app import db, bcrypt
+from app import db
+from services.password_service import password_service
 from datetime import datetime
 import uuid
 from sqlalchemy import Column, Integer, String, DateTime, Boolean
 from sqlalchemy.orm import relationship
+from utils.serialization import serializers
 
 class User(db.Model):
     __tablename__ = 'users'
@@ -10,8 +12,8 @@ class User(db.Model):
     id = Column(Integer, primary_key=True, index=True)
     email = Column(String(255), unique=True, nullable=False)
     password_hash = Column(String(255), nullable=False)
-    first_name = Column(String(100), nullable=False)
-    last_name = Column(String(100), nullable=False)
+    full_name = Column(String(50), nullable=False)
+    user_type = Column(String(20), nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow)
     is_active = Column(Boolean, default=True)
@@ -24,20 +26,22 @@ class User(db.Model):
     def __init__(self, full_name, email, password, user_type):
         self.full_name = full_name
         self.email = email
-        self.password_hash = bcrypt.generate_password_hash(password).decode('utf-8')
+        self.password_hash = password_service.hash_password(password)
         self.user_type = user_type
 
     def check_password(self, password):
-        return bcrypt.check_password_hash(self.password_hash, password)
+        return password_service.check_password(password, self.password_hash)
+
+    def set_password(self, password):
+        self.password_hash = password_service.hash_password(password)
+
+    def password_needs_rehash(self):
+        return password_service.needs_rehash(self.password_hash)
 
     def to_dict(self):
-        return {
-            'id': self.id,
-            'email': self.email,
-            'first_name': self.first_name,
-            'last_name': self.last_name,
-            'created_at': self.created_at.isoformat(),
-            'updated_at': self.updated_at.isoformat(),
-            'is_active': self.is_active,
-            'is_verified': self.is_verified
-        } 
\ No newline at end of file
+        return serializers.encoder(User)(self)
+
+serializers.register(User, [
+    'id', 'email', 'full_name', 'user_type', 'created_at', 'updated_at',
+    'is_active', 'is_verified',
+])
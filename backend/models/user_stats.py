@@ -0,0 +1,63 @@
+from app import db
+from datetime import datetime
+
+class UserStats(db.Model):
+    """Per-user aggregate counters maintained on writes"""
+    __tablename__ = 'user_stats'
+
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    events_attended = db.Column(db.Integer, nullable=False, default=0)
+    events_created = db.Column(db.Integer, nullable=False, default=0)
+    volunteers_hosted = db.Column(db.Integer, nullable=False, default=0)
+    waste_log_count = db.Column(db.Integer, nullable=False, default=0)
+    total_waste = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, user_id):
+        self.user_id = user_id
+        self.events_attended = 0
+        self.events_created = 0
+        self.volunteers_hosted = 0
+        self.waste_log_count = 0
+        self.total_waste = 0
+
+    def to_dict(self):
+        return {
+            'user_id': str(self.user_id),
+            'events_attended': self.events_attended,
+            'events_created': self.events_created,
+            'volunteers_hosted': self.volunteers_hosted,
+            'waste_log_count': self.waste_log_count,
+            'total_waste': float(self.total_waste)
+        }
+
+class LeaderboardEntry(db.Model):
+    """
+    Waste collected per user within a scope: 'global', a city or an event.
+    The (scope, scope_key, total_waste) index serves leaderboards as a
+    backward range scan, so the top N never sorts the whole scope.
+    """
+    __tablename__ = 'leaderboard_entries'
+    __table_args__ = (
+        db.Index('ix_leaderboard_entries_rank', 'scope', 'scope_key', 'total_waste'),
+    )
+
+    scope = db.Column(db.String(10), primary_key=True)
+    scope_key = db.Column(db.String(100), primary_key=True)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), primary_key=True)
+    total_waste = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+
+    def __init__(self, scope, scope_key, user_id, total_waste=0, log_count=0):
+        self.scope = scope
+        self.scope_key = scope_key
+        self.user_id = user_id
+        self.total_waste = total_waste
+        self.log_count = log_count
+
+    def to_dict(self):
+        return {
+            'user_id': str(self.user_id),
+            'total_waste': float(self.total_waste),
+            'log_count': self.log_count
+        }
@@ -0,0 +1,27 @@
+from app import db
+from datetime import datetime
+
+class EventWaitlistEntry(db.Model):
+    """FIFO waitlist for full events; the lowest id is promoted first"""
+    __tablename__ = 'event_waitlist'
+    __table_args__ = (
+        db.UniqueConstraint('event_id', 'user_id', name='uq_event_waitlist_event_user'),
+        db.Index('ix_event_waitlist_event_order', 'event_id', 'id'),
+    )
+
+    id = db.Column(db.Integer, primary_key=True)
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), nullable=False)
+    user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __init__(self, event_id, user_id):
+        self.event_id = event_id
+        self.user_id = user_id
+
+    def to_dict(self):
+        return {
+            'id': self.id,
+            'event_id': self.event_id,
+            'user_id': self.user_id,
+            'created_at': self.created_at.isoformat()
+        }
@@ -0,0 +1,27 @@
+from app import db
+from datetime import datetime
+
+class EventWasteTotal(db.Model):
+    """Per-event, per-waste-type totals maintained alongside waste_logs writes"""
+    __tablename__ = 'event_waste_totals'
+
+    event_id = db.Column(db.Integer, db.ForeignKey('events.id'), primary_key=True)
+    waste_type = db.Column(db.String(50), primary_key=True)
+    total_quantity = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    log_count = db.Column(db.Integer, nullable=False, default=0)
+    updated_at = db.Column(db.DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow)
+
+    def __init__(self, event_id, waste_type, total_quantity=0, log_count=0):
+        self.event_id = event_id
+        self.waste_type = waste_type
+        self.total_quantity = total_quantity
+        self.log_count = log_count
+
+    def to_dict(self):
+        return {
+            'event_id': str(self.event_id),
+            'waste_type': self.waste_type,
+            'total_quantity': float(self.total_quantity),
+            'log_count': self.log_count,
+            'updated_at': self.updated_at.isoformat()
+        }
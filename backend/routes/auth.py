@@ -2,6 +2,9 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import create_access_token, create_refresh_token, jwt_required, get_jwt_identity
 from models.user import User
 from app import db
+from services.password_service import PasswordServiceBusy
+from services.user_cache_service import user_cache_service
+from utils.db_routing import mark_sticky
 import uuid
 
 auth_bp = Blueprint('auth', __name__)
@@ -29,9 +32,14 @@ def signup():
         )
         db.session.add(user)
         db.session.commit()
+        # The new user's first reads must see the row just written
+        mark_sticky(user.id)
         
         # Generate tokens
-        access_token = create_access_token(identity=str(user.id))
+        access_token = create_access_token(
+            identity=str(user.id),
+            additional_claims=user_cache_service.token_claims(user.user_type)
+        )
         refresh_token = create_refresh_token(identity=str(user.id))
         
         return jsonify({
@@ -41,6 +49,9 @@ def signup():
             'refresh_token': refresh_token
         }), 201
         
+    except PasswordServiceBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -55,11 +66,29 @@ def login():
     
     # Find user
     user = User.query.filter_by(email=data['email']).first()
-    if not user or not user.check_password(data['password']):
-        return jsonify({'error': 'Invalid email or password'}), 401
+    try:
+        if not user or not user.check_password(data['password']):
+            return jsonify({'error': 'Invalid email or password'}), 401
+    except PasswordServiceBusy as e:
+        return jsonify({'error': str(e)}), 503
+    
+    # Upgrade hashes made with an outdated cost factor while we have the plaintext.
+    # The password is already verified, so a busy pool only postpones the upgrade
+    # to a later login.
+    if user.password_needs_rehash():
+        try:
+            user.set_password(data['password'])
+            db.session.commit()
+        except PasswordServiceBusy:
+            db.session.rollback()
+    # Reads right after login may follow the hash upgrade above
+    mark_sticky(user.id)
     
     # Generate tokens
-    access_token = create_access_token(identity=str(user.id))
+    access_token = create_access_token(
+        identity=str(user.id),
+        additional_claims=user_cache_service.token_claims(user.user_type)
+    )
     refresh_token = create_refresh_token(identity=str(user.id))
     
     return jsonify({
@@ -73,7 +102,14 @@ def login():
 @jwt_required(refresh=True)
 def refresh():
     current_user_id = get_jwt_identity()
-    access_token = create_access_token(identity=current_user_id)
+    snapshot = user_cache_service.get_snapshot(current_user_id)
+    if not snapshot:
+        return jsonify({'error': 'User not found'}), 404
+    
+    access_token = create_access_token(
+        identity=current_user_id,
+        additional_claims=user_cache_service.token_claims(snapshot['user_type'])
+    )
     
     return jsonify({
         'access_token': access_token
@@ -83,9 +119,9 @@ def refresh():
 @jwt_required()
 def get_current_user():
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
+    snapshot = user_cache_service.get_snapshot(current_user_id)
     
-    if not user:
+    if not snapshot:
         return jsonify({'error': 'User not found'}), 404
     
-    return jsonify(user.to_dict()), 200 
\ No newline at end of file
+    return jsonify(snapshot['profile']), 200 
\ No newline at end of file
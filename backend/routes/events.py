@@ -1,53 +1,333 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
-from models.event import Event, EventRegistration
-from models.user import User
-from models.waste_log import WasteLog
+from models.event import Event
 from app import db
-import uuid
-from datetime import datetime
-from services.llm_service import llm_service
-from services.geocoding_service import geocoding_service
+from datetime import datetime, date
+from sqlalchemy import func, or_, and_
+from services.llm_service import llm_service, LLMOverloadedError
+from services.geocoding_worker import geocoding_worker
+from services.participant_service import participant_service
+from services.user_stats_service import user_stats_service
+from services.social_post_service import social_post_service
+from services.search_service import search_service
+from services.tag_service import tag_service, normalize_tags, decode_legacy
+from services.version_service import version_service, EVENTS_COLLECTION
+from services.response_cache_service import response_cache_service
+from services.map_tile_service import map_tile_service, MAX_ZOOM
+from utils.pagination import parse_limit, encode_cursor, decode_cursor
+from utils.geo import bounding_box, covering_geohashes, haversine_km, haversine_term, haversine_term_for
+from utils.http_cache import conditional_get, resolve_version
+from utils.serialization import serializers, json_response
+from utils.db_routing import use_primary
 import json
 
 events_bp = Blueprint('events', __name__)
 
+# Columns that can be requested through the `fields` query parameter
+EVENT_LIST_FIELDS = {
+    'id': Event.id,
+    'title': Event.title,
+    'description': Event.description,
+    'location': Event.location,
+    'latitude': Event.latitude,
+    'longitude': Event.longitude,
+    'date': Event.date,
+    'time_start': Event.time_start,
+    'time_end': Event.time_end,
+    'city': Event.city,
+    'state': Event.state,
+    'organizer_id': Event.organizer_id,
+    'what_to_bring': Event.what_to_bring,
+    'safety_protocols': Event.safety_protocols,
+    'tags': Event.tags,
+    'max_participants': Event.max_participants,
+    'is_active': Event.is_active,
+    'created_at': Event.created_at,
+    'updated_at': Event.updated_at,
+    'volunteer_count': Event.participant_count.label('volunteer_count'),
+}
+
+MAX_NEARBY_RADIUS_KM = 500
+
+def _parse_fields(value):
+    """Parse a comma separated `fields` parameter, always keeping the cursor keys"""
+    fields = [f.strip() for f in value.split(',') if f.strip()]
+    unknown = [f for f in fields if f not in EVENT_LIST_FIELDS]
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    for key in ('date', 'id'):
+        if key not in fields:
+            fields.insert(0, key)
+    return fields
+
+def _events_version(**kwargs):
+    """Version stamp shared by every view derived from the events collection"""
+    return version_service.current(EVENTS_COLLECTION)
+
+def _event_version(event_id):
+    row = db.session.query(
+        Event.updated_at, Event.participant_count, Event.is_active
+    ).filter(Event.id == event_id).first()
+    if row is None:
+        return None
+    return f"{row.updated_at.isoformat()}:{row.participant_count}:{row.is_active}", row.updated_at
+
 @events_bp.route('/events', methods=['GET'])
+@conditional_get(_events_version)
+@response_cache_service.cached(_events_version)
 def get_events():
-    """Get all active events"""
-    events = Event.query.filter_by(is_active=True).all()
-    return jsonify([event.to_dict() for event in events])
+    """
+    Get a page of active events ordered by (date, id).
+    Query params: limit, cursor, fields, city, state, date_from, date_to,
+    tags (comma separated; events must carry all of them)
+    """
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        tags = normalize_tags(request.args['tags'].split(',')) if request.args.get('tags') else None
+        fields = _parse_fields(request.args['fields']) if request.args.get('fields') else None
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        date_from = date.fromisoformat(date_from) if date_from else None
+        date_to = date.fromisoformat(date_to) if date_to else None
+        cursor = request.args.get('cursor')
+        if cursor:
+            cursor_date, cursor_id = decode_cursor(cursor, (str, int))
+            cursor_date = date.fromisoformat(cursor_date)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if fields:
+        query = db.session.query(*[EVENT_LIST_FIELDS[f] for f in fields])
+    else:
+        query = Event.query
+    query = query.filter(Event.is_active == True)
+
+    if request.args.get('city'):
+        query = query.filter(func.lower(Event.city) == request.args['city'].lower())
+    if request.args.get('state'):
+        query = query.filter(func.lower(Event.state) == request.args['state'].lower())
+    if date_from:
+        query = query.filter(Event.date >= date_from)
+    if date_to:
+        query = query.filter(Event.date <= date_to)
+    if tags:
+        query = query.filter(Event.id.in_(tag_service.events_with_all_tags(tags)))
+    if cursor:
+        query = query.filter(or_(
+            Event.date > cursor_date,
+            and_(Event.date == cursor_date, Event.id > cursor_id)
+        ))
+
+    # Fetch one extra row to know whether another page exists
+    rows = query.order_by(Event.date, Event.id).limit(limit + 1).all()
+    has_more = len(rows) > limit
+    rows = rows[:limit]
+
+    next_cursor = None
+    if has_more:
+        last = rows[-1]
+        next_cursor = encode_cursor(last.date.isoformat(), last.id)
+
+    if fields:
+        encode = serializers.row_encoder(fields)
+    else:
+        encode = serializers.encoder(Event, native=True)
+
+    return json_response({
+        'events': encode.many(rows),
+        'next_cursor': next_cursor
+    })
 
 @events_bp.route('/events/map-data', methods=['GET'])
+@conditional_get(_events_version)
+@response_cache_service.cached(_events_version)
 def get_map_data():
-    """Get map data for all active events"""
-    events = Event.query.filter_by(is_active=True).all()
-    map_data = []
-    
-    for event in events:
-        # If coordinates are not set, try to geocode the address
-        if event.latitude is None or event.longitude is None:
-            full_address = f"{event.location}, {event.city}, {event.state}"
-            coordinates = geocoding_service.get_coordinates(full_address)
-            
-            if coordinates:
-                event.latitude, event.longitude = coordinates
-                db.session.commit()
-        
-        if event.latitude and event.longitude:
-            map_data.append({
-                'id': event.id,
-                'title': event.title,
-                'location': event.location,
-                'latitude': event.latitude,
-                'longitude': event.longitude,
-                'date': event.date.isoformat(),
-                'volunteer_count': len(event.participants)
-            })
-    
+    """
+    Get map data for all active events that have been geocoded.
+    With bbox=min_lon,min_lat,max_lon,max_lat and zoom, returns per-tile clusters instead.
+    """
+    if 'bbox' in request.args:
+        return _get_map_clusters()
+
+    # Coordinates are filled in by the geocoding worker; never geocode inline here
+    events = db.session.query(
+        Event.id, Event.title, Event.location, Event.latitude,
+        Event.longitude, Event.date, Event.participant_count
+    ).filter(
+        Event.is_active == True,
+        Event.latitude.isnot(None),
+        Event.longitude.isnot(None)
+    ).all()
+
+    map_data = [{
+        'id': event.id,
+        'title': event.title,
+        'location': event.location,
+        'latitude': event.latitude,
+        'longitude': event.longitude,
+        'date': event.date.isoformat(),
+        'volunteer_count': event.participant_count
+    } for event in events]
+
     return jsonify(map_data)
 
+def _get_map_clusters():
+    try:
+        min_lon, min_lat, max_lon, max_lat = [float(v) for v in request.args['bbox'].split(',')]
+        zoom = int(request.args.get('zoom', 0))
+    except ValueError:
+        return jsonify({'error': 'bbox must be min_lon,min_lat,max_lon,max_lat and zoom an integer'}), 400
+
+    if not (0 <= zoom <= MAX_ZOOM):
+        return jsonify({'error': f'zoom must be between 0 and {MAX_ZOOM}'}), 400
+    if min_lon > max_lon or min_lat > max_lat:
+        return jsonify({'error': 'Invalid bounding box'}), 400
+
+    try:
+        tiles = map_tile_service.tiles_for_bbox(min_lon, min_lat, max_lon, max_lat, zoom)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    # Already looked up by the view's decorators; keying tiles by it means a
+    # fill racing a write can only store under the stamp it read
+    version, _ = resolve_version(_events_version, {})
+    clusters = []
+    for x, y in tiles:
+        clusters.extend(map_tile_service.get_tile(zoom, x, y, version))
+
+    return jsonify({
+        'zoom': zoom,
+        'clusters': clusters
+    })
+
+@events_bp.route('/events/nearby', methods=['GET'])
+def get_nearby_events():
+    """
+    Get active events within radius_km of (lat, lon), nearest first.
+    Query params: lat, lon, radius_km, limit, offset
+    """
+    try:
+        lat = float(request.args['lat'])
+        lon = float(request.args['lon'])
+        radius_km = float(request.args.get('radius_km', 10))
+        limit = parse_limit(request.args.get('limit'))
+        offset = int(request.args.get('offset', 0))
+    except KeyError as e:
+        return jsonify({'error': f'Missing required parameter: {e.args[0]}'}), 400
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        return jsonify({'error': 'Coordinates out of range'}), 400
+    if not (0 < radius_km <= MAX_NEARBY_RADIUS_KM):
+        return jsonify({'error': f'radius_km must be between 0 and {MAX_NEARBY_RADIUS_KM}'}), 400
+    if offset < 0:
+        return jsonify({'error': 'offset must not be negative'}), 400
+
+    # Prefilter with the geohash prefix index and a bounding box, then let the
+    # database filter, order and page by exact distance
+    term = haversine_term(Event.latitude, Event.longitude, lat, lon)
+    min_lat, max_lat, min_lon, max_lon = bounding_box(lat, lon, radius_km)
+    filters = [
+        Event.is_active == True,
+        Event.latitude.between(min_lat, max_lat),
+        term <= haversine_term_for(radius_km),
+    ]
+    if min_lon >= -180 and max_lon <= 180:
+        filters.append(Event.longitude.between(min_lon, max_lon))
+    prefixes = covering_geohashes(lat, lon, radius_km)
+    if prefixes:
+        filters.append(or_(*[Event.geohash.startswith(p) for p in prefixes]))
+
+    rows = (
+        db.session.query(Event, func.count().over().label('total'))
+        .filter(*filters)
+        .order_by(term, Event.id)
+        .limit(limit)
+        .offset(offset)
+        .all()
+    )
+    if rows:
+        total = rows[0].total
+    elif offset:
+        # Past the last page the window count has no row to ride on
+        total = db.session.query(func.count(Event.id)).filter(*filters).scalar()
+    else:
+        total = 0
+
+    encode = serializers.encoder(Event, native=True)
+    events = []
+    for event, _ in rows:
+        event_data = encode(event)
+        event_data['distance_km'] = round(haversine_km(lat, lon, event.latitude, event.longitude), 3)
+        events.append(event_data)
+
+    next_offset = offset + limit if total > offset + limit else None
+    return json_response({
+        'events': events,
+        'total': total,
+        'next_offset': next_offset
+    })
+
+@events_bp.route('/events/tags', methods=['GET'])
+@conditional_get(_events_version)
+@response_cache_service.cached(_events_version)
+def get_tag_facets():
+    """Tag facet counts over active events, most used first. Query params: limit"""
+    try:
+        limit = parse_limit(request.args.get('limit'))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+
+    return jsonify({'tags': [tag_count.to_dict() for tag_count in tag_service.facets(limit)]})
+
+@events_bp.route('/events/search', methods=['GET'])
+@conditional_get(_events_version)
+@response_cache_service.cached(_events_version)
+def search_events():
+    """
+    Ranked full-text search over active events' title, description, location, city and tags.
+    Terms of two or more characters match as prefixes. Query params: q, limit, offset
+    """
+    query = request.args.get('q', '').strip()
+    if not query:
+        return jsonify({'error': 'Missing required parameter: q'}), 400
+    try:
+        limit = parse_limit(request.args.get('limit'))
+        offset = int(request.args.get('offset', 0))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    if offset < 0:
+        return jsonify({'error': 'offset must not be negative'}), 400
+
+    # Fetch one extra hit to know whether another page exists
+    hits = search_service.search(query, limit + 1, offset)
+    has_more = len(hits) > limit
+    hits = hits[:limit]
+
+    events_by_id = {
+        event.id: event
+        for event in Event.query.filter(Event.id.in_([event_id for event_id, _ in hits]))
+    } if hits else {}
+
+    encode = serializers.encoder(Event, native=True)
+    events = []
+    for event_id, rank in hits:
+        event = events_by_id.get(event_id)
+        if event is None:
+            continue
+        event_data = encode(event)
+        event_data['rank'] = round(rank, 6)
+        events.append(event_data)
+
+    return json_response({
+        'events': events,
+        'next_offset': offset + limit if has_more else None
+    })
+
 @events_bp.route('/events/<int:event_id>', methods=['GET'])
+@conditional_get(_event_version)
+@response_cache_service.cached(_event_version)
 def get_event(event_id):
     """Get a specific event by ID"""
     event = Event.query.get_or_404(event_id)
@@ -67,10 +347,10 @@ def create_event():
         if field not in data:
             return jsonify({'error': f'Missing required field: {field}'}), 400
 
-    # Geocode the address
-    full_address = f"{data['location']}, {data['city']}, {data['state']}"
-    coordinates = geocoding_service.get_coordinates(full_address)
-    latitude, longitude = coordinates if coordinates else (None, None)
+    try:
+        tags = normalize_tags(data.get('tags', []))
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
 
     # Create new event
     event = Event(
@@ -83,16 +363,25 @@ def create_event():
         city=data['city'],
         state=data['state'],
         organizer_id=current_user_id,
-        what_to_bring=json.dumps(data['what_to_bring']),
-        safety_protocols=json.dumps(data['safety_protocols']),
-        tags=json.dumps(data.get('tags', [])),
+        what_to_bring=data['what_to_bring'],
+        safety_protocols=data['safety_protocols'],
+        tags=tags,
         max_participants=data.get('max_participants', 100),
-        is_active=True,
-        latitude=latitude,
-        longitude=longitude
+        is_active=True
     )
 
     db.session.add(event)
+    db.session.flush()
+    user_stats_service.event_created(current_user_id)
+    tag_service.set_tags(event, tags, was_active=False)
+    search_service.index_event(event)
+
+    # Coordinates are resolved asynchronously by the geocoding worker
+    geocoding_worker.enqueue(
+        event.id,
+        geocoding_worker.format_address(event.location, event.city, event.state)
+    )
+    version_service.bump(EVENTS_COLLECTION)
     db.session.commit()
 
     return jsonify(event.to_dict()), 201
@@ -105,10 +394,17 @@ def update_event(event_id):
     event = Event.query.get_or_404(event_id)
 
     # Check if user is the organizer
-    if event.organizer_id != current_user_id:
+    if str(event.organizer_id) != current_user_id:
         return jsonify({'error': 'Unauthorized'}), 403
 
     data = request.get_json()
+    try:
+        tags = normalize_tags(data['tags']) if 'tags' in data else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    was_active = event.is_active
+    old_capacity = event.max_participants
+    old_city = event.city
 
     # Update fields if provided
     if 'title' in data:
@@ -128,17 +424,38 @@ def update_event(event_id):
     if 'state' in data:
         event.state = data['state']
     if 'what_to_bring' in data:
-        event.what_to_bring = json.dumps(data['what_to_bring'])
+        event.what_to_bring = data['what_to_bring']
     if 'safety_protocols' in data:
-        event.safety_protocols = json.dumps(data['safety_protocols'])
-    if 'tags' in data:
-        event.tags = json.dumps(data['tags'])
+        event.safety_protocols = data['safety_protocols']
     if 'max_participants' in data:
         event.max_participants = data['max_participants']
     if 'is_active' in data:
         event.is_active = data['is_active']
 
+    # Re-geocode when the address changes
+    address_changed = any(field in data for field in ('location', 'city', 'state'))
+    if address_changed:
+        event.set_coordinates(None, None)
+        geocoding_worker.enqueue(
+            event.id,
+            geocoding_worker.format_address(event.location, event.city, event.state)
+        )
+
+    if tags is not None:
+        tag_service.set_tags(event, tags, was_active)
+    else:
+        tag_service.set_active(event, was_active)
+    search_service.index_event(event)
+    version_service.bump(EVENTS_COLLECTION)
+    if event.city != old_city:
+        user_stats_service.event_city_changed(event.id, old_city, event.city)
+
+    # New seats go to the waitlist in the same transaction as the capacity change
+    if event.is_active and event.max_participants > old_capacity:
+        db.session.flush()
+        participant_service.promote_waitlist(event.id)
     db.session.commit()
+
     return jsonify(event.to_dict())
 
 @events_bp.route('/events/<int:event_id>/join', methods=['POST'])
@@ -152,18 +469,18 @@ def join_event(event_id):
     if not event.is_active:
         return jsonify({'error': 'Event is not active'}), 400
 
-    # Check if user is already a participant
-    if current_user_id in [p.id for p in event.participants]:
-        return jsonify({'error': 'Already registered for this event'}), 400
-
-    # Check if event is full
-    if len(event.participants) >= event.max_participants:
-        return jsonify({'error': 'Event is full'}), 400
-
-    # Add user to participants
-    event.participants.append(current_user_id)
+    # Reserve a seat atomically; overflow goes to the waitlist
+    status, position = participant_service.join(event_id, current_user_id)
     db.session.commit()
 
+    if status == 'already_joined':
+        return jsonify({'error': 'Already registered for this event'}), 400
+    if status == 'waitlisted':
+        return jsonify({
+            'message': 'Event is full, added to waitlist',
+            'waitlist_position': position
+        }), 202
+
     return jsonify({'message': 'Successfully joined event'})
 
 @events_bp.route('/events/<int:event_id>/leave', methods=['POST'])
@@ -171,14 +488,11 @@ def join_event(event_id):
 def leave_event(event_id):
     """Leave an event"""
     current_user_id = get_jwt_identity()
-    event = Event.query.get_or_404(event_id)
+    Event.query.get_or_404(event_id)
 
-    # Check if user is a participant
-    if current_user_id not in [p.id for p in event.participants]:
+    # Remove user from participants (or the waitlist) and promote the next in line
+    if not participant_service.leave(event_id, current_user_id):
         return jsonify({'error': 'Not registered for this event'}), 400
-
-    # Remove user from participants
-    event.participants.remove(current_user_id)
     db.session.commit()
 
     return jsonify({'message': 'Successfully left event'})
@@ -191,95 +505,175 @@ def delete_event(event_id):
     event = Event.query.get_or_404(event_id)
 
     # Check if user is the organizer
-    if event.organizer_id != current_user_id:
+    if str(event.organizer_id) != current_user_id:
         return jsonify({'error': 'Unauthorized'}), 403
 
     # Soft delete by setting is_active to False
+    was_active = event.is_active
     event.is_active = False
+    tag_service.set_active(event, was_active)
+    search_service.remove_event(event.id)
+    version_service.bump(EVENTS_COLLECTION)
     db.session.commit()
 
     return jsonify({'message': 'Event deleted successfully'})
 
-@events_bp.route('/<uuid:event_id>/generate-post', methods=['POST'])
+LLM_RETRY_AFTER_SECONDS = 5
+
+def _llm_overloaded(error):
+    """Fast-fail response when every LLM slot is busy"""
+    return jsonify({'error': str(error)}), 503, {'Retry-After': str(LLM_RETRY_AFTER_SECONDS)}
+
+@events_bp.route('/<int:event_id>/generate-post', methods=['POST'])
 @jwt_required()
 def generate_social_post(event_id):
+    """
+    Request a social media post for the event.
+    Returns the pre-generated post when one matches the current event data,
+    otherwise queues a job and returns its id for polling.
+    """
     current_user_id = get_jwt_identity()
     event = Event.query.get_or_404(event_id)
     
     if str(event.organizer_id) != current_user_id:
         return jsonify({'error': 'Only the event organizer can generate posts'}), 403
     
-    # Get event analytics
-    volunteer_count = len(event.registrations)
-    waste_logs = WasteLog.query.filter_by(event_id=event_id).all()
-    total_waste = sum(float(log.quantity) for log in waste_logs)
-    
-    # Construct prompt for LLM
-    prompt = f"""Generate an engaging social media post for a beach cleanup event with the following details:
-    Event: {event.title}
-    Location: {event.location}
-    Date: {event.date}
-    Time: {event.time_start} to {event.time_end}
-    Volunteers: {volunteer_count}
-    Total Waste Collected: {total_waste} kg
-    
-    The post should be engaging, highlight the impact, and encourage more participation.
-    Keep it under 280 characters for Twitter compatibility."""
-    
-    system_prompt = "You are a social media expert helping to create engaging posts for environmental events."
-    
-    try:
-        generated_post = llm_service.generate_text(
-            prompt=prompt,
-            system_prompt=system_prompt,
-            temperature=0.7,
-            max_tokens=200
-        )
-        
+    ready = social_post_service.find_ready(event)
+    if ready:
         return jsonify({
-            'post': generated_post
+            'job_id': str(ready.id),
+            'status': ready.status,
+            'post': ready.post
         }), 200
-        
-    except Exception as e:
-        return jsonify({'error': f'Failed to generate post: {str(e)}'}), 500
+    
+    job = social_post_service.enqueue(event.id)
+    db.session.commit()
+    
+    return jsonify({
+        'job_id': str(job.id),
+        'status': job.status
+    }), 202
 
-@events_bp.route('/<uuid:event_id>/ask-ecobot', methods=['POST'])
+@events_bp.route('/<int:event_id>/generate-post/<uuid:job_id>', methods=['GET'])
 @jwt_required()
-def ask_ecobot(event_id):
+@use_primary
+def get_social_post_job(event_id, job_id):
+    """Get the status and result of a social post job"""
     current_user_id = get_jwt_identity()
     event = Event.query.get_or_404(event_id)
     
-    data = request.get_json()
-    if 'question' not in data:
-        return jsonify({'error': 'Question is required'}), 400
+    if str(event.organizer_id) != current_user_id:
+        return jsonify({'error': 'Only the event organizer can view posts'}), 403
+    
+    job = social_post_service.get_job(job_id)
+    if not job or job.event_id != event.id:
+        return jsonify({'error': 'Job not found'}), 404
     
-    # Construct context-aware prompt
-    context = f"""Event Context:
+    return jsonify(job.to_dict()), 200
+
+ECOBOT_SYSTEM_PROMPT = "You are EcoBot, an AI assistant that helps volunteers with event-related questions. Only use the provided context to answer questions."
+
+def _ecobot_prompt(event, question):
+    """Construct context-aware prompt"""
+    return f"""Event Context:
     Title: {event.title}
     Description: {event.description}
     Location: {event.location}
     Date: {event.date}
     Time: {event.time_start} to {event.time_end}
-    What to Bring: {', '.join(json.loads(event.what_to_bring))}
-    Safety Protocols: {', '.join(json.loads(event.safety_protocols))}
+    What to Bring: {', '.join(decode_legacy(event.what_to_bring))}
+    Safety Protocols: {', '.join(decode_legacy(event.safety_protocols))}
     
-    User Question: {data['question']}
+    User Question: {question}
     
     Please answer the question based ONLY on the provided event context. If the question cannot be answered using the context, say so."""
+
+@events_bp.route('/<int:event_id>/ask-ecobot', methods=['POST'])
+@jwt_required()
+def ask_ecobot(event_id):
+    event = Event.query.get_or_404(event_id)
     
-    system_prompt = "You are EcoBot, an AI assistant that helps volunteers with event-related questions. Only use the provided context to answer questions."
+    data = request.get_json()
+    if 'question' not in data:
+        return jsonify({'error': 'Question is required'}), 400
     
     try:
         answer = llm_service.generate_text(
-            prompt=context,
-            system_prompt=system_prompt,
+            prompt=_ecobot_prompt(event, data['question']),
+            system_prompt=ECOBOT_SYSTEM_PROMPT,
             temperature=0.3,  # Lower temperature for more focused answers
-            max_tokens=500
+            max_tokens=500,
+            context_version=event.updated_at.isoformat()
         )
         
         return jsonify({
             'answer': answer
         }), 200
         
+    except LLMOverloadedError as e:
+        return _llm_overloaded(e)
+    except Exception as e:
+        return jsonify({'error': f'Failed to get answer: {str(e)}'}), 500 
+
+def _sse(data, event=None):
+    """Format one Server-Sent Events message"""
+    message = f"event: {event}\n" if event else ''
+    return message + f"data: {json.dumps(data)}\n\n"
+
+@events_bp.route('/<int:event_id>/ask-ecobot/stream', methods=['POST'])
+@jwt_required()
+def ask_ecobot_stream(event_id):
+    """Ask EcoBot and relay the answer token by token as Server-Sent Events"""
+    event = Event.query.get_or_404(event_id)
+    
+    data = request.get_json()
+    if 'question' not in data:
+        return jsonify({'error': 'Question is required'}), 400
+    
+    # Build everything from the event before streaming starts
+    tokens = llm_service.stream_text(
+        prompt=_ecobot_prompt(event, data['question']),
+        system_prompt=ECOBOT_SYSTEM_PROMPT,
+        temperature=0.3,
+        max_tokens=500,
+        context_version=event.updated_at.isoformat()
+    )
+    
+    # Pull the first chunk now so overload and provider errors still get a proper status
+    try:
+        first_token = next(tokens, None)
+    except LLMOverloadedError as e:
+        return _llm_overloaded(e)
     except Exception as e:
-        return jsonify({'error': f'Failed to get answer: {str(e)}'}), 500 
\ No newline at end of file
+        return jsonify({'error': f'Failed to get answer: {str(e)}'}), 500
+    
+    def generate():
+        try:
+            if first_token is not None:
+                yield _sse({'token': first_token})
+            for token in tokens:
+                yield _sse({'token': token})
+            yield _sse({}, event='done')
+        except Exception as e:
+            yield _sse({'error': f'Failed to get answer: {str(e)}'}, event='error')
+    
+    return Response(
+        stream_with_context(generate()),
+        mimetype='text/event-stream',
+        headers={
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'  # Stop reverse proxies from buffering the stream
+        }
+    )
+
+@events_bp.route('/llm/cache-stats', methods=['GET'])
+@jwt_required()
+def get_llm_cache_stats():
+    """Get LLM response cache hit/miss counters for this worker"""
+    return jsonify(llm_service.cache_stats()), 200
+
+@events_bp.route('/events/cache-stats', methods=['GET'])
+@jwt_required()
+def get_response_cache_stats():
+    """Get response cache hit/miss counters for this worker"""
+    return jsonify(response_cache_service.stats()), 200
@@ -2,9 +2,12 @@ from flask import Blueprint, request, jsonify
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.user import User
 from models.event import Event, EventRegistration
-from models.waste_log import WasteLog
-from app import db, bcrypt
-import uuid
+from app import db
+from services.password_service import PasswordServiceBusy
+from services.user_cache_service import user_cache_service
+from services.user_stats_service import user_stats_service, GLOBAL_SCOPE, CITY_SCOPE, EVENT_SCOPE
+from utils.pagination import parse_limit
+from utils.serialization import serializers, stream_json_response, STREAM_BATCH_SIZE
 
 users_bp = Blueprint('users', __name__)
 
@@ -12,9 +15,11 @@ users_bp = Blueprint('users', __name__)
 @jwt_required()
 def get_profile():
     current_user_id = get_jwt_identity()
-    user = User.query.get_or_404(current_user_id)
+    snapshot = user_cache_service.get_snapshot(current_user_id)
+    if not snapshot:
+        return jsonify({'error': 'Not found'}), 404
     
-    return jsonify(user.to_dict()), 200
+    return jsonify(snapshot['profile']), 200
 
 @users_bp.route('/profile', methods=['PUT'])
 @jwt_required()
@@ -34,11 +39,15 @@ def update_profile():
                 return jsonify({'error': 'Email already in use'}), 409
             user.email = data['email']
         if 'password' in data:
-            user.password_hash = bcrypt.generate_password_hash(data['password']).decode('utf-8')
+            user.set_password(data['password'])
         
         db.session.commit()
+        user_cache_service.invalidate(current_user_id)
         return jsonify(user.to_dict()), 200
         
+    except PasswordServiceBusy as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 503
     except Exception as e:
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
@@ -47,48 +56,75 @@ def update_profile():
 @jwt_required()
 def get_user_events():
     current_user_id = get_jwt_identity()
-    user = User.query.get_or_404(current_user_id)
     
-    if user.user_type == 'organizer':
+    if user_cache_service.current_user_type() == 'organizer':
         # Get events created by the organizer
-        events = Event.query.filter_by(organizer_id=current_user_id).all()
+        events = Event.query.filter_by(organizer_id=current_user_id)
     else:
         # Get events the volunteer is registered for
-        registrations = EventRegistration.query.filter_by(user_id=current_user_id).all()
-        event_ids = [reg.event_id for reg in registrations]
-        events = Event.query.filter(Event.id.in_(event_ids)).all()
+        registered = db.session.query(EventRegistration.event_id).filter_by(user_id=current_user_id)
+        events = Event.query.filter(Event.id.in_(registered))
     
-    return jsonify([event.to_dict() for event in events]), 200
+    # Rows are fetched and encoded in batches while the response streams
+    return stream_json_response(
+        events.yield_per(STREAM_BATCH_SIZE),
+        serializers.encoder(Event, native=True)
+    )
 
 @users_bp.route('/stats', methods=['GET'])
 @jwt_required()
 def get_user_stats():
     current_user_id = get_jwt_identity()
-    user = User.query.get_or_404(current_user_id)
+    stats = user_stats_service.get_stats(current_user_id)
     
-    if user.user_type == 'organizer':
-        # Get organizer stats
-        events_created = Event.query.filter_by(organizer_id=current_user_id).count()
-        total_volunteers = db.session.query(EventRegistration).join(
-            Event, Event.id == EventRegistration.event_id
-        ).filter(Event.organizer_id == current_user_id).count()
-        
+    if user_cache_service.current_user_type() == 'organizer':
         return jsonify({
-            'eventsCreated': events_created,
-            'totalVolunteers': total_volunteers
+            'eventsCreated': stats.events_created,
+            'totalVolunteers': stats.volunteers_hosted
         }), 200
     else:
-        # Get volunteer stats
-        events_attended = EventRegistration.query.filter_by(
-            user_id=current_user_id,
-            status='attended'
-        ).count()
-        
-        waste_logs = WasteLog.query.filter_by(user_id=current_user_id).all()
-        total_waste = sum(float(log.quantity) for log in waste_logs)
-        
         return jsonify({
-            'eventsAttended': events_attended,
-            'totalWasteCollected': total_waste,
-            'wasteLogs': len(waste_logs)
-        }), 200 
\ No newline at end of file
+            'eventsAttended': stats.events_attended,
+            'totalWasteCollected': float(stats.total_waste),
+            'wasteLogs': stats.waste_log_count
+        }), 200
+
+def _leaderboard_response(scope, scope_key=''):
+    try:
+        limit = parse_limit(request.args.get('limit'), default=10)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    entries = user_stats_service.get_leaderboard(scope, scope_key, limit)
+    users = {
+        user.id: user
+        for user in User.query.filter(User.id.in_([entry.user_id for entry in entries]))
+    } if entries else {}
+    
+    leaderboard = []
+    for rank, entry in enumerate(entries, start=1):
+        user = users.get(entry.user_id)
+        leaderboard.append({
+            'rank': rank,
+            'user_id': str(entry.user_id),
+            'full_name': user.full_name if user else None,
+            'totalWasteCollected': float(entry.total_waste),
+            'wasteLogs': entry.log_count
+        })
+    
+    return jsonify(leaderboard), 200
+
+@users_bp.route('/leaderboard', methods=['GET'])
+@jwt_required()
+def get_global_leaderboard():
+    return _leaderboard_response(GLOBAL_SCOPE)
+
+@users_bp.route('/leaderboard/city/<city>', methods=['GET'])
+@jwt_required()
+def get_city_leaderboard(city):
+    return _leaderboard_response(CITY_SCOPE, user_stats_service.city_key(city))
+
+@users_bp.route('/leaderboard/event/<int:event_id>', methods=['GET'])
+@jwt_required()
+def get_event_leaderboard(event_id):
+    return _leaderboard_response(EVENT_SCOPE, str(event_id))
@@ -1,18 +1,26 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, request, jsonify, Response, stream_with_context
 from flask_jwt_extended import jwt_required, get_jwt_identity
 from models.waste_log import WasteLog
 from models.event import Event, EventRegistration
-from models.user import User
 from app import db
+from services.waste_rollup_service import waste_rollup_service
+from services.user_stats_service import user_stats_service
+from services.user_cache_service import user_cache_service
+from utils.serialization import serializers, dumps, stream_json_response, STREAM_BATCH_SIZE
+from sqlalchemy import insert
+from sqlalchemy.exc import IntegrityError
+from decimal import Decimal, InvalidOperation
+from datetime import datetime, timedelta
+import csv
+import io
 import uuid
 
 waste_logs_bp = Blueprint('waste_logs', __name__)
 
-@waste_logs_bp.route('/event/<uuid:event_id>', methods=['GET'])
+@waste_logs_bp.route('/event/<int:event_id>', methods=['GET'])
 @jwt_required()
 def get_event_waste_logs(event_id):
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
     
     # Check if user is either the event organizer or a registered volunteer
     event = Event.query.get_or_404(event_id)
@@ -25,16 +33,15 @@ def get_event_waste_logs(event_id):
     if not (is_organizer or is_volunteer):
         return jsonify({'error': 'Not authorized to view waste logs for this event'}), 403
     
-    waste_logs = WasteLog.query.filter_by(event_id=event_id).all()
-    return jsonify([log.to_dict() for log in waste_logs]), 200
+    waste_logs = WasteLog.query.filter_by(event_id=event_id).yield_per(STREAM_BATCH_SIZE)
+    return stream_json_response(waste_logs, serializers.encoder(WasteLog, native=True))
 
-@waste_logs_bp.route('/event/<uuid:event_id>', methods=['POST'])
+@waste_logs_bp.route('/event/<int:event_id>', methods=['POST'])
 @jwt_required()
 def create_waste_log(event_id):
     current_user_id = get_jwt_identity()
-    user = User.query.get(current_user_id)
     
-    if user.user_type != 'volunteer':
+    if user_cache_service.current_user_type() != 'volunteer':
         return jsonify({'error': 'Only volunteers can log waste'}), 403
     
     # Check if user is registered for the event
@@ -61,6 +68,8 @@ def create_waste_log(event_id):
             notes=data.get('notes')
         )
         db.session.add(waste_log)
+        waste_rollup_service.log_created(waste_log)
+        user_stats_service.waste_log_created(waste_log)
         db.session.commit()
         
         return jsonify(waste_log.to_dict()), 201
@@ -69,6 +78,143 @@ def create_waste_log(event_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
+MAX_BULK_LOGS = 500
+
+def _string_error(item, field, column, required=True):
+    """Error message if item[field] is not a string that fits `column`, else None."""
+    value = item.get(field)
+    if value is None and not required:
+        return None
+    if not isinstance(value, str) or (required and not value.strip()):
+        return f'{field} must be a non-empty string' if required else f'{field} must be a string'
+    max_length = column.type.length
+    if max_length is not None and len(value) > max_length:
+        return f'{field} must be at most {max_length} characters'
+    return None
+
+def _validate_bulk_item(item):
+    """Return (row, error) for a single item of a bulk upload"""
+    if not isinstance(item, dict):
+        return None, 'Item must be an object'
+    if not all(field in item for field in ['wasteType', 'quantity', 'unit']):
+        return None, 'Missing required fields'
+    error = (
+        _string_error(item, 'wasteType', WasteLog.waste_type)
+        or _string_error(item, 'unit', WasteLog.unit)
+        or _string_error(item, 'notes', WasteLog.notes, required=False)
+    )
+    if error:
+        return None, error
+    try:
+        log_id = uuid.UUID(str(item['id'])) if item.get('id') else uuid.uuid4()
+    except ValueError:
+        return None, 'Invalid id'
+    if isinstance(item['quantity'], bool):
+        return None, 'Invalid quantity'
+    try:
+        quantity = Decimal(str(item['quantity']))
+    except InvalidOperation:
+        return None, 'Invalid quantity'
+    if not quantity.is_finite():
+        return None, 'Invalid quantity'
+    return {
+        'id': log_id,
+        'waste_type': item['wasteType'],
+        'quantity': quantity,
+        'unit': item['unit'],
+        'notes': item.get('notes')
+    }, None
+
+@waste_logs_bp.route('/event/<int:event_id>/bulk', methods=['POST'])
+@jwt_required()
+def create_waste_logs_bulk(event_id):
+    """
+    Create many waste logs in one transaction.
+    Items may carry a client-generated `id`, so retried uploads are deduplicated.
+    """
+    current_user_id = get_jwt_identity()
+    
+    if user_cache_service.current_user_type() != 'volunteer':
+        return jsonify({'error': 'Only volunteers can log waste'}), 403
+    
+    # Check the registration once for the whole batch
+    registration = EventRegistration.query.filter_by(
+        event_id=event_id,
+        user_id=current_user_id
+    ).first()
+    
+    if not registration:
+        return jsonify({'error': 'Must be registered for the event to log waste'}), 403
+    
+    data = request.get_json()
+    items = data.get('logs') if isinstance(data, dict) else None
+    if not isinstance(items, list) or not items:
+        return jsonify({'error': 'logs must be a non-empty list'}), 400
+    if len(items) > MAX_BULK_LOGS:
+        return jsonify({'error': f'At most {MAX_BULK_LOGS} logs per request'}), 400
+    
+    results = []
+    rows = []
+    for index, item in enumerate(items):
+        row, error = _validate_bulk_item(item)
+        if error:
+            results.append({'index': index, 'status': 'error', 'error': error})
+            continue
+        results.append({'index': index, 'id': str(row['id']), 'status': 'created'})
+        rows.append((len(results) - 1, row))
+    
+    # Skip ids already stored by an earlier attempt or repeated within this batch.
+    # An id stored for another user or event is a client bug, not a retry.
+    stored = {
+        log_id: (str(user_id), log_event_id)
+        for log_id, user_id, log_event_id in db.session.query(
+            WasteLog.id, WasteLog.user_id, WasteLog.event_id
+        ).filter(WasteLog.id.in_([row['id'] for _, row in rows]))
+    } if rows else {}
+    seen = set()
+    new_rows = []
+    for result_index, row in rows:
+        owner = stored.get(row['id'])
+        if owner is not None and owner != (current_user_id, event_id):
+            results[result_index].update(status='conflict', error='id belongs to another waste log')
+            continue
+        if owner is not None or row['id'] in seen:
+            results[result_index]['status'] = 'duplicate'
+            continue
+        seen.add(row['id'])
+        row.update(event_id=event_id, user_id=current_user_id)
+        new_rows.append(row)
+    
+    try:
+        if new_rows:
+            db.session.execute(insert(WasteLog), new_rows)
+            
+            # Apply rollup and stats deltas once per waste type rather than per row
+            by_type = {}
+            for row in new_rows:
+                quantity, count = by_type.get(row['waste_type'], (Decimal(0), 0))
+                by_type[row['waste_type']] = (quantity + row['quantity'], count + 1)
+            for waste_type, (quantity, count) in by_type.items():
+                waste_rollup_service.apply_delta(event_id, waste_type, quantity, count)
+            user_stats_service.waste_logs_created(
+                current_user_id, event_id,
+                sum(quantity for quantity, _ in by_type.values()),
+                len(new_rows)
+            )
+        db.session.commit()
+        
+    except IntegrityError:
+        db.session.rollback()
+        return jsonify({'error': 'Conflicting upload in progress, retry the batch'}), 409
+    except Exception as e:
+        db.session.rollback()
+        return jsonify({'error': str(e)}), 500
+    
+    return jsonify({
+        'created': len(new_rows),
+        'results': results
+    }), 200
+
 @waste_logs_bp.route('/<uuid:log_id>', methods=['PUT'])
 @jwt_required()
 def update_waste_log(log_id):
@@ -79,6 +225,7 @@ def update_waste_log(log_id):
         return jsonify({'error': 'Can only update your own waste logs'}), 403
     
     data = request.get_json()
+    old_type, old_quantity = waste_log.waste_type, waste_log.quantity
     
     try:
         if 'wasteType' in data:
@@ -90,6 +237,11 @@ def update_waste_log(log_id):
         if 'notes' in data:
             waste_log.notes = data['notes']
         
+        waste_rollup_service.log_updated(
+            waste_log.event_id, old_type, old_quantity,
+            waste_log.waste_type, waste_log.quantity
+        )
+        user_stats_service.waste_log_updated(waste_log, old_quantity)
         db.session.commit()
         return jsonify(waste_log.to_dict()), 200
         
@@ -108,6 +260,8 @@ def delete_waste_log(log_id):
     
     try:
         db.session.delete(waste_log)
+        waste_rollup_service.log_deleted(waste_log)
+        user_stats_service.waste_log_deleted(waste_log)
         db.session.commit()
         return jsonify({'message': 'Waste log deleted successfully'}), 200
         
@@ -115,7 +269,90 @@ def delete_waste_log(log_id):
         db.session.rollback()
         return jsonify({'error': str(e)}), 500
 
-@waste_logs_bp.route('/event/<uuid:event_id>/analytics', methods=['GET'])
+EXPORT_COLUMNS = ['id', 'event_id', 'user_id', 'waste_type', 'quantity', 'unit', 'notes', 'created_at', 'updated_at']
+EXPORT_BATCH_SIZE = 1000
+
+def _export_value(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    if hasattr(value, 'isoformat'):
+        return value.isoformat()
+    return value
+
+def _export_csv(rows):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_COLUMNS)
+    for row in rows:
+        writer.writerow([_export_value(value) for value in row])
+        # Flush every row so only one line is ever held in memory
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    yield buffer.getvalue()
+
+def _export_ndjson(rows):
+    encode = serializers.row_encoder(EXPORT_COLUMNS)
+    for row in rows:
+        yield dumps(encode(row)) + b'\n'
+
+@waste_logs_bp.route('/export', methods=['GET'])
+@jwt_required()
+def export_waste_logs():
+    """
+    Stream waste logs for the current organizer's events as CSV or NDJSON.
+    Query params: format (csv|ndjson), event_id, date_from, date_to.
+    A date-only date_to includes the whole day.
+    """
+    current_user_id = get_jwt_identity()
+    export_format = request.args.get('format', 'csv')
+    if export_format not in ('csv', 'ndjson'):
+        return jsonify({'error': 'format must be csv or ndjson'}), 400
+    
+    try:
+        event_id = int(request.args['event_id']) if request.args.get('event_id') else None
+        date_from = request.args.get('date_from')
+        date_to = request.args.get('date_to')
+        date_from = datetime.fromisoformat(date_from) if date_from else None
+        # A bare date means "through the end of that day"
+        date_to_day = date_to is not None and len(date_to) == 10
+        date_to = datetime.fromisoformat(date_to) if date_to else None
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    
+    query = db.session.query(
+        *[getattr(WasteLog, column) for column in EXPORT_COLUMNS]
+    ).join(Event, Event.id == WasteLog.event_id).filter(
+        Event.organizer_id == current_user_id
+    )
+    if event_id:
+        query = query.filter(WasteLog.event_id == event_id)
+    if date_from:
+        query = query.filter(WasteLog.created_at >= date_from)
+    if date_to_day:
+        query = query.filter(WasteLog.created_at < date_to + timedelta(days=1))
+    elif date_to:
+        query = query.filter(WasteLog.created_at <= date_to)
+    
+    # Server-side cursor: rows are fetched EXPORT_BATCH_SIZE at a time while streaming
+    rows = query.order_by(WasteLog.created_at, WasteLog.id).execution_options(
+        yield_per=EXPORT_BATCH_SIZE
+    )
+    
+    if export_format == 'csv':
+        body, mimetype = _export_csv(rows), 'text/csv'
+    else:
+        body, mimetype = _export_ndjson(rows), 'application/x-ndjson'
+    
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename=waste_logs.{export_format}'}
+    )
+
+@waste_logs_bp.route('/event/<int:event_id>/analytics', methods=['GET'])
 @jwt_required()
 def get_event_waste_analytics(event_id):
     current_user_id = get_jwt_identity()
@@ -124,19 +361,13 @@ def get_event_waste_analytics(event_id):
     if str(event.organizer_id) != current_user_id:
         return jsonify({'error': 'Only event organizers can view analytics'}), 403
     
-    waste_logs = WasteLog.query.filter_by(event_id=event_id).all()
-    
-    # Calculate analytics
-    total_waste = sum(float(log.quantity) for log in waste_logs)
-    waste_by_type = {}
-    for log in waste_logs:
-        if log.waste_type not in waste_by_type:
-            waste_by_type[log.waste_type] = 0
-        waste_by_type[log.waste_type] += float(log.quantity)
+    # Read the maintained rollups: one row per waste type
+    totals = waste_rollup_service.get_event_totals(event_id)
+    waste_by_type = {row.waste_type: float(row.total_quantity) for row in totals}
     
     return jsonify({
-        'totalWaste': total_waste,
+        'totalWaste': sum(waste_by_type.values()),
         'wasteByType': waste_by_type,
-        'totalLogs': len(waste_logs)
+        'totalLogs': sum(row.log_count for row in totals)
     }), 200 
  
\ No newline at end of file
@@ -1,64 +1,213 @@
--- Enable UUID extension
-CREATE EXTENSION IF NOT EXISTS "uuid-ossp";
+-- Generated from the SQLAlchemy models by `flask dump-schema`; do not edit by hand.
+
+CREATE TABLE collection_versions (
+	name VARCHAR(50) NOT NULL, 
+	version INTEGER NOT NULL, 
+	updated_at TIMESTAMP WITHOUT TIME ZONE, 
+	PRIMARY KEY (name)
+);
+
+CREATE TABLE tag_counts (
+	tag VARCHAR(50) NOT NULL, 
+	event_count INTEGER NOT NULL, 
+	PRIMARY KEY (tag)
+);
+
+CREATE INDEX ix_tag_counts_event_count ON tag_counts (event_count);
 
--- Users table
 CREATE TABLE users (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    full_name VARCHAR(50) NOT NULL,
-    email VARCHAR(255) UNIQUE NOT NULL,
-    password_hash VARCHAR(255) NOT NULL,
-    user_type VARCHAR(20) NOT NULL CHECK (user_type IN ('volunteer', 'organizer')),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+	id SERIAL NOT NULL, 
+	email VARCHAR(255) NOT NULL, 
+	password_hash VARCHAR(255) NOT NULL, 
+	full_name VARCHAR(50) NOT NULL, 
+	user_type VARCHAR(20) NOT NULL, 
+	created_at TIMESTAMP WITHOUT TIME ZONE, 
+	updated_at TIMESTAMP WITHOUT TIME ZONE, 
+	is_active BOOLEAN, 
+	is_verified BOOLEAN, 
+	PRIMARY KEY (id), 
+	UNIQUE (email)
 );
 
--- Events table
+CREATE INDEX ix_users_id ON users (id);
+
 CREATE TABLE events (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    title VARCHAR(100) NOT NULL,
-    description TEXT NOT NULL,
-    location VARCHAR(100) NOT NULL,
-    date DATE NOT NULL,
-    time TIME NOT NULL,
-    organizer_id UUID NOT NULL REFERENCES users(id),
-    what_to_bring TEXT[] NOT NULL,
-    safety_protocols TEXT[] NOT NULL,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+	id SERIAL NOT NULL, 
+	title VARCHAR(255) NOT NULL, 
+	description TEXT NOT NULL, 
+	location VARCHAR(255) NOT NULL, 
+	latitude FLOAT, 
+	longitude FLOAT, 
+	geohash VARCHAR(12), 
+	date DATE NOT NULL, 
+	time_start TIME WITHOUT TIME ZONE NOT NULL, 
+	time_end TIME WITHOUT TIME ZONE NOT NULL, 
+	city VARCHAR(100) NOT NULL, 
+	state VARCHAR(100) NOT NULL, 
+	created_at TIMESTAMP WITHOUT TIME ZONE, 
+	updated_at TIMESTAMP WITHOUT TIME ZONE, 
+	organizer_id INTEGER, 
+	what_to_bring JSON NOT NULL, 
+	safety_protocols JSON NOT NULL, 
+	tags JSON, 
+	max_participants INTEGER, 
+	participant_count INTEGER DEFAULT '0' NOT NULL, 
+	is_active BOOLEAN, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(organizer_id) REFERENCES users (id)
+);
+
+CREATE INDEX ix_events_active_date_id ON events (is_active, date, id);
+
+CREATE INDEX ix_events_city_state ON events (city, state);
+
+CREATE INDEX ix_events_geohash ON events (geohash);
+
+CREATE INDEX ix_events_id ON events (id);
+
+CREATE INDEX ix_events_lat_lon ON events (latitude, longitude);
+
+CREATE TABLE leaderboard_entries (
+	scope VARCHAR(10) NOT NULL, 
+	scope_key VARCHAR(100) NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	total_waste NUMERIC(14, 2) NOT NULL, 
+	log_count INTEGER NOT NULL, 
+	PRIMARY KEY (scope, scope_key, user_id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE INDEX ix_leaderboard_entries_rank ON leaderboard_entries (scope, scope_key, total_waste);
+
+CREATE TABLE user_stats (
+	user_id INTEGER NOT NULL, 
+	events_attended INTEGER NOT NULL, 
+	events_created INTEGER NOT NULL, 
+	volunteers_hosted INTEGER NOT NULL, 
+	waste_log_count INTEGER NOT NULL, 
+	total_waste NUMERIC(14, 2) NOT NULL, 
+	updated_at TIMESTAMP WITH TIME ZONE, 
+	PRIMARY KEY (user_id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE TABLE event_participants (
+	event_id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	PRIMARY KEY (event_id, user_id), 
+	FOREIGN KEY(event_id) REFERENCES events (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
 );
 
--- Event registrations table
 CREATE TABLE event_registrations (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    event_id UUID NOT NULL REFERENCES events(id),
-    user_id UUID NOT NULL REFERENCES users(id),
-    status VARCHAR(20) NOT NULL DEFAULT 'registered' CHECK (status IN ('registered', 'attended', 'cancelled')),
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    UNIQUE(event_id, user_id)
+	id SERIAL NOT NULL, 
+	event_id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	status VARCHAR(20) NOT NULL, 
+	created_at TIMESTAMP WITHOUT TIME ZONE, 
+	updated_at TIMESTAMP WITHOUT TIME ZONE, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(event_id) REFERENCES events (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE INDEX ix_event_registrations_id ON event_registrations (id);
+
+CREATE TABLE event_tags (
+	event_id INTEGER NOT NULL, 
+	tag VARCHAR(50) NOT NULL, 
+	PRIMARY KEY (event_id, tag), 
+	FOREIGN KEY(event_id) REFERENCES events (id)
+);
+
+CREATE INDEX ix_event_tags_tag_event ON event_tags (tag, event_id);
+
+CREATE TABLE event_waitlist (
+	id SERIAL NOT NULL, 
+	event_id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	created_at TIMESTAMP WITHOUT TIME ZONE, 
+	PRIMARY KEY (id), 
+	CONSTRAINT uq_event_waitlist_event_user UNIQUE (event_id, user_id), 
+	FOREIGN KEY(event_id) REFERENCES events (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+CREATE INDEX ix_event_waitlist_event_order ON event_waitlist (event_id, id);
+
+CREATE TABLE event_waste_totals (
+	event_id INTEGER NOT NULL, 
+	waste_type VARCHAR(50) NOT NULL, 
+	total_quantity NUMERIC(14, 2) NOT NULL, 
+	log_count INTEGER NOT NULL, 
+	updated_at TIMESTAMP WITH TIME ZONE, 
+	PRIMARY KEY (event_id, waste_type), 
+	FOREIGN KEY(event_id) REFERENCES events (id)
 );
 
--- Waste logs table
+CREATE TABLE geocoding_jobs (
+	id SERIAL NOT NULL, 
+	event_id INTEGER NOT NULL, 
+	address VARCHAR(512) NOT NULL, 
+	status VARCHAR(20) NOT NULL, 
+	attempts INTEGER NOT NULL, 
+	last_error TEXT, 
+	locked_at TIMESTAMP WITHOUT TIME ZONE, 
+	created_at TIMESTAMP WITHOUT TIME ZONE, 
+	updated_at TIMESTAMP WITHOUT TIME ZONE, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(event_id) REFERENCES events (id)
+);
+
+CREATE INDEX ix_geocoding_jobs_event_id ON geocoding_jobs (event_id);
+
+CREATE INDEX ix_geocoding_jobs_status ON geocoding_jobs (status);
+
+CREATE TABLE social_post_jobs (
+	id UUID NOT NULL, 
+	event_id INTEGER NOT NULL, 
+	status VARCHAR(20) NOT NULL, 
+	input_hash VARCHAR(64), 
+	post TEXT, 
+	error TEXT, 
+	locked_at TIMESTAMP WITH TIME ZONE, 
+	run_after TIMESTAMP WITH TIME ZONE, 
+	attempts INTEGER NOT NULL, 
+	created_at TIMESTAMP WITH TIME ZONE, 
+	updated_at TIMESTAMP WITH TIME ZONE, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(event_id) REFERENCES events (id)
+);
+
+CREATE INDEX ix_social_post_jobs_event_id ON social_post_jobs (event_id);
+
+CREATE INDEX ix_social_post_jobs_status ON social_post_jobs (status);
+
 CREATE TABLE waste_logs (
-    id UUID PRIMARY KEY DEFAULT uuid_generate_v4(),
-    event_id UUID NOT NULL REFERENCES events(id),
-    user_id UUID NOT NULL REFERENCES users(id),
-    waste_type VARCHAR(50) NOT NULL,
-    quantity DECIMAL(10,2) NOT NULL,
-    unit VARCHAR(20) NOT NULL,
-    notes TEXT,
-    created_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP,
-    updated_at TIMESTAMP WITH TIME ZONE DEFAULT CURRENT_TIMESTAMP
+	id UUID NOT NULL, 
+	event_id INTEGER NOT NULL, 
+	user_id INTEGER NOT NULL, 
+	waste_type VARCHAR(50) NOT NULL, 
+	quantity NUMERIC(10, 2) NOT NULL, 
+	unit VARCHAR(20) NOT NULL, 
+	notes TEXT, 
+	created_at TIMESTAMP WITH TIME ZONE, 
+	updated_at TIMESTAMP WITH TIME ZONE, 
+	PRIMARY KEY (id), 
+	FOREIGN KEY(event_id) REFERENCES events (id), 
+	FOREIGN KEY(user_id) REFERENCES users (id)
+);
+
+-- Full-text search documents, created alongside the events table
+
+CREATE TABLE IF NOT EXISTS event_search (
+    event_id INTEGER PRIMARY KEY REFERENCES events(id),
+    document TSVECTOR NOT NULL
 );
 
--- Create indexes for better query performance
-CREATE INDEX idx_events_organizer_id ON events(organizer_id);
-CREATE INDEX idx_event_registrations_event_id ON event_registrations(event_id);
-CREATE INDEX idx_event_registrations_user_id ON event_registrations(user_id);
-CREATE INDEX idx_waste_logs_event_id ON waste_logs(event_id);
-CREATE INDEX idx_waste_logs_user_id ON waste_logs(user_id);
+CREATE INDEX IF NOT EXISTS idx_event_search_document ON event_search USING GIN (document);
 
--- Create function to update updated_at timestamp
+-- Keep updated_at current for writes that bypass the ORM
 CREATE OR REPLACE FUNCTION update_updated_at_column()
 RETURNS TRIGGER AS $$
 BEGIN
@@ -67,7 +216,11 @@ BEGIN
 END;
 $$ language 'plpgsql';
 
--- Create triggers for updated_at
+CREATE TRIGGER update_collection_versions_updated_at
+    BEFORE UPDATE ON collection_versions
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_users_updated_at
     BEFORE UPDATE ON users
     FOR EACH ROW
@@ -78,11 +231,31 @@ CREATE TRIGGER update_events_updated_at
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_user_stats_updated_at
+    BEFORE UPDATE ON user_stats
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_event_registrations_updated_at
     BEFORE UPDATE ON event_registrations
     FOR EACH ROW
     EXECUTE FUNCTION update_updated_at_column();
 
+CREATE TRIGGER update_event_waste_totals_updated_at
+    BEFORE UPDATE ON event_waste_totals
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_geocoding_jobs_updated_at
+    BEFORE UPDATE ON geocoding_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
+CREATE TRIGGER update_social_post_jobs_updated_at
+    BEFORE UPDATE ON social_post_jobs
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+
 CREATE TRIGGER update_waste_logs_updated_at
     BEFORE UPDATE ON waste_logs
     FOR EACH ROW
@@ -1,51 +1,123 @@
 from geopy.geocoders import Nominatim
 from geopy.exc import GeocoderTimedOut, GeocoderUnavailable
+import fcntl
+import logging
+import os
+import tempfile
 import time
+from utils.cache import create_cache, MISSING
+from services.metrics_service import metrics_service
+
+logger = logging.getLogger(__name__)
+
+class RateLimiter:
+    """
+    Cross-process rate limiter backed by a lock file.
+    Every worker on the host shares the timestamp of the last call, so the
+    combined request rate never exceeds one call per `min_interval` seconds.
+    """
+
+    def __init__(self, min_interval, lock_path):
+        self.min_interval = min_interval
+        self.lock_path = lock_path
+
+    def wait(self):
+        with open(self.lock_path, 'a+') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                lock_file.seek(0)
+                content = lock_file.read().strip()
+                last_call = float(content) if content else 0.0
+                delay = last_call + self.min_interval - time.time()
+                if delay > 0:
+                    time.sleep(delay)
+                lock_file.seek(0)
+                lock_file.truncate()
+                lock_file.write(str(time.time()))
+                lock_file.flush()
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+
+def normalize_address(address):
+    """Normalize an address into a cache key: lowercase, single spaces, tidy commas."""
+    parts = [' '.join(part.split()) for part in address.lower().split(',')]
+    return ', '.join(part for part in parts if part)
 
 class GeocodingService:
     def __init__(self):
         self.geocoder = Nominatim(user_agent="cleanwave_app")
-        self.cache = {}  # Simple cache to avoid repeated lookups
+        # Shared, bounded cache so restarts and sibling workers reuse earlier lookups
+        backend = os.getenv('GEOCODING_CACHE_BACKEND', 'sqlite')
+        cache_path = os.getenv(
+            'GEOCODING_CACHE_PATH',
+            os.path.join(tempfile.gettempdir(), 'cleanwave_geocoding_cache.sqlite3')
+        )
+        max_entries = int(os.getenv('GEOCODING_CACHE_MAX_ENTRIES', '50000'))
+        self.cache_ttl = int(os.getenv('GEOCODING_CACHE_TTL', str(30 * 24 * 3600)))
+        self.negative_cache_ttl = int(os.getenv('GEOCODING_NEGATIVE_CACHE_TTL', str(24 * 3600)))
+        self.cache = create_cache(backend, 'geocode:coordinates', max_entries, self.cache_ttl, cache_path)
+        self.components_cache = create_cache(backend, 'geocode:components', max_entries, self.cache_ttl, cache_path)
+        # Nominatim's usage policy allows at most one request per second
+        self.rate_limiter = RateLimiter(
+            min_interval=float(os.getenv('GEOCODING_MIN_INTERVAL', '1')),
+            lock_path=os.getenv(
+                'GEOCODING_RATE_LIMIT_FILE',
+                os.path.join(tempfile.gettempdir(), 'cleanwave_geocoding.lock')
+            )
+        )
 
-    def get_coordinates(self, address):
+    def _cached_geocode(self, cache, address, extract, **kwargs):
         """
-        Get latitude and longitude for an address.
-        Returns (latitude, longitude) tuple or None if geocoding fails.
+        Look an address up through the cache.
+        Addresses Nominatim cannot resolve are cached as None for the shorter
+        negative TTL; timeouts and outages are not cached so they are retried.
         """
-        # Check cache first
-        if address in self.cache:
-            return self.cache[address]
+        key = normalize_address(address)
+        cached = cache.get(key)
+        metrics_service.record_cache('geocoding', cached is not MISSING)
+        if cached is not MISSING:
+            return cached
 
         try:
-            # Add delay to respect Nominatim's usage policy
-            time.sleep(1)
-            
-            location = self.geocoder.geocode(address)
-            if location:
-                coordinates = (location.latitude, location.longitude)
-                self.cache[address] = coordinates
-                return coordinates
-            return None
+            # Respect Nominatim's usage policy across all workers
+            self.rate_limiter.wait()
+
+            with metrics_service.timed('geocoding', 'geocode'):
+                location = self.geocoder.geocode(address, **kwargs)
+            result = extract(location) if location else None
         except (GeocoderTimedOut, GeocoderUnavailable) as e:
-            print(f"Geocoding error for {address}: {str(e)}")
+            logger.warning("Geocoding error for %s: %s", address, e)
             return None
 
+        if result is None:
+            cache.set(key, None, ttl=self.negative_cache_ttl)
+        else:
+            cache.set(key, result)
+        return result
+
+    def get_coordinates(self, address):
+        """
+        Get latitude and longitude for an address.
+        Returns (latitude, longitude) tuple or None if geocoding fails.
+        """
+        coordinates = self._cached_geocode(
+            self.cache,
+            address,
+            lambda location: [location.latitude, location.longitude]
+        )
+        return tuple(coordinates) if coordinates else None
+
     def get_address_components(self, address):
         """
         Get detailed address components (city, state, etc.) from an address.
         Returns a dictionary with address components or None if geocoding fails.
         """
-        try:
-            # Add delay to respect Nominatim's usage policy
-            time.sleep(1)
-            
-            location = self.geocoder.geocode(address, addressdetails=True)
-            if location and location.raw.get('address'):
-                return location.raw['address']
-            return None
-        except (GeocoderTimedOut, GeocoderUnavailable) as e:
-            print(f"Geocoding error for {address}: {str(e)}")
-            return None
+        return self._cached_geocode(
+            self.components_cache,
+            address,
+            lambda location: location.raw.get('address') or None,
+            addressdetails=True
+        )
 
 # Create a singleton instance
 geocoding_service = GeocodingService() 
\ No newline at end of file
@@ -0,0 +1,167 @@
+import os
+import time
+from datetime import datetime, timedelta
+from sqlalchemy import update, bindparam, exists
+from app import db
+from models.event import Event
+from models.geocoding_job import GeocodingJob
+from services.geocoding_service import geocoding_service
+from services.version_service import version_service, EVENTS_COLLECTION
+from utils.db_routing import primary_only
+
+# Core executemany keyed by event; skips events that have a newer job, whose
+# address supersedes the one these coordinates came from
+WRITE_COORDINATES = (
+    update(Event.__table__)
+    .where(
+        Event.id == bindparam('event_id'),
+        ~exists().where(GeocodingJob.event_id == Event.id, GeocodingJob.id > bindparam('job_id'))
+    )
+    .values(
+        latitude=bindparam('new_latitude'),
+        longitude=bindparam('new_longitude'),
+        geohash=bindparam('new_geohash')
+    )
+)
+
+class GeocodingWorker:
+    """
+    Drains the geocoding_jobs queue outside of the request cycle.
+    Request handlers only enqueue addresses; coordinates are written back in bulk.
+    A job left running longer than GEOCODING_LEASE_SECONDS, e.g. by a worker
+    that died, goes back to the queue or fails once out of attempts.
+    """
+
+    def __init__(self):
+        self.batch_size = int(os.getenv('GEOCODING_BATCH_SIZE', '20'))
+        self.max_attempts = int(os.getenv('GEOCODING_MAX_ATTEMPTS', '3'))
+        self.poll_interval = float(os.getenv('GEOCODING_POLL_INTERVAL', '5'))
+        self.lease_seconds = int(os.getenv('GEOCODING_LEASE_SECONDS', '300'))
+
+    @staticmethod
+    def format_address(location, city, state):
+        return f"{location}, {city}, {state}"
+
+    def enqueue(self, event_id, address):
+        """
+        Queue an address for geocoding, superseding any pending job for the event.
+        The caller is responsible for committing.
+        """
+        GeocodingJob.query.filter_by(event_id=event_id, status='pending').delete(
+            synchronize_session=False
+        )
+        job = GeocodingJob(event_id=event_id, address=address)
+        db.session.add(job)
+        return job
+
+    def _requeue_expired(self):
+        """Return running jobs whose lease has expired to the queue, counting the lost attempt."""
+        expired = (
+            GeocodingJob.status == 'running',
+            GeocodingJob.locked_at < datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+        )
+        db.session.execute(
+            update(GeocodingJob)
+            .where(*expired, GeocodingJob.attempts >= self.max_attempts)
+            .values(status='failed', locked_at=None, last_error='Lease expired')
+            .execution_options(synchronize_session=False)
+        )
+        db.session.execute(
+            update(GeocodingJob)
+            .where(*expired)
+            .values(status='pending', locked_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _claim_batch(self):
+        """Lock a batch of pending jobs so concurrent workers don't process the same rows."""
+        self._requeue_expired()
+        jobs = primary_only(
+            GeocodingJob.query
+            .filter_by(status='pending')
+            .order_by(GeocodingJob.id)
+            .limit(self.batch_size)
+            .with_for_update(skip_locked=True)
+        ).all()
+        now = datetime.utcnow()
+        for job in jobs:
+            job.status = 'running'
+            job.attempts += 1
+            job.locked_at = now
+        db.session.commit()
+        return jobs
+
+    def run_once(self):
+        """
+        Process a single batch of jobs.
+        Returns the number of jobs claimed.
+        """
+        jobs = self._claim_batch()
+        if not jobs:
+            return 0
+
+        coordinates = []
+        for job in jobs:
+            try:
+                result = geocoding_service.get_coordinates(job.address)
+            except Exception as e:
+                result = None
+                job.last_error = str(e)
+
+            if result:
+                latitude, longitude = result
+                coordinates.append({
+                    'event_id': job.event_id,
+                    'job_id': job.id,
+                    'new_latitude': latitude,
+                    'new_longitude': longitude,
+                    'new_geohash': Event.compute_geohash(latitude, longitude)
+                })
+                job.status = 'done'
+            elif job.attempts >= self.max_attempts:
+                job.status = 'failed'
+            else:
+                job.status = 'pending'
+            job.locked_at = None
+
+        # Bulk update in a single executemany
+        if coordinates:
+            db.session.execute(WRITE_COORDINATES, coordinates)
+            version_service.bump(EVENTS_COLLECTION)
+        db.session.commit()
+        return len(jobs)
+
+    def rebuild_geohashes(self, batch_size=1000):
+        """
+        Backfill Event.geohash from stored coordinates.
+        Returns the number of events updated.
+        """
+        updated = 0
+        last_id = 0
+        while True:
+            rows = (
+                db.session.query(Event.id, Event.latitude, Event.longitude)
+                .filter(Event.id > last_id)
+                .order_by(Event.id)
+                .limit(batch_size)
+                .all()
+            )
+            if not rows:
+                break
+            db.session.execute(update(Event), [{
+                'id': row.id,
+                'geohash': Event.compute_geohash(row.latitude, row.longitude)
+            } for row in rows])
+            db.session.commit()
+            updated += len(rows)
+            last_id = rows[-1].id
+        return updated
+
+    def run_forever(self):
+        """Poll the queue until interrupted."""
+        while True:
+            if self.run_once() == 0:
+                time.sleep(self.poll_interval)
+
+# Create a singleton instance
+geocoding_worker = GeocodingWorker()
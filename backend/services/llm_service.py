@@ -1,15 +1,60 @@
 import os
+import httpx
 import openai
 import boto3
 from botocore.config import Config
 from dotenv import load_dotenv
 import json
+import hashlib
+import tempfile
+import threading
+from contextlib import contextmanager
+from utils.cache import create_cache, MISSING
+from utils.singleflight import SingleFlight
+from services.metrics_service import metrics_service
 
 load_dotenv()
 
+class LLMOverloadedError(Exception):
+    """Raised when no LLM slot is available; callers should answer 503."""
+
+class ConcurrencyLimiter:
+    """
+    Caps concurrent provider calls. Callers beyond the limit wait in a bounded
+    queue for up to `queue_timeout` seconds; when the queue is full they fail fast.
+    """
+
+    def __init__(self, max_concurrency, max_queue, queue_timeout):
+        self.max_queue = max_queue
+        self.queue_timeout = queue_timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrency)
+        self._lock = threading.Lock()
+        self._waiting = 0
+
+    @contextmanager
+    def slot(self):
+        if not self._semaphore.acquire(blocking=False):
+            with self._lock:
+                if self._waiting >= self.max_queue:
+                    raise LLMOverloadedError('Too many pending LLM requests')
+                self._waiting += 1
+            try:
+                acquired = self._semaphore.acquire(timeout=self.queue_timeout)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+            if not acquired:
+                raise LLMOverloadedError('Timed out waiting for an LLM slot')
+        try:
+            yield
+        finally:
+            self._semaphore.release()
+
 class LLMService:
     def __init__(self):
         self.provider = os.getenv('LLM_PROVIDER', 'LOCAL')
+        self.connect_timeout = float(os.getenv('LLM_CONNECT_TIMEOUT', '5'))
+        self.read_timeout = float(os.getenv('LLM_READ_TIMEOUT', '60'))
         
         if self.provider == 'BEDROCK':
             # Initialize Bedrock client
@@ -18,15 +63,73 @@ class LLMService:
                 region_name=os.getenv('AWS_REGION'),
                 aws_access_key_id=os.getenv('AWS_ACCESS_KEY_ID'),
                 aws_secret_access_key=os.getenv('AWS_SECRET_ACCESS_KEY'),
-                config=Config(retries={'max_attempts': 3})
+                config=Config(
+                    retries={'max_attempts': 3},
+                    connect_timeout=self.connect_timeout,
+                    read_timeout=self.read_timeout
+                )
             )
             self.model_id = os.getenv('BEDROCK_MODEL_ID', 'anthropic.claude-3-sonnet-20240229-v1:0')
         else:
             # Initialize OpenAI client for LM Studio
-            openai.api_base = os.getenv('LLM_API_BASE', 'http://localhost:1234/v1')
-            openai.api_key = os.getenv('LLM_API_KEY', 'not-needed')
+            self.openai = openai.OpenAI(
+                base_url=os.getenv('LLM_API_BASE', 'http://localhost:1234/v1'),
+                api_key=os.getenv('LLM_API_KEY', 'not-needed'),
+                timeout=httpx.Timeout(self.read_timeout, connect=self.connect_timeout)
+            )
+            self.model_id = 'local-model'  # This will be ignored by LM Studio
+
+        # Response cache shared by all workers
+        self.cache = create_cache(
+            os.getenv('LLM_CACHE_BACKEND', 'sqlite'),
+            'llm:responses',
+            int(os.getenv('LLM_CACHE_MAX_ENTRIES', '5000')),
+            int(os.getenv('LLM_CACHE_TTL', '3600')),
+            os.getenv('LLM_CACHE_PATH', os.path.join(tempfile.gettempdir(), 'cleanwave_llm_cache.sqlite3'))
+        )
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self._stats_lock = threading.Lock()
+
+        # Per-provider concurrency cap and coalescing of identical in-flight calls
+        self.limiter = ConcurrencyLimiter(
+            max_concurrency=int(os.getenv(
+                f'LLM_MAX_CONCURRENCY_{self.provider}', os.getenv('LLM_MAX_CONCURRENCY', '4')
+            )),
+            max_queue=int(os.getenv('LLM_MAX_QUEUE', '16')),
+            queue_timeout=float(os.getenv('LLM_QUEUE_TIMEOUT', '2'))
+        )
+        self.single_flight = SingleFlight()
+
+    def _cache_key(self, prompt, system_prompt, temperature, max_tokens, context_version):
+        payload = json.dumps(
+            [self.provider, self.model_id, system_prompt, prompt, temperature, max_tokens, context_version],
+            separators=(',', ':')
+        )
+        return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+    def _cache_lookup(self, key):
+        cached = self.cache.get(key)
+        with self._stats_lock:
+            if cached is MISSING:
+                self.cache_misses += 1
+            else:
+                self.cache_hits += 1
+        metrics_service.record_cache('llm', cached is not MISSING)
+        return cached
 
-    def generate_text(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1000):
+    def cache_stats(self):
+        """Return this process's response cache hit/miss counters."""
+        with self._stats_lock:
+            lookups = self.cache_hits + self.cache_misses
+            return {
+                'hits': self.cache_hits,
+                'misses': self.cache_misses,
+                'hit_rate': self.cache_hits / lookups if lookups else 0.0
+            }
+
+    def generate_text(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1000,
+                      context_version=None, use_cache=True):
         """
         Generate text using either Bedrock or LM Studio based on configuration.
         
@@ -35,17 +138,73 @@ class LLMService:
             system_prompt (str, optional): System prompt for the model
             temperature (float): Controls randomness (0.0 to 1.0)
             max_tokens (int): Maximum number of tokens to generate
+            context_version (str, optional): Version of the data behind the prompt,
+                e.g. an event's updated_at; changing it invalidates cached responses
+            use_cache (bool): Whether to serve and store responses through the cache
             
         Returns:
             str: Generated text response
         """
-        try:
-            if self.provider == 'BEDROCK':
-                return self._generate_with_bedrock(prompt, system_prompt, temperature, max_tokens)
-            else:
-                return self._generate_with_lm_studio(prompt, system_prompt, temperature, max_tokens)
-        except Exception as e:
-            raise Exception(f"Error generating text with {self.provider}: {str(e)}")
+        key = self._cache_key(prompt, system_prompt, temperature, max_tokens, context_version)
+        if use_cache:
+            cached = self._cache_lookup(key)
+            if cached is not MISSING:
+                return cached
+
+        def call_provider():
+            with self.limiter.slot():
+                try:
+                    with metrics_service.timed('llm', 'generate'):
+                        if self.provider == 'BEDROCK':
+                            text = self._generate_with_bedrock(prompt, system_prompt, temperature, max_tokens)
+                        else:
+                            text = self._generate_with_lm_studio(prompt, system_prompt, temperature, max_tokens)
+                except Exception as e:
+                    raise Exception(f"Error generating text with {self.provider}: {str(e)}")
+            if use_cache:
+                self.cache.set(key, text)
+            return text
+
+        # Identical requests already in flight share one provider call
+        return self.single_flight.do(key, call_provider)
+
+    def stream_text(self, prompt, system_prompt=None, temperature=0.7, max_tokens=1000,
+                    context_version=None, use_cache=True):
+        """
+        Generate text as a stream of chunks, yielding each as soon as the provider sends it.
+        A cached response is yielded as a single chunk; a completed stream is cached.
+        The provider slot is held until the stream finishes; LLMOverloadedError is
+        raised on the first iteration when no slot is available.
+        
+        Args are the same as generate_text.
+            
+        Returns:
+            generator: Yields str chunks of the response
+        """
+        if use_cache:
+            key = self._cache_key(prompt, system_prompt, temperature, max_tokens, context_version)
+            cached = self._cache_lookup(key)
+            if cached is not MISSING:
+                yield cached
+                return
+
+        chunks = []
+        with self.limiter.slot():
+            try:
+                # Times the whole stream, including the client reading it
+                with metrics_service.timed('llm', 'stream'):
+                    if self.provider == 'BEDROCK':
+                        stream = self._stream_with_bedrock(prompt, system_prompt, temperature, max_tokens)
+                    else:
+                        stream = self._stream_with_lm_studio(prompt, system_prompt, temperature, max_tokens)
+                    for chunk in stream:
+                        chunks.append(chunk)
+                        yield chunk
+            except Exception as e:
+                raise Exception(f"Error generating text with {self.provider}: {str(e)}")
+
+        if use_cache:
+            self.cache.set(key, ''.join(chunks))
 
     def _generate_with_bedrock(self, prompt, system_prompt, temperature, max_tokens):
         """Generate text using Amazon Bedrock."""
@@ -76,8 +235,8 @@ class LLMService:
             messages.append({"role": "system", "content": system_prompt})
         messages.append({"role": "user", "content": prompt})
 
-        response = openai.ChatCompletion.create(
-            model="local-model",  # This will be ignored by LM Studio
+        response = self.openai.chat.completions.create(
+            model=self.model_id,
             messages=messages,
             temperature=temperature,
             max_tokens=max_tokens
@@ -85,5 +244,57 @@ class LLMService:
         
         return response.choices[0].message.content
 
+    def _stream_with_bedrock(self, prompt, system_prompt, temperature, max_tokens):
+        """Stream text deltas from Amazon Bedrock."""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        body = {
+            "anthropic_version": "bedrock-2023-05-31",
+            "max_tokens": max_tokens,
+            "temperature": temperature,
+            "messages": messages
+        }
+
+        response = self.bedrock.invoke_model_with_response_stream(
+            modelId=self.model_id,
+            body=json.dumps(body)
+        )
+
+        for event in response['body']:
+            chunk = event.get('chunk')
+            if not chunk:
+                continue
+            payload = json.loads(chunk['bytes'])
+            if payload.get('type') == 'content_block_delta':
+                text = payload['delta'].get('text')
+                if text:
+                    yield text
+
+    def _stream_with_lm_studio(self, prompt, system_prompt, temperature, max_tokens):
+        """Stream text deltas from LM Studio."""
+        messages = []
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+        messages.append({"role": "user", "content": prompt})
+
+        response = self.openai.chat.completions.create(
+            model=self.model_id,
+            messages=messages,
+            temperature=temperature,
+            max_tokens=max_tokens,
+            stream=True
+        )
+
+        for chunk in response:
+            # Some servers send a final chunk with usage and no choices
+            if not chunk.choices:
+                continue
+            text = chunk.choices[0].delta.content
+            if text:
+                yield text
+
 # Create a singleton instance
 llm_service = LLMService() 
\ No newline at end of file
@@ -0,0 +1,120 @@
+import os
+import tempfile
+from sqlalchemy import func
+from app import db
+from models.event import Event
+from utils.cache import create_cache, MISSING
+from utils.geo import lonlat_to_tile, tile_bounds, GEOHASH_PRECISION
+
+MAX_ZOOM = 20
+# Each tile is split into GRID_SIZE x GRID_SIZE cells, so a tile never returns
+# more than GRID_SIZE ** 2 clusters
+GRID_SIZE = 8
+MAX_TILES_PER_REQUEST = 36
+
+class MapTileService:
+    """
+    Grid clustering of event coordinates per slippy-map tile.
+    Events are grouped by geohash prefix in SQL, then the groups are merged
+    into grid cells, so events without a geohash are not shown.
+    Tiles are cached in a shared backend under the events collection's
+    version stamp, so any event write retires every cached tile.
+    """
+
+    def __init__(self):
+        self.cache = create_cache(
+            os.getenv('MAP_TILE_CACHE_BACKEND', 'sqlite'),
+            'map:tiles',
+            int(os.getenv('MAP_TILE_CACHE_MAX_ENTRIES', '20000')),
+            int(os.getenv('MAP_TILE_CACHE_TTL', '86400')),
+            os.getenv(
+                'MAP_TILE_CACHE_PATH',
+                os.path.join(tempfile.gettempdir(), 'cleanwave_map_tiles.sqlite3')
+            )
+        )
+
+    @staticmethod
+    def _tile_key(version, zoom, x, y):
+        return f"{version}:{zoom}/{x}/{y}"
+
+    def tiles_for_bbox(self, min_lon, min_lat, max_lon, max_lat, zoom):
+        """
+        Return the (x, y) tiles covering a bounding box.
+        Raises ValueError if the box needs more than MAX_TILES_PER_REQUEST tiles.
+        """
+        min_x, min_y = lonlat_to_tile(min_lon, max_lat, zoom)
+        max_x, max_y = lonlat_to_tile(max_lon, min_lat, zoom)
+        count = (max_x - min_x + 1) * (max_y - min_y + 1)
+        if count > MAX_TILES_PER_REQUEST:
+            raise ValueError('Bounding box is too large for this zoom level')
+        return [(x, y) for x in range(min_x, max_x + 1) for y in range(min_y, max_y + 1)]
+
+    def get_tile(self, zoom, x, y, version):
+        """
+        Return the clusters for a single tile, computing and caching on a miss.
+        `version` is the events version stamp the caller read.
+        """
+        key = self._tile_key(version, zoom, x, y)
+        clusters = self.cache.get(key)
+        if clusters is MISSING:
+            clusters = self._compute_tile(zoom, x, y)
+            self.cache.set(key, clusters)
+        return clusters
+
+    @staticmethod
+    def _cell_precision(cell_zoom):
+        """
+        Shortest geohash whose cells are at most half a tile at cell_zoom in
+        each direction, so few of them straddle a grid cell boundary.
+        """
+        for precision in range(1, GEOHASH_PRECISION + 1):
+            # A geohash of length p spends floor(5p / 2) bits on latitude and the rest on longitude
+            if 5 * precision // 2 >= cell_zoom + 1:
+                return precision
+        return GEOHASH_PRECISION
+
+    def _compute_tile(self, zoom, x, y):
+        min_lat, max_lat, min_lon, max_lon = tile_bounds(x, y, zoom)
+
+        # Cells are the tiles GRID_SIZE levels of subdivision below this one
+        cell_zoom = zoom + GRID_SIZE.bit_length() - 1
+
+        # Pre-aggregate by geohash prefix in SQL, so a low-zoom tile reads one
+        # row per small area instead of one per event
+        prefix = func.substr(Event.geohash, 1, self._cell_precision(cell_zoom))
+        rows = db.session.query(
+            func.count(Event.id).label('count'),
+            func.avg(Event.latitude).label('latitude'),
+            func.avg(Event.longitude).label('longitude'),
+            func.min(Event.id).label('first_id')
+        ).filter(
+            Event.is_active == True,
+            Event.geohash.isnot(None),
+            Event.latitude >= min_lat,
+            Event.latitude < max_lat,
+            Event.longitude >= min_lon,
+            Event.longitude < max_lon
+        ).group_by(prefix)
+
+        cells = {}
+        for row in rows:
+            cell = lonlat_to_tile(row.longitude, row.latitude, cell_zoom)
+            entry = cells.setdefault(cell, [0, 0.0, 0.0, row.first_id])
+            entry[0] += row.count
+            entry[1] += row.latitude * row.count
+            entry[2] += row.longitude * row.count
+
+        clusters = []
+        for count, lat_sum, lon_sum, first_id in cells.values():
+            cluster = {
+                'latitude': lat_sum / count,
+                'longitude': lon_sum / count,
+                'count': count
+            }
+            if count == 1:
+                cluster['event_id'] = first_id
+            clusters.append(cluster)
+        return clusters
+
+# Create a singleton instance
+map_tile_service = MapTileService()
@@ -0,0 +1,181 @@
+import hmac
+import ipaddress
+import logging
+import os
+import time
+from contextlib import contextmanager
+from flask import g, request, has_request_context
+from prometheus_client import CollectorRegistry, Counter, Histogram, generate_latest, multiprocess
+from sqlalchemy import event
+
+logger = logging.getLogger('cleanwave.performance')
+
+SQL_QUERY_BUCKETS = (1, 2, 5, 10, 20, 50, 100, 200)
+
+# Longest SQL statement quoted in the slow request log
+MAX_LOGGED_STATEMENT = 500
+
+class MetricsService:
+    """
+    Per-request latency, SQL and external call instrumentation, rendered in
+    Prometheus text format for GET /metrics.
+
+    With PROMETHEUS_MULTIPROC_DIR set, every worker writes its samples there
+    and a scrape of any worker aggregates all of them; without it the
+    metrics cover the current process only.
+
+    A request is timed from its first before_request hook until its response
+    is closed, so SQL run while a streamed body is sent still counts.
+    Statements outside a request (workers, CLI) only feed the global totals.
+    """
+
+    def __init__(self):
+        self.slow_request_seconds = float(os.getenv('SLOW_REQUEST_MS', '500')) / 1000
+        self.multiprocess_dir = os.getenv('PROMETHEUS_MULTIPROC_DIR')
+        self.allowed_networks = [
+            ipaddress.ip_network(network.strip(), strict=False)
+            for network in os.getenv('METRICS_ALLOWED_IPS', '127.0.0.1,::1').split(',')
+            if network.strip()
+        ]
+        self.token = os.getenv('METRICS_TOKEN')
+
+        self.registry = CollectorRegistry()
+        self.request_duration = Histogram(
+            'http_request_duration_seconds', 'HTTP request latency by route',
+            ('endpoint', 'method', 'status'), registry=self.registry
+        )
+        self.request_queries = Histogram(
+            'http_request_sql_queries', 'SQL statements executed per HTTP request',
+            ('endpoint',), buckets=SQL_QUERY_BUCKETS, registry=self.registry
+        )
+        self.request_sql_duration = Histogram(
+            'http_request_sql_duration_seconds', 'Time spent in SQL per HTTP request',
+            ('endpoint',), registry=self.registry
+        )
+        self.sql_duration = Histogram(
+            'sql_statement_duration_seconds', 'Latency of individual SQL statements',
+            registry=self.registry
+        )
+        self.external_duration = Histogram(
+            'external_call_duration_seconds', 'Latency of calls to external services',
+            ('service', 'operation', 'outcome'), registry=self.registry
+        )
+        self.cache_requests = Counter(
+            'cache_requests', 'Cache lookups by cache and result', ('cache', 'result'),
+            registry=self.registry
+        )
+        self.slow_requests = Counter(
+            'http_slow_requests', 'Requests slower than SLOW_REQUEST_MS', ('endpoint',),
+            registry=self.registry
+        )
+
+    def init_app(self, app, engines):
+        """
+        Hook request timing into app and SQL timing into every engine (primary
+        and replicas). Call this before registering other request hooks, so
+        their cost is part of the measured latency.
+        """
+        app.before_request(self._before_request)
+        app.after_request(self._after_request)
+        for engine in engines:
+            event.listen(engine, 'before_cursor_execute', self._before_cursor_execute)
+            event.listen(engine, 'after_cursor_execute', self._after_cursor_execute)
+            event.listen(engine, 'handle_error', self._handle_error)
+
+    def record_cache(self, cache_name, hit):
+        self.cache_requests.labels(cache_name, 'hits' if hit else 'misses').inc()
+
+    @contextmanager
+    def timed(self, service, operation):
+        """Time a call to an external service, labelled with whether it raised."""
+        start = time.perf_counter()
+        outcome = 'error'
+        try:
+            yield
+            outcome = 'ok'
+        finally:
+            self.external_duration.labels(service, operation, outcome).observe(time.perf_counter() - start)
+
+    def _before_request(self):
+        g.metrics_started = time.perf_counter()
+        g.metrics_queries = []
+
+    def _before_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault('metrics_query_start', []).append(time.perf_counter())
+
+    def _after_cursor_execute(self, conn, cursor, statement, parameters, context, executemany):
+        duration = time.perf_counter() - conn.info['metrics_query_start'].pop()
+        self.sql_duration.observe(duration)
+        if has_request_context() and 'metrics_queries' in g:
+            g.metrics_queries.append((statement, duration))
+
+    def _handle_error(self, exception_context):
+        # A failed statement never reaches after_cursor_execute
+        connection = exception_context.connection
+        if connection is not None and connection.info.get('metrics_query_start'):
+            connection.info['metrics_query_start'].pop()
+
+    def _after_request(self, response):
+        started = g.pop('metrics_started', None)
+        if started is None:
+            return response
+        # Keep the list on g: a streamed body keeps appending to it until the response closes
+        queries = g.metrics_queries
+        endpoint = request.endpoint or 'unmatched'
+        method = request.method
+        path = request.full_path
+        status = str(response.status_code)
+
+        def finish():
+            self._finish_request(started, queries, endpoint, method, path, status)
+        response.call_on_close(finish)
+        return response
+
+    def _finish_request(self, started, queries, endpoint, method, path, status):
+        duration = time.perf_counter() - started
+        self.request_duration.labels(endpoint, method, status).observe(duration)
+        self.request_queries.labels(endpoint).observe(len(queries))
+        self.request_sql_duration.labels(endpoint).observe(sum(d for _, d in queries))
+
+        if duration >= self.slow_request_seconds:
+            self.slow_requests.labels(endpoint).inc()
+            self._log_slow_request(endpoint, method, path, duration, queries)
+
+    def _log_slow_request(self, endpoint, method, path, duration, queries):
+        lines = [
+            f"Slow request: {method} {path} ({endpoint}) took "
+            f"{duration * 1000:.1f} ms with {len(queries)} queries "
+            f"({sum(d for _, d in queries) * 1000:.1f} ms in SQL)"
+        ]
+        for statement, query_duration in sorted(queries, key=lambda q: q[1], reverse=True):
+            statement = ' '.join(statement.split())
+            if len(statement) > MAX_LOGGED_STATEMENT:
+                statement = statement[:MAX_LOGGED_STATEMENT] + '...'
+            lines.append(f"  {query_duration * 1000:8.1f} ms  {statement}")
+        logger.warning('\n'.join(lines))
+
+    def scrape_allowed(self):
+        """
+        Allow a scrape that presents METRICS_TOKEN as a bearer token, or
+        comes from an address in METRICS_ALLOWED_IPS (addresses or CIDR
+        ranges, default loopback only).
+        """
+        if self.token:
+            presented = request.headers.get('Authorization', '')
+            if hmac.compare_digest(presented.encode('utf-8'), f'Bearer {self.token}'.encode('utf-8')):
+                return True
+        try:
+            address = ipaddress.ip_address(request.remote_addr or '')
+        except ValueError:
+            return False
+        return any(address in network for network in self.allowed_networks)
+
+    def render(self):
+        if self.multiprocess_dir:
+            registry = CollectorRegistry()
+            multiprocess.MultiProcessCollector(registry)
+            return generate_latest(registry)
+        return generate_latest(self.registry)
+
+# Create a singleton instance
+metrics_service = MetricsService()
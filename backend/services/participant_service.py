@@ -0,0 +1,179 @@
+from sqlalchemy import select, update, delete, insert, func, and_
+from sqlalchemy.exc import IntegrityError
+from app import db
+from models.event import Event, event_participants
+from models.waitlist import EventWaitlistEntry
+from services.social_post_service import social_post_service
+from services.version_service import version_service, EVENTS_COLLECTION
+from utils.db_routing import primary_only
+
+class ParticipantService:
+    """
+    Maintains event participation rows together with the denormalized
+    Event.participant_count so serializers never load the participant list.
+    """
+
+    def is_participant(self, event_id, user_id):
+        """Check membership with a single indexed lookup."""
+        row = db.session.execute(
+            select(event_participants.c.event_id).where(and_(
+                event_participants.c.event_id == event_id,
+                event_participants.c.user_id == user_id
+            )).limit(1)
+        ).first()
+        return row is not None
+
+    def _reserve_seat(self, event_id, user_id):
+        """
+        Insert the participation row and take a seat with one conditional UPDATE,
+        inside a savepoint. Returns 'joined', 'already_joined' or 'full'.
+        The capacity check happens in the UPDATE's WHERE clause, which holds the
+        event row lock, so concurrent joins can never overbook.
+        """
+        savepoint = db.session.begin_nested()
+        try:
+            db.session.execute(
+                event_participants.insert().values(event_id=event_id, user_id=user_id)
+            )
+        except IntegrityError:
+            savepoint.rollback()
+            return 'already_joined'
+
+        result = db.session.execute(
+            update(Event)
+            .where(
+                Event.id == event_id,
+                Event.participant_count < Event.max_participants
+            )
+            .values(participant_count=Event.participant_count + 1)
+            .execution_options(synchronize_session=False)
+        )
+        if result.rowcount == 0:
+            savepoint.rollback()
+            return 'full'
+
+        savepoint.commit()
+        version_service.bump(EVENTS_COLLECTION)
+        # The volunteer count is part of the social post's inputs
+        social_post_service.request_pregeneration(event_id)
+        return 'joined'
+
+    def waitlist_position(self, event_id, user_id):
+        """1-based position of the user on the event's waitlist, or None."""
+        entry_id = db.session.execute(
+            select(EventWaitlistEntry.id).where(
+                EventWaitlistEntry.event_id == event_id,
+                EventWaitlistEntry.user_id == user_id
+            )
+        ).scalar()
+        if entry_id is None:
+            return None
+        return db.session.execute(
+            select(func.count()).select_from(EventWaitlistEntry).where(
+                EventWaitlistEntry.event_id == event_id,
+                EventWaitlistEntry.id <= entry_id
+            )
+        ).scalar()
+
+    def join(self, event_id, user_id):
+        """
+        Join an event, or queue on its waitlist when it is full.
+        Returns (status, waitlist_position) where status is 'joined',
+        'already_joined' or 'waitlisted'. The caller is responsible for committing.
+        """
+        status = self._reserve_seat(event_id, user_id)
+        if status != 'full':
+            return status, None
+
+        try:
+            with db.session.begin_nested():
+                db.session.execute(
+                    insert(EventWaitlistEntry).values(event_id=event_id, user_id=user_id)
+                )
+        except IntegrityError:
+            pass  # Already waitlisted; report the existing position
+        return 'waitlisted', self.waitlist_position(event_id, user_id)
+
+    def leave(self, event_id, user_id):
+        """
+        Leave an event or its waitlist, promoting waitlisted users into a freed seat.
+        Returns True if the user was a participant or waitlisted.
+        The caller is responsible for committing.
+        """
+        result = db.session.execute(
+            delete(event_participants).where(and_(
+                event_participants.c.event_id == event_id,
+                event_participants.c.user_id == user_id
+            ))
+        )
+        if result.rowcount == 0:
+            removed = db.session.execute(
+                delete(EventWaitlistEntry).where(
+                    EventWaitlistEntry.event_id == event_id,
+                    EventWaitlistEntry.user_id == user_id
+                )
+            ).rowcount
+            return removed > 0
+
+        db.session.execute(
+            update(Event)
+            .where(Event.id == event_id)
+            .values(participant_count=Event.participant_count - result.rowcount)
+            .execution_options(synchronize_session=False)
+        )
+        version_service.bump(EVENTS_COLLECTION)
+        social_post_service.request_pregeneration(event_id)
+        self.promote_waitlist(event_id)
+        return True
+
+    def promote_waitlist(self, event_id):
+        """
+        Move users from the head of the waitlist into free seats, in FIFO order.
+        Returns the number of users promoted.
+        """
+        promoted = 0
+        while True:
+            head = (
+                select(EventWaitlistEntry.id, EventWaitlistEntry.user_id)
+                .where(EventWaitlistEntry.event_id == event_id)
+                .order_by(EventWaitlistEntry.id)
+                .limit(1)
+                .with_for_update(skip_locked=True)
+            )
+            entry = db.session.execute(primary_only(head)).first()
+            if entry is None:
+                return promoted
+
+            status = self._reserve_seat(event_id, entry.user_id)
+            if status == 'full':
+                return promoted
+            db.session.execute(
+                delete(EventWaitlistEntry).where(EventWaitlistEntry.id == entry.id)
+            )
+            if status == 'joined':
+                promoted += 1
+
+    def reconcile_counts(self, event_ids=None):
+        """
+        Repair drift between Event.participant_count and the participation rows.
+        Returns the number of events whose counter was corrected.
+        """
+        actual = (
+            select(func.count())
+            .select_from(event_participants)
+            .where(event_participants.c.event_id == Event.id)
+            .scalar_subquery()
+        )
+        stmt = update(Event).where(Event.participant_count != actual)
+        if event_ids is not None:
+            stmt = stmt.where(Event.id.in_(event_ids))
+        result = db.session.execute(
+            stmt.values(participant_count=actual).execution_options(synchronize_session=False)
+        )
+        if result.rowcount:
+            version_service.bump(EVENTS_COLLECTION)
+        db.session.commit()
+        return result.rowcount
+
+# Create a singleton instance
+participant_service = ParticipantService()
@@ -0,0 +1,78 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+import bcrypt
+
+def _hash_password(password, rounds):
+    return bcrypt.hashpw(password.encode('utf-8'), bcrypt.gensalt(rounds)).decode('utf-8')
+
+def _check_password(password, password_hash):
+    return bcrypt.checkpw(password.encode('utf-8'), password_hash.encode('utf-8'))
+
+# Pool size per web worker when WEB_CONCURRENCY is not set
+DEFAULT_POOL_SIZE = 2
+
+class PasswordServiceBusy(Exception):
+    """Raised when the hashing pool has too many pending requests; callers should answer 503."""
+
+class PasswordService:
+    """
+    Runs bcrypt in a bounded process pool so request threads don't burn the
+    web worker's CPU, with a configurable cost factor.
+    """
+
+    def __init__(self):
+        self.rounds = int(os.getenv('BCRYPT_LOG_ROUNDS', '12'))
+        self.pool_size = int(os.getenv('BCRYPT_POOL_SIZE', str(self._default_pool_size())))
+        self.max_pending = int(os.getenv('BCRYPT_MAX_PENDING', str(self.pool_size * 8)))
+        self.queue_timeout = float(os.getenv('BCRYPT_QUEUE_TIMEOUT', '5'))
+        self._pending = threading.BoundedSemaphore(self.max_pending)
+        self._pool = None
+        self._pool_lock = threading.Lock()
+
+    @staticmethod
+    def _default_pool_size():
+        """
+        Every web worker owns a pool, so split the cores between the
+        WEB_CONCURRENCY workers; without that hint stay at a small fixed size.
+        """
+        workers = os.getenv('WEB_CONCURRENCY')
+        if not workers:
+            return DEFAULT_POOL_SIZE
+        return max(1, (os.cpu_count() or 1) // int(workers))
+
+    def _get_pool(self):
+        # Created lazily so each forked web worker owns its own pool
+        if self._pool is None:
+            with self._pool_lock:
+                if self._pool is None:
+                    self._pool = ProcessPoolExecutor(
+                        max_workers=self.pool_size,
+                        mp_context=multiprocessing.get_context('spawn')
+                    )
+        return self._pool
+
+    def _run(self, fn, *args):
+        if not self._pending.acquire(timeout=self.queue_timeout):
+            raise PasswordServiceBusy('Too many pending password operations')
+        try:
+            return self._get_pool().submit(fn, *args).result()
+        finally:
+            self._pending.release()
+
+    def hash_password(self, password):
+        return self._run(_hash_password, password, self.rounds)
+
+    def check_password(self, password, password_hash):
+        return self._run(_check_password, password, password_hash)
+
+    def needs_rehash(self, password_hash):
+        """True when the stored hash was made with a different cost factor."""
+        try:
+            return int(password_hash.split('$')[2]) != self.rounds
+        except (IndexError, ValueError):
+            return True
+
+# Create a singleton instance
+password_service = PasswordService()
@@ -0,0 +1,138 @@
+import hashlib
+import os
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from functools import wraps
+from flask import request, make_response, Response
+from services.metrics_service import metrics_service
+from utils.cache import MemoryCache, create_cache, MISSING
+from utils.http_cache import resolve_version
+from utils.singleflight import SingleFlight
+
+class ResponseCacheService:
+    """
+    Caches rendered GET responses in an in-process LRU, optionally backed by a
+    shared cache. Keys embed the resource's version stamp, so any write that
+    bumps the version makes old entries unreachable without explicit purges.
+    Concurrent misses for the same key are coalesced in-process and guarded by
+    a short lease in the shared backend, so only one worker recomputes.
+    """
+
+    def __init__(self):
+        ttl = int(os.getenv('RESPONSE_CACHE_TTL', '300'))
+        self.local = MemoryCache(
+            max_entries=int(os.getenv('RESPONSE_CACHE_MAX_ENTRIES', '2000')),
+            default_ttl=ttl
+        )
+        backend = os.getenv('RESPONSE_CACHE_BACKEND')
+        self.shared = create_cache(
+            backend,
+            'http:responses',
+            int(os.getenv('RESPONSE_CACHE_SHARED_MAX_ENTRIES', '20000')),
+            ttl,
+            os.getenv(
+                'RESPONSE_CACHE_PATH',
+                os.path.join(tempfile.gettempdir(), 'cleanwave_responses.sqlite3')
+            )
+        ) if backend else None
+        self.lease_ttl = float(os.getenv('RESPONSE_CACHE_LEASE_TTL', '5'))
+        self.single_flight = SingleFlight()
+        self._stats = defaultdict(lambda: {'local_hits': 0, 'shared_hits': 0, 'misses': 0})
+        self._stats_lock = threading.Lock()
+
+    def _record(self, endpoint, outcome):
+        with self._stats_lock:
+            self._stats[endpoint][outcome] += 1
+        metrics_service.record_cache('http_response', outcome != 'misses')
+
+    def stats(self):
+        """Return per-endpoint hit/miss counters for this process."""
+        with self._stats_lock:
+            result = {}
+            for endpoint, counts in self._stats.items():
+                lookups = sum(counts.values())
+                hits = counts['local_hits'] + counts['shared_hits']
+                result[endpoint] = dict(counts, hit_rate=hits / lookups if lookups else 0.0)
+            return result
+
+    @staticmethod
+    def _key(version):
+        params = sorted(request.args.items(multi=True))
+        raw = f"{request.endpoint}|{request.view_args}|{params}|{version}"
+        return hashlib.sha1(raw.encode('utf-8')).hexdigest()
+
+    def _lookup(self, key, endpoint):
+        entry = self.local.get(key)
+        if entry is not MISSING:
+            self._record(endpoint, 'local_hits')
+            return entry
+        if self.shared is not None:
+            entry = self.shared.get(key)
+            if entry is not MISSING:
+                self.local.set(key, entry)
+                self._record(endpoint, 'shared_hits')
+                return entry
+        self._record(endpoint, 'misses')
+        return None
+
+    def _wait_for_shared(self, key):
+        """Another worker holds the lease; poll briefly for its result."""
+        deadline = time.time() + self.lease_ttl
+        while time.time() < deadline:
+            entry = self.shared.get(key)
+            if entry is not MISSING:
+                return entry
+            time.sleep(0.05)
+        return None
+
+    def _fill(self, key, view, args, kwargs):
+        lease_key = f"lease:{key}"
+        leased = False
+        if self.shared is not None:
+            leased = self.shared.add(lease_key, 1, ttl=self.lease_ttl)
+            if not leased:
+                entry = self._wait_for_shared(key)
+                if entry is not None:
+                    self.local.set(key, entry)
+                    return entry
+
+        try:
+            response = make_response(view(*args, **kwargs))
+            entry = {
+                'body': response.get_data(as_text=True),
+                'status': response.status_code,
+                'mimetype': response.mimetype
+            }
+            if response.status_code == 200:
+                self.local.set(key, entry)
+                if self.shared is not None:
+                    self.shared.set(key, entry)
+            return entry
+        finally:
+            if leased:
+                self.shared.delete(lease_key)
+
+    def cached(self, version_fn):
+        """
+        Decorator caching a GET view's response under its version stamp.
+        `version_fn` has the same contract as utils.http_cache.conditional_get.
+        """
+        def decorator(view):
+            @wraps(view)
+            def wrapper(*args, **kwargs):
+                state = resolve_version(version_fn, kwargs)
+                if state is None:
+                    return view(*args, **kwargs)
+
+                key = self._key(state[0])
+                entry = self._lookup(key, request.endpoint)
+                if entry is None:
+                    entry = self.single_flight.do(key, lambda: self._fill(key, view, args, kwargs))
+                return Response(entry['body'], status=entry['status'], mimetype=entry['mimetype'])
+            return wrapper
+        return decorator
+
+# Create a singleton instance
+response_cache_service = ResponseCacheService()
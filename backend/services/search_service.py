@@ -0,0 +1,224 @@
+import re
+from sqlalchemy import text
+from sqlalchemy.event import listens_for
+from app import db
+from models.event import Event
+from services.tag_service import decode_legacy
+from services.version_service import version_service, EVENTS_COLLECTION
+from utils.db_routing import replica_safe
+
+# Longest query accepted, in terms; keeps tsquery/MATCH expressions small
+MAX_QUERY_TERMS = 8
+
+# Shorter terms match whole words only; a one-letter prefix matches most of the index
+MIN_PREFIX_LENGTH = 2
+
+_TERM_RE = re.compile(r'[^\W_]+', re.UNICODE)
+
+def parse_terms(query):
+    """Split free text into lowercase search terms, dropping any query syntax."""
+    return [term.lower() for term in _TERM_RE.findall(query or '')][:MAX_QUERY_TERMS]
+
+def _is_prefix(term):
+    return len(term) >= MIN_PREFIX_LENGTH
+
+def _tags_text(tags):
+    tags = decode_legacy(tags)
+    if isinstance(tags, str):
+        return tags
+    return ' '.join(str(tag) for tag in tags or [])
+
+def _document(event):
+    return {
+        'event_id': event.id,
+        'title': event.title or '',
+        'description': event.description or '',
+        'location': event.location or '',
+        'city': event.city or '',
+        'tags': _tags_text(event.tags),
+    }
+
+class PostgresSearchBackend:
+    """
+    Weighted tsvector documents in event_search with a GIN index.
+    Title ranks highest, then tags, then location/city, then description.
+    """
+
+    DDL = (
+        """
+        CREATE TABLE IF NOT EXISTS event_search (
+            event_id INTEGER PRIMARY KEY REFERENCES events(id),
+            document TSVECTOR NOT NULL
+        )
+        """,
+        "CREATE INDEX IF NOT EXISTS idx_event_search_document ON event_search USING GIN (document)",
+    )
+
+    UPSERT = text("""
+        INSERT INTO event_search (event_id, document)
+        VALUES (
+            :event_id,
+            setweight(to_tsvector('english', :title), 'A') ||
+            setweight(to_tsvector('english', :tags), 'B') ||
+            setweight(to_tsvector('english', :location || ' ' || :city), 'C') ||
+            setweight(to_tsvector('english', :description), 'D')
+        )
+        ON CONFLICT (event_id) DO UPDATE SET document = EXCLUDED.document
+    """)
+
+    def create_schema(self, connection):
+        for statement in self.DDL:
+            connection.execute(text(statement))
+
+    def upsert(self, documents):
+        db.session.execute(self.UPSERT, documents)
+
+    def delete(self, event_id):
+        db.session.execute(text("DELETE FROM event_search WHERE event_id = :event_id"), {'event_id': event_id})
+
+    def clear(self):
+        db.session.execute(text("DELETE FROM event_search"))
+
+    def search(self, terms, limit, offset):
+        # Every term must match; longer terms are prefixes so "beac" finds "beach"
+        tsquery = ' & '.join(f"{term}:*" if _is_prefix(term) else term for term in terms)
+        rows = db.session.execute(replica_safe(text("""
+            SELECT event_id, ts_rank_cd(document, query) AS rank
+            FROM event_search, to_tsquery('english', :tsquery) AS query
+            WHERE document @@ query
+            ORDER BY rank DESC, event_id
+            LIMIT :limit OFFSET :offset
+        """)), {'tsquery': tsquery, 'limit': limit, 'offset': offset})
+        return [(row.event_id, row.rank) for row in rows]
+
+class SQLiteSearchBackend:
+    """FTS5 table keyed by event id, ranked with column-weighted bm25."""
+
+    DDL = (
+        """
+        CREATE VIRTUAL TABLE IF NOT EXISTS event_search USING fts5(
+            title, description, location, city, tags,
+            tokenize = 'porter unicode61'
+        )
+        """,
+    )
+
+    # bm25 weights in column order; mirrors the Postgres A-D weights
+    WEIGHTS = (10.0, 1.0, 3.0, 3.0, 5.0)
+
+    def create_schema(self, connection):
+        for statement in self.DDL:
+            connection.execute(text(statement))
+
+    def upsert(self, documents):
+        for document in documents:
+            self.delete(document['event_id'])
+        db.session.execute(text("""
+            INSERT INTO event_search (rowid, title, description, location, city, tags)
+            VALUES (:event_id, :title, :description, :location, :city, :tags)
+        """), documents)
+
+    def delete(self, event_id):
+        db.session.execute(text("DELETE FROM event_search WHERE rowid = :event_id"), {'event_id': event_id})
+
+    def clear(self):
+        db.session.execute(text("DELETE FROM event_search"))
+
+    def search(self, terms, limit, offset):
+        match = ' '.join(f'"{term}"*' if _is_prefix(term) else f'"{term}"' for term in terms)
+        weights = ', '.join(str(w) for w in self.WEIGHTS)
+        rows = db.session.execute(replica_safe(text(f"""
+            SELECT rowid AS event_id, -bm25(event_search, {weights}) AS rank
+            FROM event_search
+            WHERE event_search MATCH :match
+            ORDER BY rank DESC, rowid
+            LIMIT :limit OFFSET :offset
+        """)), {'match': match, 'limit': limit, 'offset': offset})
+        return [(row.event_id, row.rank) for row in rows]
+
+BACKENDS = {
+    'postgresql': PostgresSearchBackend,
+    'sqlite': SQLiteSearchBackend,
+}
+
+# The index lives outside the models' metadata, so it follows the events table.
+# Creating it lazily inside a request would need a second connection that
+# waits on the request's own locks.
+@listens_for(Event.__table__, 'after_create')
+def _create_search_schema(target, connection, **kw):
+    backend_cls = BACKENDS.get(connection.dialect.name)
+    if backend_cls is not None:
+        backend_cls().create_schema(connection)
+
+@listens_for(Event.__table__, 'before_drop')
+def _drop_search_schema(target, connection, **kw):
+    if connection.dialect.name in BACKENDS:
+        connection.execute(text("DROP TABLE IF EXISTS event_search"))
+
+class SearchService:
+    """
+    Full-text search over active events through an inverted index.
+    Route handlers call index_event/remove_event inside the write's transaction,
+    so the index commits together with the event row.
+    """
+
+    def __init__(self):
+        self._backends = {}
+
+    def _backend(self):
+        dialect = db.engine.dialect.name
+        backend = self._backends.get(dialect)
+        if backend is None:
+            backend_cls = BACKENDS.get(dialect)
+            if backend_cls is None:
+                raise RuntimeError(f"Full-text search is not supported on {dialect}")
+            backend = self._backends[dialect] = backend_cls()
+        return backend
+
+    def index_event(self, event):
+        """Add or refresh an event's document; inactive events are dropped from the index."""
+        if not event.is_active:
+            self.remove_event(event.id)
+            return
+        self._backend().upsert([_document(event)])
+
+    def remove_event(self, event_id):
+        self._backend().delete(event_id)
+
+    def search(self, query, limit, offset=0):
+        """
+        Return [(event_id, rank)] for active events matching every term of
+        query, best match first. Terms of MIN_PREFIX_LENGTH or more characters
+        match as prefixes, shorter ones as whole words.
+        """
+        terms = parse_terms(query)
+        if not terms:
+            return []
+        return self._backend().search(terms, limit, offset)
+
+    def rebuild(self, batch_size=1000):
+        """
+        Create the index if needed and re-index every active event.
+        Returns the number of documents written.
+        """
+        backend = self._backend()
+        backend.create_schema(db.session.connection())
+        backend.clear()
+        written = 0
+        batch = []
+        query = Event.query.filter(Event.is_active == True).order_by(Event.id).yield_per(batch_size)
+        for event in query:
+            batch.append(_document(event))
+            if len(batch) >= batch_size:
+                backend.upsert(batch)
+                written += len(batch)
+                batch = []
+        if batch:
+            backend.upsert(batch)
+            written += len(batch)
+        version_service.bump(EVENTS_COLLECTION)
+        db.session.commit()
+        return written
+
+# Create a singleton instance
+search_service = SearchService()
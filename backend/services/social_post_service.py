@@ -0,0 +1,193 @@
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from flask import current_app
+from sqlalchemy import select, update, func, or_
+from app import db
+from models.event import Event
+from models.social_post_job import SocialPostJob
+from models.waste_rollup import EventWasteTotal
+from services.llm_service import llm_service, LLMOverloadedError
+from utils.db_routing import primary_only
+
+SYSTEM_PROMPT = "You are a social media expert helping to create engaging posts for environmental events."
+
+class SocialPostService:
+    """
+    Generates social media posts through a job queue so request handlers never
+    wait on the LLM. Jobs are drained by 'flask social-post-worker'; a job left
+    running longer than SOCIAL_POST_LEASE_SECONDS, e.g. by a worker that died,
+    goes back to the queue. When the provider is overloaded a job waits
+    SOCIAL_POST_OVERLOAD_BACKOFF seconds, doubling up to
+    SOCIAL_POST_MAX_BACKOFF, before it is claimed again.
+    """
+
+    def __init__(self):
+        self.pool_size = int(os.getenv('SOCIAL_POST_WORKERS', '4'))
+        self.poll_interval = float(os.getenv('SOCIAL_POST_POLL_INTERVAL', '2'))
+        self.lease_seconds = int(os.getenv('SOCIAL_POST_LEASE_SECONDS', '300'))
+        self.pregeneration_delay = int(os.getenv('SOCIAL_POST_PREGENERATION_DELAY', '60'))
+        self.overload_backoff = int(os.getenv('SOCIAL_POST_OVERLOAD_BACKOFF', '30'))
+        self.max_backoff = int(os.getenv('SOCIAL_POST_MAX_BACKOFF', '600'))
+
+    def _inputs(self, event):
+        total_waste = db.session.execute(
+            select(func.coalesce(func.sum(EventWasteTotal.total_quantity), 0))
+            .where(EventWasteTotal.event_id == event.id)
+        ).scalar()
+        return {
+            'title': event.title,
+            'location': event.location,
+            'date': str(event.date),
+            'time_start': str(event.time_start),
+            'time_end': str(event.time_end),
+            'volunteers': event.participant_count,
+            'total_waste': float(total_waste)
+        }
+
+    @staticmethod
+    def _input_hash(inputs):
+        return hashlib.sha256(json.dumps(inputs, sort_keys=True).encode('utf-8')).hexdigest()
+
+    @staticmethod
+    def _prompt(inputs):
+        return f"""Generate an engaging social media post for a beach cleanup event with the following details:
+    Event: {inputs['title']}
+    Location: {inputs['location']}
+    Date: {inputs['date']}
+    Time: {inputs['time_start']} to {inputs['time_end']}
+    Volunteers: {inputs['volunteers']}
+    Total Waste Collected: {inputs['total_waste']} kg
+    
+    The post should be engaging, highlight the impact, and encourage more participation.
+    Keep it under 280 characters for Twitter compatibility."""
+
+    def find_ready(self, event):
+        """Return a finished job generated from the event's current data, if any."""
+        return (
+            SocialPostJob.query
+            .filter_by(event_id=event.id, status='done', input_hash=self._input_hash(self._inputs(event)))
+            .order_by(SocialPostJob.updated_at.desc())
+            .first()
+        )
+
+    def enqueue(self, event_id, delay=None):
+        """
+        Queue a generation job, reusing a job that is already waiting for this event.
+        A job queued with `delay` seconds is not claimed before then; queueing
+        without one brings a delayed job forward unless it is backing off.
+        The caller is responsible for committing.
+        """
+        job = SocialPostJob.query.filter_by(event_id=event_id, status='pending').first()
+        if job is None:
+            job = SocialPostJob(event_id=event_id)
+            if delay:
+                job.run_after = datetime.utcnow() + timedelta(seconds=delay)
+            db.session.add(job)
+        elif delay is None and job.attempts == 0:
+            job.run_after = None
+        return job
+
+    def request_pregeneration(self, event_id):
+        """
+        Called when an event's waste totals or volunteer count change so a fresh
+        draft is ready in advance. Only events that already have a generated
+        post are refreshed. The job waits SOCIAL_POST_PREGENERATION_DELAY
+        seconds, and changes in the meantime reuse it, so a burst of joins or
+        waste logs costs one generation.
+        """
+        session = db.session()
+        transaction = session.get_transaction()
+        requested = session.info.get('social_post_pregeneration')
+        if requested is None or requested[0] is not transaction:
+            requested = session.info['social_post_pregeneration'] = (transaction, set())
+        if event_id in requested[1]:
+            return
+        requested[1].add(event_id)
+        has_post = db.session.execute(
+            select(SocialPostJob.id)
+            .where(SocialPostJob.event_id == event_id, SocialPostJob.status == 'done')
+            .limit(1)
+        ).first()
+        if has_post is not None:
+            self.enqueue(event_id, delay=self.pregeneration_delay)
+
+    def get_job(self, job_id):
+        return SocialPostJob.query.get(job_id)
+
+    def _requeue_expired(self):
+        """Return running jobs whose lease has expired to the queue."""
+        db.session.execute(
+            update(SocialPostJob)
+            .where(
+                SocialPostJob.status == 'running',
+                SocialPostJob.locked_at < datetime.utcnow() - timedelta(seconds=self.lease_seconds)
+            )
+            .values(status='pending', locked_at=None)
+            .execution_options(synchronize_session=False)
+        )
+
+    def _claim_batch(self, limit):
+        self._requeue_expired()
+        now = datetime.utcnow()
+        jobs = primary_only(
+            SocialPostJob.query
+            .filter(
+                SocialPostJob.status == 'pending',
+                or_(SocialPostJob.run_after.is_(None), SocialPostJob.run_after <= now)
+            )
+            .order_by(SocialPostJob.created_at)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+        ).all()
+        for job in jobs:
+            job.status = 'running'
+            job.locked_at = now
+        db.session.commit()
+        return [job.id for job in jobs]
+
+    def _run_job(self, app, job_id):
+        with app.app_context():
+            job = SocialPostJob.query.get(job_id)
+            event = Event.query.get(job.event_id)
+            try:
+                inputs = self._inputs(event)
+                job.post = llm_service.generate_text(
+                    prompt=self._prompt(inputs),
+                    system_prompt=SYSTEM_PROMPT,
+                    temperature=0.7,
+                    max_tokens=200,
+                    context_version=event.updated_at.isoformat()
+                )
+                job.input_hash = self._input_hash(inputs)
+                job.status = 'done'
+            except LLMOverloadedError:
+                # Provider is saturated; back off instead of re-claiming right away
+                job.status = 'pending'
+                job.attempts += 1
+                backoff = min(self.max_backoff, self.overload_backoff * 2 ** (job.attempts - 1))
+                job.run_after = datetime.utcnow() + timedelta(seconds=backoff)
+            except Exception as e:
+                job.error = f'Failed to generate post: {str(e)}'
+                job.status = 'failed'
+            job.locked_at = None
+            db.session.commit()
+            db.session.remove()
+
+    def run_forever(self):
+        """Drain the job queue with a pool of threads until interrupted."""
+        app = current_app._get_current_object()
+        with ThreadPoolExecutor(max_workers=self.pool_size) as pool:
+            while True:
+                job_ids = self._claim_batch(self.pool_size)
+                if not job_ids:
+                    time.sleep(self.poll_interval)
+                    continue
+                # Wait for the batch so claimed jobs never exceed the pool size
+                list(pool.map(lambda job_id: self._run_job(app, job_id), job_ids))
+
+# Create a singleton instance
+social_post_service = SocialPostService()
@@ -0,0 +1,146 @@
+import json
+from sqlalchemy import select, delete, insert, func
+from app import db
+from models.event import Event
+from models.event_tag import EventTag, TagCount
+from services.version_service import version_service, EVENTS_COLLECTION
+from utils.counters import increment_counters
+
+MAX_TAG_LENGTH = 50
+MAX_TAGS_PER_EVENT = 20
+
+def normalize_tags(tags):
+    """
+    Lowercase, collapse whitespace and de-duplicate tags, keeping their order.
+    Raises ValueError for anything that is not a list of strings.
+    """
+    if not isinstance(tags, list) or not all(isinstance(tag, str) for tag in tags):
+        raise ValueError('tags must be a list of strings')
+    normalized = []
+    for tag in tags:
+        tag = ' '.join(tag.lower().split())
+        if not tag:
+            continue
+        if len(tag) > MAX_TAG_LENGTH:
+            raise ValueError(f'Tags must be at most {MAX_TAG_LENGTH} characters')
+        if tag not in normalized:
+            normalized.append(tag)
+    if len(normalized) > MAX_TAGS_PER_EVENT:
+        raise ValueError(f'An event can have at most {MAX_TAGS_PER_EVENT} tags')
+    return normalized
+
+def decode_legacy(value):
+    """Undo the JSON string encoding older rows were written with."""
+    while isinstance(value, str):
+        try:
+            value = json.loads(value)
+        except ValueError:
+            break
+    return value
+
+class TagService:
+    """
+    Keeps event_tags rows and the per-tag active event counts in step with
+    Event.tags. Write paths call these hooks inside their own transaction.
+    """
+
+    def _adjust_counts(self, tags, delta):
+        for tag in tags:
+            increment_counters(TagCount, {'tag': tag}, {'event_count': delta})
+
+    def set_tags(self, event, tags, was_active):
+        """
+        Replace an event's tags with the already normalized `tags`.
+        `was_active` is the event's is_active before this write, so counts
+        follow activation changes made in the same request.
+        """
+        old_tags = set(db.session.execute(
+            select(EventTag.tag).where(EventTag.event_id == event.id)
+        ).scalars())
+        new_tags = set(tags)
+
+        removed = old_tags - new_tags
+        added = new_tags - old_tags
+        if removed:
+            db.session.execute(
+                delete(EventTag).where(EventTag.event_id == event.id, EventTag.tag.in_(removed))
+            )
+        if added:
+            db.session.execute(
+                insert(EventTag), [{'event_id': event.id, 'tag': tag} for tag in added]
+            )
+
+        if was_active:
+            self._adjust_counts(old_tags, -1)
+        if event.is_active:
+            self._adjust_counts(new_tags, 1)
+        event.tags = tags
+
+    def set_active(self, event, was_active):
+        """Move an event's tags in or out of the counts when is_active changes."""
+        if bool(was_active) == bool(event.is_active):
+            return
+        tags = db.session.execute(
+            select(EventTag.tag).where(EventTag.event_id == event.id)
+        ).scalars().all()
+        self._adjust_counts(tags, 1 if event.is_active else -1)
+
+    def facets(self, limit):
+        """Most used tags among active events, served from the precomputed counts."""
+        return (
+            TagCount.query
+            .filter(TagCount.event_count > 0)
+            .order_by(TagCount.event_count.desc(), TagCount.tag)
+            .limit(limit)
+            .all()
+        )
+
+    def events_with_all_tags(self, tags):
+        """Subquery of event ids carrying every one of `tags`."""
+        return (
+            select(EventTag.event_id)
+            .where(EventTag.tag.in_(tags))
+            .group_by(EventTag.event_id)
+            .having(func.count() == len(tags))
+        )
+
+    def rebuild(self, batch_size=1000):
+        """
+        Decode legacy JSON-string columns, then rebuild event_tags and
+        tag_counts from Event.tags. Returns the number of tagged events.
+        """
+        db.session.execute(delete(EventTag))
+        db.session.execute(delete(TagCount))
+
+        tagged = 0
+        counts = {}
+        for event in Event.query.order_by(Event.id).yield_per(batch_size):
+            event.what_to_bring = decode_legacy(event.what_to_bring)
+            event.safety_protocols = decode_legacy(event.safety_protocols)
+            try:
+                tags = normalize_tags(decode_legacy(event.tags) or [])
+            except ValueError:
+                tags = []
+            event.tags = tags
+            if not tags:
+                continue
+            tagged += 1
+            db.session.execute(
+                insert(EventTag), [{'event_id': event.id, 'tag': tag} for tag in tags]
+            )
+            if event.is_active:
+                for tag in tags:
+                    counts[tag] = counts.get(tag, 0) + 1
+
+        if counts:
+            db.session.execute(
+                insert(TagCount),
+                [{'tag': tag, 'event_count': count} for tag, count in counts.items()]
+            )
+        # Cached listings and facets were built from the old tags
+        version_service.bump(EVENTS_COLLECTION)
+        db.session.commit()
+        return tagged
+
+# Create a singleton instance
+tag_service = TagService()
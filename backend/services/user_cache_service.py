@@ -0,0 +1,57 @@
+import os
+from flask import g
+from flask_jwt_extended import get_jwt, get_jwt_identity
+from models.user import User
+from utils.cache import MemoryCache, MISSING
+
+class UserCacheService:
+    """
+    Read-through cache of user snapshots, scoped to the request (flask.g) and
+    to the process with a short TTL, so most authenticated requests never
+    touch the users table.
+    Snapshots are plain dicts: {'profile': User.to_dict(), 'user_type': ...}.
+    """
+
+    def __init__(self):
+        self.cache = MemoryCache(
+            max_entries=int(os.getenv('USER_CACHE_MAX_ENTRIES', '10000')),
+            default_ttl=int(os.getenv('USER_CACHE_TTL', '30'))
+        )
+
+    def get_snapshot(self, user_id):
+        """Return the user's snapshot, or None if the user does not exist."""
+        user_id = str(user_id)
+        request_cache = g.setdefault('user_snapshots', {})
+        if user_id in request_cache:
+            return request_cache[user_id]
+
+        snapshot = self.cache.get(user_id)
+        if snapshot is MISSING:
+            user = User.query.get(user_id)
+            snapshot = {'profile': user.to_dict(), 'user_type': user.user_type} if user else None
+            if snapshot:
+                self.cache.set(user_id, snapshot)
+        request_cache[user_id] = snapshot
+        return snapshot
+
+    def invalidate(self, user_id):
+        user_id = str(user_id)
+        self.cache.delete(user_id)
+        g.setdefault('user_snapshots', {}).pop(user_id, None)
+
+    def current_user_type(self):
+        """Role of the authenticated user, read from the token's claims when present."""
+        claims = get_jwt()
+        if 'user_type' in claims:
+            return claims['user_type']
+        # Tokens issued before role claims were added
+        snapshot = self.get_snapshot(get_jwt_identity())
+        return snapshot['user_type'] if snapshot else None
+
+    @staticmethod
+    def token_claims(user_type):
+        """Additional claims embedded in access tokens."""
+        return {'user_type': user_type}
+
+# Create a singleton instance
+user_cache_service = UserCacheService()
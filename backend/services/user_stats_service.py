@@ -0,0 +1,181 @@
+from collections import defaultdict
+from decimal import Decimal
+from sqlalchemy import select, delete, func
+from app import db
+from models.event import Event, EventRegistration
+from models.user_stats import UserStats, LeaderboardEntry
+from models.waste_log import WasteLog
+from utils.counters import increment_counters
+
+GLOBAL_SCOPE = 'global'
+CITY_SCOPE = 'city'
+EVENT_SCOPE = 'event'
+
+class UserStatsService:
+    """
+    Maintains UserStats counters and LeaderboardEntry rows.
+    Write paths call these hooks inside their own transaction.
+    events_attended and volunteers_hosted come from event_registrations,
+    which no API route writes, so only rebuild() refreshes them.
+    """
+
+    @staticmethod
+    def city_key(city):
+        return ' '.join(city.lower().split())
+
+    def _bump(self, user_id, **deltas):
+        increment_counters(UserStats, {'user_id': user_id}, deltas)
+
+    def _apply_waste(self, user_id, event_id, city, quantity, count):
+        quantity = Decimal(str(quantity))
+        self._bump(user_id, total_waste=quantity, waste_log_count=count)
+        scopes = [(GLOBAL_SCOPE, ''), (EVENT_SCOPE, str(event_id))]
+        if city:
+            scopes.append((CITY_SCOPE, self.city_key(city)))
+        for scope, scope_key in scopes:
+            increment_counters(
+                LeaderboardEntry,
+                {'scope': scope, 'scope_key': scope_key, 'user_id': user_id},
+                {'total_waste': quantity, 'log_count': count}
+            )
+
+    def _event_city(self, event_id):
+        return db.session.execute(select(Event.city).where(Event.id == event_id)).scalar()
+
+    def waste_log_created(self, waste_log):
+        self._apply_waste(
+            waste_log.user_id, waste_log.event_id, self._event_city(waste_log.event_id),
+            waste_log.quantity, 1
+        )
+
+    def waste_logs_created(self, user_id, event_id, quantity, count):
+        """Apply a batch of new logs by one user at one event as a single delta."""
+        self._apply_waste(user_id, event_id, self._event_city(event_id), quantity, count)
+
+    def waste_log_deleted(self, waste_log):
+        self._apply_waste(
+            waste_log.user_id, waste_log.event_id, self._event_city(waste_log.event_id),
+            -Decimal(str(waste_log.quantity)), -1
+        )
+
+    def waste_log_updated(self, waste_log, old_quantity):
+        delta = Decimal(str(waste_log.quantity)) - Decimal(str(old_quantity))
+        if delta:
+            self._apply_waste(
+                waste_log.user_id, waste_log.event_id, self._event_city(waste_log.event_id),
+                delta, 0
+            )
+
+    def event_city_changed(self, event_id, old_city, new_city):
+        """Move an event's waste totals from the old city's leaderboard to the new one."""
+        old_key = self.city_key(old_city) if old_city else None
+        new_key = self.city_key(new_city) if new_city else None
+        if old_key == new_key:
+            return
+        # The event scope holds exactly what each user logged at this event
+        contributions = db.session.execute(
+            select(LeaderboardEntry.user_id, LeaderboardEntry.total_waste, LeaderboardEntry.log_count)
+            .where(LeaderboardEntry.scope == EVENT_SCOPE, LeaderboardEntry.scope_key == str(event_id))
+        ).all()
+        for user_id, total_waste, log_count in contributions:
+            for city_key, sign in ((old_key, -1), (new_key, 1)):
+                if city_key:
+                    increment_counters(
+                        LeaderboardEntry,
+                        {'scope': CITY_SCOPE, 'scope_key': city_key, 'user_id': user_id},
+                        {'total_waste': sign * total_waste, 'log_count': sign * log_count}
+                    )
+
+    def event_created(self, organizer_id):
+        self._bump(organizer_id, events_created=1)
+
+    def get_stats(self, user_id):
+        """Return the user's counters, or an empty UserStats if none are recorded."""
+        return UserStats.query.get(user_id) or UserStats(user_id)
+
+    def get_leaderboard(self, scope, scope_key='', limit=10):
+        """Return the top entries for a scope, highest total_waste first."""
+        return (
+            LeaderboardEntry.query
+            .filter_by(scope=scope, scope_key=scope_key)
+            .filter(LeaderboardEntry.log_count > 0)
+            .order_by(LeaderboardEntry.total_waste.desc())
+            .limit(limit)
+            .all()
+        )
+
+    def rebuild(self):
+        """
+        Recompute every counter and leaderboard from the source tables.
+        Returns the number of users with stats.
+        """
+        stats = defaultdict(dict)
+        for user_id, count, total in db.session.execute(
+            select(WasteLog.user_id, func.count(WasteLog.id), func.sum(WasteLog.quantity))
+            .group_by(WasteLog.user_id)
+        ):
+            stats[user_id].update(waste_log_count=count, total_waste=total)
+        for user_id, count in db.session.execute(
+            select(EventRegistration.user_id, func.count(EventRegistration.id))
+            .where(EventRegistration.status == 'attended')
+            .group_by(EventRegistration.user_id)
+        ):
+            stats[user_id]['events_attended'] = count
+        for user_id, count in db.session.execute(
+            select(Event.organizer_id, func.count(Event.id))
+            .where(Event.organizer_id.isnot(None))
+            .group_by(Event.organizer_id)
+        ):
+            stats[user_id]['events_created'] = count
+        for user_id, count in db.session.execute(
+            select(Event.organizer_id, func.count(EventRegistration.id))
+            .join(Event, Event.id == EventRegistration.event_id)
+            .group_by(Event.organizer_id)
+        ):
+            stats[user_id]['volunteers_hosted'] = count
+
+        entries = defaultdict(lambda: [Decimal(0), 0])
+        for user_id, event_id, city, count, total in db.session.execute(
+            select(WasteLog.user_id, WasteLog.event_id, Event.city,
+                   func.count(WasteLog.id), func.sum(WasteLog.quantity))
+            .join(Event, Event.id == WasteLog.event_id)
+            .group_by(WasteLog.user_id, WasteLog.event_id, Event.city)
+        ):
+            scopes = [(GLOBAL_SCOPE, ''), (EVENT_SCOPE, str(event_id))]
+            if city:
+                scopes.append((CITY_SCOPE, self.city_key(city)))
+            for scope, scope_key in scopes:
+                entry = entries[(scope, scope_key, user_id)]
+                entry[0] += Decimal(str(total))
+                entry[1] += count
+
+        db.session.execute(delete(UserStats))
+        db.session.execute(delete(LeaderboardEntry))
+        if stats:
+            db.session.execute(UserStats.__table__.insert(), [
+                {
+                    'user_id': user_id,
+                    'events_attended': values.get('events_attended', 0),
+                    'events_created': values.get('events_created', 0),
+                    'volunteers_hosted': values.get('volunteers_hosted', 0),
+                    'waste_log_count': values.get('waste_log_count', 0),
+                    'total_waste': values.get('total_waste') or 0
+                }
+                for user_id, values in stats.items()
+            ])
+        if entries:
+            db.session.execute(LeaderboardEntry.__table__.insert(), [
+                {
+                    'scope': scope,
+                    'scope_key': scope_key,
+                    'user_id': user_id,
+                    'total_waste': total,
+                    'log_count': count
+                }
+                for (scope, scope_key, user_id), (total, count) in entries.items()
+            ])
+        db.session.commit()
+        return len(stats)
+
+# Create a singleton instance
+user_stats_service = UserStatsService()
@@ -0,0 +1,28 @@
+from sqlalchemy import select
+from app import db
+from models.collection_version import CollectionVersion
+from utils.counters import increment_counters
+
+# Collection covering event listings, map data and anything derived from them
+EVENTS_COLLECTION = 'events'
+
+class VersionService:
+    """
+    Version stamps for collections. Readers compare stamps with a single
+    primary-key lookup instead of re-querying the collection.
+    """
+
+    def current(self, name):
+        """Return (version, updated_at) for a collection; (0, None) if never written."""
+        row = db.session.execute(
+            select(CollectionVersion.version, CollectionVersion.updated_at)
+            .where(CollectionVersion.name == name)
+        ).first()
+        return (row.version, row.updated_at) if row else (0, None)
+
+    def bump(self, name):
+        """Advance a collection's version. The caller is responsible for committing."""
+        increment_counters(CollectionVersion, {'name': name}, {'version': 1})
+
+# Create a singleton instance
+version_service = VersionService()
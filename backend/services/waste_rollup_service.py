@@ -0,0 +1,75 @@
+from decimal import Decimal
+from sqlalchemy import delete, insert, select, func
+from app import db
+from models.waste_log import WasteLog
+from models.waste_rollup import EventWasteTotal
+from utils.counters import increment_counters
+from services.social_post_service import social_post_service
+
+class WasteRollupService:
+    """
+    Keeps event_waste_totals in step with waste_logs.
+    Every write path applies its delta in the caller's transaction, so the
+    rollup commits or rolls back together with the waste log change.
+    """
+
+    def apply_delta(self, event_id, waste_type, quantity, count):
+        """Add `quantity` and `count` to the (event_id, waste_type) rollup row."""
+        increment_counters(
+            EventWasteTotal,
+            {'event_id': event_id, 'waste_type': waste_type},
+            {'total_quantity': Decimal(str(quantity)), 'log_count': count}
+        )
+        # Totals changed, so have a fresh social post draft ready before it is asked for
+        social_post_service.request_pregeneration(event_id)
+
+    def log_created(self, waste_log):
+        self.apply_delta(waste_log.event_id, waste_log.waste_type, waste_log.quantity, 1)
+
+    def log_deleted(self, waste_log):
+        self.apply_delta(waste_log.event_id, waste_log.waste_type, -Decimal(str(waste_log.quantity)), -1)
+
+    def log_updated(self, event_id, old_type, old_quantity, new_type, new_quantity):
+        if old_type == new_type:
+            delta = Decimal(str(new_quantity)) - Decimal(str(old_quantity))
+            if delta:
+                self.apply_delta(event_id, new_type, delta, 0)
+            return
+        self.apply_delta(event_id, old_type, -Decimal(str(old_quantity)), -1)
+        self.apply_delta(event_id, new_type, new_quantity, 1)
+
+    def get_event_totals(self, event_id):
+        """Return the rollup rows for an event, one per waste type."""
+        return EventWasteTotal.query.filter(
+            EventWasteTotal.event_id == event_id,
+            EventWasteTotal.log_count > 0
+        ).all()
+
+    def rebuild(self, event_id=None):
+        """
+        Recompute rollups from waste_logs, for one event or for all of them.
+        Returns the number of rollup rows written.
+        """
+        delete_stmt = delete(EventWasteTotal)
+        source = select(
+            WasteLog.event_id,
+            WasteLog.waste_type,
+            func.sum(WasteLog.quantity),
+            func.count(WasteLog.id)
+        ).group_by(WasteLog.event_id, WasteLog.waste_type)
+        if event_id is not None:
+            delete_stmt = delete_stmt.where(EventWasteTotal.event_id == event_id)
+            source = source.where(WasteLog.event_id == event_id)
+
+        db.session.execute(delete_stmt)
+        result = db.session.execute(
+            insert(EventWasteTotal).from_select(
+                ['event_id', 'waste_type', 'total_quantity', 'log_count'],
+                source
+            )
+        )
+        db.session.commit()
+        return result.rowcount
+
+# Create a singleton instance
+waste_rollup_service = WasteRollupService()
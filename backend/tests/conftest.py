@@ -0,0 +1,105 @@
+import os
+import sys
+import tempfile
+from datetime import date, time
+
+import pytest
+
+# Configure the app before any service singleton reads its settings
+_workdir = tempfile.mkdtemp(prefix='cleanwave-tests-')
+os.environ.update(
+    # TEST_DATABASE_URL runs the suite against another database, e.g. PostgreSQL
+    DATABASE_URL=os.getenv('TEST_DATABASE_URL', f"sqlite:///{os.path.join(_workdir, 'app.sqlite3')}"),
+    BCRYPT_LOG_ROUNDS='4',
+    LLM_CACHE_BACKEND='memory',
+    MAP_TILE_CACHE_BACKEND='memory',
+    GEOCODING_CACHE_BACKEND='memory',
+    SECRET_KEY='test-secret-key',
+    JWT_SECRET_KEY='test-jwt-secret-key-of-at-least-32-bytes',
+)
+os.environ.pop('DATABASE_REPLICA_URLS', None)
+os.environ.pop('RESPONSE_CACHE_BACKEND', None)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db  # noqa: E402
+from flask.testing import FlaskClient  # noqa: E402
+from flask_jwt_extended import create_access_token  # noqa: E402
+
+class RequestClient(FlaskClient):
+    """
+    Runs every request in its own app context, as a server would, so g and
+    the database session are not shared with the test or earlier requests.
+    """
+
+    def open(self, *args, **kwargs):
+        kwargs.setdefault('buffered', True)
+        with self.application.app_context():
+            return super().open(*args, **kwargs)
+
+@pytest.fixture
+def app():
+    app = create_app()
+    app.config['TESTING'] = True
+    app.test_client_class = RequestClient
+    # Only the primary: binds registered by other app instances share db's metadata
+    with app.app_context():
+        db.create_all(bind_key=None)
+        yield app
+        db.session.remove()
+        db.drop_all(bind_key=None)
+    # Ids restart with every database, so process-level caches must not outlive it
+    from services.map_tile_service import map_tile_service
+    from services.response_cache_service import response_cache_service
+    from services.user_cache_service import user_cache_service
+    map_tile_service.cache.clear()
+    response_cache_service.local.clear()
+    user_cache_service.cache.clear()
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+@pytest.fixture
+def make_user(app):
+    from models.user import User
+    counter = iter(range(1, 10_000))
+
+    def make_user(user_type='volunteer'):
+        number = next(counter)
+        user = User(f'User {number}', f'user{number}@example.com', 'password', user_type)
+        db.session.add(user)
+        db.session.commit()
+        return user
+    return make_user
+
+@pytest.fixture
+def make_event(app, make_user):
+    from models.event import Event
+
+    def make_event(organizer=None, **overrides):
+        organizer = organizer or make_user('organizer')
+        fields = dict(
+            title='Beach cleanup', description='Pick up litter', location='Main beach',
+            date=date(2030, 6, 1), time_start=time(9), time_end=time(12),
+            city='Santa Cruz', state='CA', organizer_id=organizer.id,
+            what_to_bring=['gloves'], safety_protocols=['sunscreen'], tags=['beach'],
+            max_participants=10, is_active=True,
+        )
+        fields.update(overrides)
+        event = Event(**fields)
+        db.session.add(event)
+        db.session.commit()
+        return event
+    return make_event
+
+@pytest.fixture
+def auth_headers(app):
+    from services.user_cache_service import user_cache_service
+
+    def auth_headers(user):
+        token = create_access_token(
+            identity=str(user.id),
+            additional_claims=user_cache_service.token_claims(user.user_type)
+        )
+        return {'Authorization': f'Bearer {token}'}
+    return auth_headers
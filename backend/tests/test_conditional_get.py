@@ -0,0 +1,38 @@
+def test_event_revalidates_with_etag(client, make_user, make_event, auth_headers):
+    event = make_event()
+    first = client.get(f'/api/events/{event.id}')
+    assert first.status_code == 200
+    etag = first.headers['ETag']
+    assert first.headers['Last-Modified']
+
+    not_modified = client.get(f'/api/events/{event.id}', headers={'If-None-Match': etag})
+    assert not_modified.status_code == 304
+    assert not_modified.get_data() == b''
+    assert not_modified.headers['ETag'] == etag
+
+    # Joining changes the participant count, so the old ETag no longer matches
+    volunteer = make_user()
+    client.post(f'/api/events/{event.id}/join', headers=auth_headers(volunteer))
+    changed = client.get(f'/api/events/{event.id}', headers={'If-None-Match': etag})
+    assert changed.status_code == 200
+    assert changed.headers['ETag'] != etag
+    assert changed.get_json()['volunteer_count'] == 1
+
+def test_listing_revalidates_until_the_collection_changes(client, make_event, auth_headers, make_user):
+    organizer = make_user('organizer')
+    event = make_event(organizer)
+    etag = client.get('/api/events').headers['ETag']
+    assert client.get('/api/events', headers={'If-None-Match': etag}).status_code == 304
+
+    client.put(f'/api/events/{event.id}', json={'title': 'Dune restoration'}, headers=auth_headers(organizer))
+    assert client.get('/api/events', headers={'If-None-Match': etag}).status_code == 200
+
+def test_etag_depends_on_query_string(client, make_event):
+    make_event()
+    etag = client.get('/api/events?limit=1').headers['ETag']
+    assert client.get('/api/events?limit=2', headers={'If-None-Match': etag}).status_code == 200
+
+def test_missing_event_is_not_conditional(client):
+    response = client.get('/api/events/999')
+    assert response.status_code == 404
+    assert 'ETag' not in response.headers
@@ -0,0 +1,113 @@
+import os
+import time
+
+import flask_jwt_extended.view_decorators
+import pytest
+from flask import g
+from sqlalchemy import select
+
+from app import create_app, db
+from conftest import RequestClient
+from models.waitlist import EventWaitlistEntry
+from services.search_service import search_service
+from utils.db_routing import primary_only
+
+ROUTE_HEADER = 'X-Database-Route'
+
+@pytest.fixture
+def make_worker(app, monkeypatch):
+    """Build app instances that read from a replica, like separate web workers."""
+    # The replica is the primary's own database: these tests check routing, not replication
+    monkeypatch.setenv('DATABASE_REPLICA_URLS', os.environ['DATABASE_URL'])
+    monkeypatch.setenv('DB_ROUTE_HEADER', '1')
+    monkeypatch.setenv('DB_STICKY_SECONDS', '2')
+
+    def make_worker():
+        worker = create_app()
+        worker.test_client_class = RequestClient
+        return worker
+    return make_worker
+
+def test_reads_go_to_a_replica_and_writes_to_the_primary(make_worker, make_user, make_event, auth_headers):
+    client = make_worker().test_client()
+    event, volunteer = make_event(), make_user()
+
+    assert client.get('/api/events').headers[ROUTE_HEADER] == 'replica_0'
+    response = client.post(f'/api/events/{event.id}/join', headers=auth_headers(volunteer))
+    assert response.status_code == 200
+    assert response.headers[ROUTE_HEADER] == 'primary'
+
+def test_writer_reads_from_primary_until_the_window_passes(make_worker, make_user, make_event, auth_headers):
+    # No cookies: stickiness comes from the worker's in-process cache alone
+    client = make_worker().test_client(use_cookies=False)
+    event, volunteer, other = make_event(), make_user(), make_user()
+    client.post(f'/api/events/{event.id}/join', headers=auth_headers(volunteer))
+
+    assert client.get('/api/users/profile', headers=auth_headers(volunteer)).headers[ROUTE_HEADER] == 'primary'
+    assert client.get('/api/users/profile', headers=auth_headers(other)).headers[ROUTE_HEADER] == 'replica_0'
+
+    time.sleep(2.1)
+    assert client.get('/api/users/profile', headers=auth_headers(volunteer)).headers[ROUTE_HEADER] == 'replica_0'
+
+def test_sticky_cookie_is_honoured_by_other_workers(make_worker, make_user, make_event, auth_headers):
+    writer, reader = make_worker().test_client(), make_worker().test_client()
+    event, volunteer = make_event(), make_user()
+
+    response = writer.post(f'/api/events/{event.id}/join', headers=auth_headers(volunteer))
+    cookie = writer.get_cookie('db_sticky')
+    assert cookie is not None
+    assert 'HttpOnly' in response.headers['Set-Cookie']
+
+    reader.set_cookie('db_sticky', cookie.value)
+    assert reader.get('/api/users/profile', headers=auth_headers(volunteer)).headers[ROUTE_HEADER] == 'primary'
+    # The cookie is bound to the user who wrote
+    other = make_user()
+    assert reader.get('/api/users/profile', headers=auth_headers(other)).headers[ROUTE_HEADER] == 'replica_0'
+
+def test_login_pins_the_user_to_the_primary(make_worker, make_user):
+    client = make_worker().test_client(use_cookies=False)
+    user = make_user()
+
+    response = client.post('/api/auth/login', json={'email': user.email, 'password': 'password'})
+    assert response.status_code == 200
+    token = response.get_json()['access_token']
+    profile = client.get('/api/users/profile', headers={'Authorization': f'Bearer {token}'})
+    assert profile.headers[ROUTE_HEADER] == 'primary'
+
+def test_search_reads_from_a_replica(make_worker, make_event):
+    client = make_worker().test_client()
+    event = make_event(title='Kelp forest dive')
+    search_service.index_event(event)
+    db.session.commit()
+
+    response = client.get('/api/events/search?q=kelp')
+    assert [result['id'] for result in response.get_json()['events']] == [event.id]
+    assert response.headers[ROUTE_HEADER] == 'replica_0'
+
+def test_locking_reads_marked_primary_only_pin_the_request(make_worker):
+    worker = make_worker()
+    locking = select(EventWaitlistEntry.id).with_for_update()
+
+    with worker.test_request_context('/api/events'):
+        worker.preprocess_request()
+        db.session.execute(select(EventWaitlistEntry.id)).all()
+        assert g.db_route == 'replica'
+        db.session.execute(primary_only(locking)).all()
+        assert g.db_route == 'primary'
+
+@pytest.mark.parametrize('path', ['/api/users/profile', '/api/events'])
+def test_token_is_decoded_once_per_read(make_worker, make_user, auth_headers, monkeypatch, path):
+    client = make_worker().test_client()
+    headers = auth_headers(make_user())
+    decoded = []
+    decode_token = flask_jwt_extended.view_decorators.decode_token
+
+    def counting_decode(*args, **kwargs):
+        decoded.append(args[0])
+        return decode_token(*args, **kwargs)
+    monkeypatch.setattr(flask_jwt_extended.view_decorators, 'decode_token', counting_decode)
+
+    response = client.get(path, headers=headers)
+    assert response.status_code == 200
+    assert response.headers[ROUTE_HEADER] == 'replica_0'
+    assert len(decoded) == 1
@@ -0,0 +1,45 @@
+from datetime import date
+
+import pytest
+
+from utils.pagination import encode_cursor
+
+def _pages(client, url):
+    ids, cursor = [], None
+    while True:
+        response = client.get(url + (f'&cursor={cursor}' if cursor else ''))
+        assert response.status_code == 200
+        body = response.get_json()
+        ids.append([event['id'] for event in body['events']])
+        cursor = body['next_cursor']
+        if cursor is None:
+            return ids
+
+def test_pages_walk_active_events_in_date_order(client, make_event):
+    events = [
+        make_event(date=date(2030, 6, 3)),
+        make_event(date=date(2030, 6, 1)),
+        make_event(date=date(2030, 6, 1)),
+        make_event(date=date(2030, 6, 2)),
+        make_event(date=date(2030, 6, 4), is_active=False),
+    ]
+    first, second, third, fourth, _ = [event.id for event in events]
+
+    assert _pages(client, '/api/events?limit=2') == [[second, third], [fourth, first]]
+
+def test_fields_projects_listing_columns(client, make_event):
+    event = make_event()
+    response = client.get('/api/events?fields=id,title')
+    # date is always included: it is part of the cursor
+    assert response.get_json()['events'] == [{'id': event.id, 'title': 'Beach cleanup', 'date': '2030-06-01'}]
+
+@pytest.mark.parametrize('cursor', [
+    'not-base64!',
+    encode_cursor('2030-06-01'),
+    encode_cursor('2030-06-01', 'one'),
+    encode_cursor('2030-06-01', True),
+    encode_cursor('June 1st', 1),
+])
+def test_malformed_cursor_is_rejected(client, cursor):
+    response = client.get(f'/api/events?cursor={cursor}')
+    assert response.status_code == 400
@@ -0,0 +1,50 @@
+import pytest
+
+from app import db
+from models.event import Event
+from models.geocoding_job import GeocodingJob
+from services.geocoding_service import geocoding_service
+from services.geocoding_worker import geocoding_worker
+
+COORDINATES = {
+    'Old pier': (36.96, -122.02),
+    'New pier': (36.60, -121.89),
+}
+
+@pytest.fixture(autouse=True)
+def fake_geocoder(monkeypatch):
+    monkeypatch.setattr(geocoding_service, 'get_coordinates', COORDINATES.get)
+
+def _coordinates(event_id):
+    db.session.expire_all()
+    event = Event.query.get(event_id)
+    return event.latitude, event.longitude
+
+def test_writes_coordinates_and_geohash(app, make_event):
+    event = make_event()
+    geocoding_worker.enqueue(event.id, 'Old pier')
+    db.session.commit()
+
+    assert geocoding_worker.run_once() == 1
+
+    assert _coordinates(event.id) == COORDINATES['Old pier']
+    assert Event.query.get(event.id).geohash == Event.compute_geohash(*COORDINATES['Old pier'])
+
+def test_superseded_job_does_not_overwrite_newer_coordinates(app, make_event):
+    event = make_event()
+    old_job = GeocodingJob(event.id, 'Old pier', status='running')
+    db.session.add(old_job)
+    db.session.commit()
+    # The address changes while the old job is still with a worker
+    geocoding_worker.enqueue(event.id, 'New pier')
+    db.session.commit()
+
+    geocoding_worker.run_once()
+    assert _coordinates(event.id) == COORDINATES['New pier']
+
+    # The old job finishes last
+    old_job.status = 'pending'
+    db.session.commit()
+    geocoding_worker.run_once()
+
+    assert _coordinates(event.id) == COORDINATES['New pier']
@@ -0,0 +1,65 @@
+import pytest
+
+from services.llm_service import llm_service
+
+ARGS = dict(prompt='Where do we meet?', system_prompt='Be brief', temperature=0.3,
+            max_tokens=100, context_version='v1')
+
+@pytest.fixture
+def provider_calls(monkeypatch):
+    """Replace the provider with a fake that records every call."""
+    calls = []
+
+    def generate(prompt, system_prompt, temperature, max_tokens):
+        calls.append(prompt)
+        return f'answer {len(calls)}'
+    monkeypatch.setattr(llm_service, '_generate_with_lm_studio', generate)
+    llm_service.cache.clear()
+    yield calls
+    llm_service.cache.clear()
+
+def test_identical_requests_are_served_from_the_cache(provider_calls):
+    assert llm_service.generate_text(**ARGS) == 'answer 1'
+    assert llm_service.generate_text(**ARGS) == 'answer 1'
+    assert len(provider_calls) == 1
+
+@pytest.mark.parametrize('field, value', [
+    ('prompt', 'When do we meet?'),
+    ('system_prompt', 'Be thorough'),
+    ('temperature', 0.9),
+    ('max_tokens', 200),
+    ('context_version', 'v2'),
+])
+def test_every_key_field_separates_cache_entries(provider_calls, field, value):
+    llm_service.generate_text(**ARGS)
+    assert llm_service.generate_text(**dict(ARGS, **{field: value})) == 'answer 2'
+    assert len(provider_calls) == 2
+
+def test_model_is_part_of_the_key(provider_calls, monkeypatch):
+    llm_service.generate_text(**ARGS)
+    monkeypatch.setattr(llm_service, 'model_id', 'other-model')
+    llm_service.generate_text(**ARGS)
+    assert len(provider_calls) == 2
+
+def test_use_cache_false_always_calls_the_provider(provider_calls):
+    llm_service.generate_text(**ARGS)
+    llm_service.generate_text(**ARGS, use_cache=False)
+    assert len(provider_calls) == 2
+
+def test_editing_an_event_invalidates_cached_answers(client, provider_calls, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer)
+    headers = auth_headers(make_user())
+    question = {'question': 'What should I bring?'}
+
+    first = client.post(f'/api/{event.id}/ask-ecobot', json=question, headers=headers)
+    again = client.post(f'/api/{event.id}/ask-ecobot', json=question, headers=headers)
+    assert first.get_json() == again.get_json() == {'answer': 'answer 1'}
+
+    response = client.put(f'/api/events/{event.id}', json={'description': 'Bring a bucket'},
+                          headers=auth_headers(organizer))
+    assert response.status_code == 200
+
+    after_edit = client.post(f'/api/{event.id}/ask-ecobot', json=question, headers=headers)
+    assert after_edit.get_json() == {'answer': 'answer 2'}
+    assert 'Bring a bucket' in provider_calls[-1]
@@ -0,0 +1,60 @@
+import threading
+
+import pytest
+
+from services.llm_service import llm_service, ConcurrencyLimiter, LLMOverloadedError
+
+@pytest.fixture
+def limiter(monkeypatch):
+    """One slot, no queue: a second concurrent call is rejected at once."""
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=0, queue_timeout=0.05)
+    monkeypatch.setattr(llm_service, 'limiter', limiter)
+    monkeypatch.setattr(llm_service, '_generate_with_lm_studio', lambda *args: 'answer')
+    llm_service.cache.clear()
+    return limiter
+
+def test_queued_callers_get_the_slot_when_it_frees_up():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=1, queue_timeout=5)
+    acquired = threading.Event()
+
+    def wait_for_slot():
+        with limiter.slot():
+            acquired.set()
+
+    with limiter.slot():
+        waiter = threading.Thread(target=wait_for_slot)
+        waiter.start()
+        assert not acquired.wait(0.05)
+    waiter.join(5)
+    assert acquired.is_set()
+
+def test_queued_callers_time_out():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=1, queue_timeout=0.05)
+    with limiter.slot():
+        with pytest.raises(LLMOverloadedError):
+            with limiter.slot():
+                pass
+
+def test_callers_beyond_the_queue_fail_fast():
+    limiter = ConcurrencyLimiter(max_concurrency=1, max_queue=0, queue_timeout=5)
+    with limiter.slot():
+        with pytest.raises(LLMOverloadedError, match='Too many pending'):
+            with limiter.slot():
+                pass
+
+def test_saturated_limiter_answers_503(client, limiter, make_user, make_event, auth_headers):
+    event = make_event()
+    headers = auth_headers(make_user())
+    question = {'question': 'What should I bring?'}
+
+    with limiter.slot():
+        response = client.post(f'/api/{event.id}/ask-ecobot', json=question, headers=headers)
+        assert response.status_code == 503
+        assert response.headers['Retry-After'] == '5'
+
+        response = client.post(f'/api/{event.id}/ask-ecobot/stream', json=question, headers=headers)
+        assert response.status_code == 503
+
+    response = client.post(f'/api/{event.id}/ask-ecobot', json=question, headers=headers)
+    assert response.status_code == 200
+    assert response.get_json() == {'answer': 'answer'}
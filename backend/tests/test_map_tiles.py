@@ -0,0 +1,51 @@
+from services.map_tile_service import map_tile_service
+from utils.geo import lonlat_to_tile
+
+def test_low_zoom_tiles_cluster_nearby_events(client, make_event):
+    make_event(latitude=36.97, longitude=-122.03)
+    make_event(latitude=36.98, longitude=-122.02)
+    lone = make_event(latitude=-33.87, longitude=151.21)
+
+    response = client.get('/api/events/map-data?bbox=-180,-85,180,85&zoom=0')
+    clusters = sorted(response.get_json()['clusters'], key=lambda c: c['count'])
+
+    assert [c['count'] for c in clusters] == [1, 2]
+    assert clusters[0]['event_id'] == lone.id
+    assert abs(clusters[1]['latitude'] - 36.975) < 1e-6
+    assert abs(clusters[1]['longitude'] + 122.025) < 1e-6
+
+def test_high_zoom_tiles_separate_events(client, make_event):
+    first = make_event(latitude=36.97, longitude=-122.03)
+    second = make_event(latitude=36.98, longitude=-122.02)
+
+    response = client.get('/api/events/map-data?bbox=-122.04,36.96,-122.01,36.99&zoom=14')
+    ids = sorted(c['event_id'] for c in response.get_json()['clusters'])
+    assert ids == [first.id, second.id]
+
+def test_geohash_cells_are_at_most_half_a_grid_cell():
+    assert map_tile_service._cell_precision(3) == 2
+    assert map_tile_service._cell_precision(6) == 3
+    assert map_tile_service._cell_precision(23) == 10
+
+def test_event_writes_retire_cached_tiles(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer, latitude=36.97, longitude=-122.03)
+    url = '/api/events/map-data?bbox=-122.04,36.96,-122.01,36.99&zoom=14'
+
+    assert [c['event_id'] for c in client.get(url).get_json()['clusters']] == [event.id]
+
+    response = client.delete(f'/api/events/{event.id}', headers=auth_headers(organizer))
+    assert response.status_code == 200
+
+    assert client.get(url).get_json()['clusters'] == []
+
+def test_tiles_are_cached_per_events_version(app, make_event):
+    make_event(latitude=36.97, longitude=-122.03)
+    x, y = lonlat_to_tile(-122.03, 36.97, 14)
+
+    assert map_tile_service.get_tile(14, x, y, 1) != []
+    make_event(latitude=36.97, longitude=-122.03)
+
+    # A fill under an older stamp cannot leak into a newer one
+    assert [c['count'] for c in map_tile_service.get_tile(14, x, y, 1)] == [1]
+    assert [c['count'] for c in map_tile_service.get_tile(14, x, y, 2)] == [2]
@@ -0,0 +1,40 @@
+import ipaddress
+
+import pytest
+
+from services.metrics_service import metrics_service
+
+REMOTE = {'REMOTE_ADDR': '203.0.113.7'}
+
+@pytest.fixture
+def token(monkeypatch):
+    monkeypatch.setattr(metrics_service, 'token', 'scrape-secret')
+    return 'scrape-secret'
+
+def test_loopback_may_scrape_by_default(client):
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert b'# TYPE' in response.data
+
+def test_other_addresses_are_forbidden(client):
+    response = client.get('/metrics', environ_overrides=REMOTE)
+    assert response.status_code == 403
+    assert response.get_json() == {'error': 'Forbidden'}
+
+def test_allowed_networks_may_scrape(client, monkeypatch):
+    monkeypatch.setattr(metrics_service, 'allowed_networks', [ipaddress.ip_network('203.0.113.0/24')])
+    assert client.get('/metrics', environ_overrides=REMOTE).status_code == 200
+    # Loopback is only allowed by the default list
+    assert client.get('/metrics').status_code == 403
+
+def test_token_lets_any_address_scrape(client, token):
+    headers = {'Authorization': f'Bearer {token}'}
+    response = client.get('/metrics', headers=headers, environ_overrides=REMOTE)
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+
+@pytest.mark.parametrize('authorization', ['Bearer wrong', 'scrape-secret', ''])
+def test_wrong_token_is_forbidden(client, token, authorization):
+    response = client.get('/metrics', headers={'Authorization': authorization}, environ_overrides=REMOTE)
+    assert response.status_code == 403
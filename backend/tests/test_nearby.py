@@ -0,0 +1,79 @@
+from utils.geo import bounding_box
+
+CENTER = (36.97, -122.03)
+
+def _nearby(client, lat, lon, radius_km, **params):
+    query = '&'.join(f'{key}={value}' for key, value in params.items())
+    response = client.get(f'/api/events/nearby?lat={lat}&lon={lon}&radius_km={radius_km}&{query}')
+    assert response.status_code == 200
+    return response.get_json()
+
+def _events_north_of_center(make_event, *km_offsets):
+    lat, lon = CENTER
+    return [make_event(latitude=lat + km / 111.2, longitude=lon) for km in km_offsets]
+
+def test_filters_by_radius_and_orders_nearest_first(client, make_event):
+    far, near, middle, outside = _events_north_of_center(make_event, 5, 0.5, 2, 20)
+
+    body = _nearby(client, *CENTER, 10)
+
+    assert [event['id'] for event in body['events']] == [near.id, middle.id, far.id]
+    assert body['total'] == 3
+    assert [round(event['distance_km']) for event in body['events']] == [0, 2, 5]
+
+def test_inactive_events_are_excluded(client, make_event):
+    make_event(latitude=CENTER[0], longitude=CENTER[1], is_active=False)
+
+    assert _nearby(client, *CENTER, 10)['events'] == []
+
+def test_pages_with_limit_and_offset(client, make_event):
+    first, second, third = _events_north_of_center(make_event, 1, 2, 3)
+
+    page = _nearby(client, *CENTER, 10, limit=2)
+    assert [event['id'] for event in page['events']] == [first.id, second.id]
+    assert page['total'] == 3
+    assert page['next_offset'] == 2
+
+    page = _nearby(client, *CENTER, 10, limit=2, offset=2)
+    assert [event['id'] for event in page['events']] == [third.id]
+    assert page['next_offset'] is None
+
+    page = _nearby(client, *CENTER, 10, limit=2, offset=10)
+    assert page['events'] == []
+    assert page['total'] == 3
+
+def test_equal_distances_are_ordered_by_id(client, make_event):
+    lat, lon = CENTER
+    first = make_event(latitude=lat + 0.01, longitude=lon)
+    second = make_event(latitude=lat + 0.01, longitude=lon)
+
+    page = _nearby(client, *CENTER, 10, limit=1)
+    assert [event['id'] for event in page['events']] == [first.id]
+    page = _nearby(client, *CENTER, 10, limit=1, offset=1)
+    assert [event['id'] for event in page['events']] == [second.id]
+
+def test_finds_events_across_the_antimeridian(client, make_event):
+    east = make_event(latitude=0.0, longitude=179.95)
+    west = make_event(latitude=0.0, longitude=-179.95)
+
+    body = _nearby(client, 0.0, 179.99, 20)
+
+    assert [event['id'] for event in body['events']] == [east.id, west.id]
+    assert abs(body['events'][1]['distance_km'] - 6.67) < 0.01
+
+def test_finds_events_across_the_pole(client, make_event):
+    same_side = make_event(latitude=89.99, longitude=0.0)
+    far_side = make_event(latitude=89.99, longitude=180.0)
+
+    body = _nearby(client, 89.995, 0.0, 5)
+
+    assert [event['id'] for event in body['events']] == [same_side.id, far_side.id]
+
+def test_bounding_box_spans_all_longitudes_near_the_pole():
+    min_lat, max_lat, min_lon, max_lon = bounding_box(89.99, 10.0, 5)
+    assert max_lat == 90.0
+    assert (min_lon, max_lon) == (-180.0, 180.0)
+
+def test_bounding_box_runs_past_the_antimeridian():
+    _, _, min_lon, max_lon = bounding_box(0.0, 179.99, 20)
+    assert min_lon < 180.0 < max_lon
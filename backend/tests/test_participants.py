@@ -0,0 +1,73 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from sqlalchemy import select
+
+from app import db
+from models.event import Event
+from services.participant_service import participant_service
+
+def _participant_count(event):
+    return db.session.execute(select(Event.participant_count).where(Event.id == event.id)).scalar()
+
+def _join(client, auth_headers, event, user):
+    return client.post(f'/api/events/{event.id}/join', headers=auth_headers(user))
+
+def test_overflow_is_waitlisted_in_order(client, make_user, make_event, auth_headers):
+    event = make_event(max_participants=2)
+    users = [make_user() for _ in range(4)]
+
+    responses = [_join(client, auth_headers, event, user) for user in users]
+    assert [r.status_code for r in responses] == [200, 200, 202, 202]
+    assert [r.get_json().get('waitlist_position') for r in responses[2:]] == [1, 2]
+    assert _participant_count(event) == 2
+
+    assert _join(client, auth_headers, event, users[0]).status_code == 400
+    # Joining again while waitlisted keeps the original place
+    assert _join(client, auth_headers, event, users[3]).get_json()['waitlist_position'] == 2
+
+def test_leaving_promotes_the_head_of_the_waitlist(client, make_user, make_event, auth_headers):
+    event = make_event(max_participants=1)
+    first, second, third = make_user(), make_user(), make_user()
+    for user in (first, second, third):
+        _join(client, auth_headers, event, user)
+
+    response = client.post(f'/api/events/{event.id}/leave', headers=auth_headers(first))
+    assert response.status_code == 200
+    assert participant_service.is_participant(event.id, second.id)
+    assert participant_service.waitlist_position(event.id, third.id) == 1
+    assert _participant_count(event) == 1
+
+    # Leaving the waitlist frees no seat
+    client.post(f'/api/events/{event.id}/leave', headers=auth_headers(third))
+    assert participant_service.waitlist_position(event.id, third.id) is None
+    assert _participant_count(event) == 1
+
+def test_raising_capacity_promotes_waitlisted_users(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer, max_participants=1)
+    users = [make_user() for _ in range(3)]
+    for user in users:
+        _join(client, auth_headers, event, user)
+
+    response = client.put(f'/api/events/{event.id}', json={'max_participants': 2}, headers=auth_headers(organizer))
+    assert response.status_code == 200
+    assert participant_service.is_participant(event.id, users[1].id)
+    assert participant_service.waitlist_position(event.id, users[2].id) == 1
+    assert _participant_count(event) == 2
+
+def test_concurrent_joins_never_overbook(app, client, make_user, make_event, auth_headers):
+    if db.engine.dialect.name != 'postgresql':
+        pytest.skip('SQLite serializes writers, so there is no contention to test')
+    event_id = make_event(max_participants=5).id
+    headers = [auth_headers(make_user()) for _ in range(20)]
+
+    def join(user_headers):
+        return client.post(f'/api/events/{event_id}/join', headers=user_headers).status_code
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(join, headers))
+
+    assert statuses.count(200) == 5
+    assert statuses.count(202) == 15
+    assert db.session.get(Event, event_id).participant_count == 5
@@ -0,0 +1,87 @@
+import threading
+
+import bcrypt
+import pytest
+
+from app import db
+from models.user import User
+from services.password_service import password_service, PasswordServiceBusy
+
+def _login(client, user, password='password'):
+    return client.post('/api/auth/login', json={'email': user.email, 'password': password})
+
+def _stored_hash(user):
+    db.session.expire_all()
+    return User.query.get(user.id).password_hash
+
+def _cost(password_hash):
+    return int(password_hash.split('$')[2])
+
+@pytest.fixture
+def saturate_pool(monkeypatch):
+    """Take the pool's only pending slot, so new work times out at once."""
+    def saturate_pool():
+        pending = threading.BoundedSemaphore(1)
+        pending.acquire()
+        monkeypatch.setattr(password_service, '_pending', pending)
+        monkeypatch.setattr(password_service, 'queue_timeout', 0.01)
+    return saturate_pool
+
+def test_login_rehashes_passwords_made_with_another_cost(client, make_user):
+    user = make_user()
+    old_cost = password_service.rounds + 1
+    user.password_hash = bcrypt.hashpw(b'password', bcrypt.gensalt(old_cost)).decode('utf-8')
+    db.session.commit()
+
+    assert _login(client, user).status_code == 200
+
+    new_hash = _stored_hash(user)
+    assert _cost(new_hash) == password_service.rounds
+    assert _login(client, user).status_code == 200
+
+def test_login_keeps_hashes_at_the_current_cost(client, make_user):
+    user = make_user()
+    stored = user.password_hash
+
+    assert _login(client, user).status_code == 200
+    assert _stored_hash(user) == stored
+
+def test_wrong_password_is_not_rehashed(client, make_user):
+    user = make_user()
+    user.password_hash = bcrypt.hashpw(b'password', bcrypt.gensalt(password_service.rounds + 1)).decode('utf-8')
+    db.session.commit()
+    stored = user.password_hash
+
+    assert _login(client, user, 'wrong').status_code == 401
+    assert _stored_hash(user) == stored
+
+def test_needs_rehash():
+    assert not password_service.needs_rehash(password_service.hash_password('secret'))
+    assert password_service.needs_rehash('$2b$31$' + 'x' * 53)
+    assert password_service.needs_rehash('not-a-bcrypt-hash')
+
+def test_busy_pool_answers_503_on_login_and_signup(client, make_user, saturate_pool):
+    user = make_user()
+    saturate_pool()
+
+    response = _login(client, user)
+    assert response.status_code == 503
+
+    response = client.post('/api/auth/signup', json={
+        'fullName': 'New User', 'email': 'new@example.com', 'password': 'secret', 'userType': 'volunteer'
+    })
+    assert response.status_code == 503
+    assert User.query.filter_by(email='new@example.com').first() is None
+
+def test_busy_pool_postpones_the_rehash_without_failing_login(client, make_user, monkeypatch):
+    user = make_user()
+    user.password_hash = bcrypt.hashpw(b'password', bcrypt.gensalt(password_service.rounds + 1)).decode('utf-8')
+    db.session.commit()
+    stored = user.password_hash
+
+    def busy(password):
+        raise PasswordServiceBusy('Too many pending password operations')
+    monkeypatch.setattr(password_service, 'hash_password', busy)
+
+    assert _login(client, user).status_code == 200
+    assert _stored_hash(user) == stored
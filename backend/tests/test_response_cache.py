@@ -0,0 +1,47 @@
+from sqlalchemy import update
+
+from app import db
+from models.event import Event
+from services.response_cache_service import response_cache_service
+
+def _local_hits():
+    return response_cache_service.stats().get('events.get_events', {}).get('local_hits', 0)
+
+def _titles(client):
+    return [event['title'] for event in client.get('/api/events').get_json()['events']]
+
+def test_listing_is_served_from_cache_until_a_write_bumps_the_version(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer, title='Beach cleanup')
+    assert _titles(client) == ['Beach cleanup']
+
+    # A change that bypasses the write path is not seen: the cached body is reused
+    db.session.execute(update(Event).where(Event.id == event.id).values(title='Changed behind the cache'))
+    db.session.commit()
+    hits = _local_hits()
+    assert _titles(client) == ['Beach cleanup']
+    assert _local_hits() == hits + 1
+
+    response = client.put(f'/api/events/{event.id}', json={'title': 'Dune restoration'}, headers=auth_headers(organizer))
+    assert response.status_code == 200
+    assert _titles(client) == ['Dune restoration']
+
+def test_join_and_leave_refresh_cached_event(client, make_user, make_event, auth_headers):
+    event, volunteer = make_event(), make_user()
+
+    def volunteer_count():
+        return client.get(f'/api/events/{event.id}').get_json()['volunteer_count']
+
+    assert volunteer_count() == 0
+    client.post(f'/api/events/{event.id}/join', headers=auth_headers(volunteer))
+    assert volunteer_count() == 1
+    client.post(f'/api/events/{event.id}/leave', headers=auth_headers(volunteer))
+    assert volunteer_count() == 0
+
+def test_deleted_event_leaves_cached_listing(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer)
+    assert len(client.get('/api/events').get_json()['events']) == 1
+
+    assert client.delete(f'/api/events/{event.id}', headers=auth_headers(organizer)).status_code == 200
+    assert client.get('/api/events').get_json()['events'] == []
@@ -0,0 +1,22 @@
+from app import db
+from services.search_service import search_service
+
+def _indexed(*events):
+    for event in events:
+        search_service.index_event(event)
+    db.session.commit()
+    return events
+
+def test_prefix_terms_need_two_characters(app, make_event):
+    kelp, _ = _indexed(make_event(title='Kelp forest dive'), make_event(title='Kayak trail sweep'))
+    assert [event_id for event_id, _ in search_service.search('ke', 10)] == [kelp.id]
+    # A single letter is a whole word, not a prefix of every "k..." word
+    assert search_service.search('k', 10) == []
+
+def test_rebuild_indexes_events_and_refreshes_cached_results(client, make_event):
+    event = make_event(title='Kelp forest dive')
+    assert client.get('/api/events/search?q=kelp').get_json()['events'] == []
+
+    assert search_service.rebuild() == 1
+    response = client.get('/api/events/search?q=kelp')
+    assert [e['id'] for e in response.get_json()['events']] == [event.id]
@@ -0,0 +1,73 @@
+from datetime import datetime, timedelta
+
+import pytest
+
+from app import db
+from models.social_post_job import SocialPostJob
+from services.llm_service import llm_service, LLMOverloadedError
+from services.social_post_service import social_post_service
+
+@pytest.fixture
+def overloaded_llm(monkeypatch):
+    def generate_text(*args, **kwargs):
+        raise LLMOverloadedError()
+    monkeypatch.setattr(llm_service, 'generate_text', generate_text)
+
+def _run_after(job):
+    # PostgreSQL returns timestamptz values as aware datetimes
+    return job.run_after.replace(tzinfo=None)
+
+def _pending_jobs(event_id):
+    db.session.expire_all()
+    return SocialPostJob.query.filter_by(event_id=event_id, status='pending').all()
+
+def test_overloaded_job_backs_off_before_it_is_claimed_again(app, make_event, overloaded_llm):
+    event = make_event()
+    job = social_post_service.enqueue(event.id)
+    db.session.commit()
+
+    [job_id] = social_post_service._claim_batch(4)
+    social_post_service._run_job(app, job_id)
+
+    [job] = _pending_jobs(event.id)
+    assert job.attempts == 1
+    assert _run_after(job) > datetime.utcnow() + timedelta(seconds=social_post_service.overload_backoff - 5)
+    assert social_post_service._claim_batch(4) == []
+
+    # Each further overload doubles the wait
+    job.run_after = datetime.utcnow() - timedelta(seconds=1)
+    db.session.commit()
+    [job_id] = social_post_service._claim_batch(4)
+    social_post_service._run_job(app, job_id)
+
+    [job] = _pending_jobs(event.id)
+    assert job.attempts == 2
+    assert _run_after(job) > datetime.utcnow() + timedelta(seconds=2 * social_post_service.overload_backoff - 5)
+
+def test_joins_do_not_queue_posts_for_events_without_one(client, make_user, make_event, auth_headers):
+    event = make_event()
+
+    response = client.post(f'/api/events/{event.id}/join', headers=auth_headers(make_user()))
+    assert response.status_code == 200
+
+    assert _pending_jobs(event.id) == []
+
+def test_joins_refresh_an_existing_post_once_after_a_delay(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer)
+    db.session.add(SocialPostJob(event.id, status='done'))
+    db.session.commit()
+
+    for _ in range(2):
+        response = client.post(f'/api/events/{event.id}/join', headers=auth_headers(make_user()))
+        assert response.status_code == 200
+
+    [job] = _pending_jobs(event.id)
+    assert _run_after(job) > datetime.utcnow()
+    assert social_post_service._claim_batch(4) == []
+
+    # An organizer asking for the post does not wait out the delay
+    response = client.post(f'/api/{event.id}/generate-post', headers=auth_headers(organizer))
+    assert response.status_code == 202
+    [job] = _pending_jobs(event.id)
+    assert job.run_after is None
@@ -0,0 +1,67 @@
+import pytest
+
+from app import db
+from services.tag_service import normalize_tags, tag_service
+
+@pytest.fixture
+def tagged_event(make_user, make_event):
+    """Events with their tag rows and counts written, as the routes do."""
+    organizer = make_user('organizer')
+
+    def tagged_event(tags):
+        event = make_event(organizer, tags=tags)
+        tag_service.set_tags(event, tags, was_active=False)
+        db.session.commit()
+        return event
+    tagged_event.organizer = organizer
+    return tagged_event
+
+def _facets(client):
+    return {row['tag']: row['count'] for row in client.get('/api/events/tags').get_json()['tags']}
+
+def _ids_tagged(client, tags):
+    return sorted(event['id'] for event in client.get(f'/api/events?tags={tags}').get_json()['events'])
+
+def test_normalize_tags():
+    assert normalize_tags(['  Beach ', 'beach', 'Kelp   Forest', '']) == ['beach', 'kelp forest']
+
+@pytest.mark.parametrize('tags', ['beach', ['x' * 51], [str(n) for n in range(21)]])
+def test_normalize_tags_rejects_bad_input(tags):
+    with pytest.raises(ValueError):
+        normalize_tags(tags)
+
+def test_updated_tags_are_normalized(client, tagged_event, auth_headers):
+    event = tagged_event(['beach'])
+    headers = auth_headers(tagged_event.organizer)
+
+    response = client.put(f'/api/events/{event.id}', json={'tags': ['Beach', ' BEACH ', 'Kelp  Forest']},
+                          headers=headers)
+    assert response.status_code == 200
+    assert response.get_json()['tags'] == ['beach', 'kelp forest']
+    assert _ids_tagged(client, 'kelp forest') == [event.id]
+
+    response = client.put(f'/api/events/{event.id}', json={'tags': ['x' * 51]}, headers=headers)
+    assert response.status_code == 400
+
+def test_tags_filter_requires_every_tag(client, tagged_event):
+    both = tagged_event(['beach', 'plastic'])
+    tagged_event(['beach'])
+    tagged_event(['plastic'])
+
+    assert _ids_tagged(client, 'beach,plastic') == [both.id]
+    assert _ids_tagged(client, ' Plastic , BEACH') == [both.id]
+    assert len(_ids_tagged(client, 'beach')) == 2
+
+def test_facets_count_active_events(client, tagged_event, auth_headers):
+    first = tagged_event(['beach', 'plastic'])
+    second = tagged_event(['beach'])
+    headers = auth_headers(tagged_event.organizer)
+    assert _facets(client) == {'beach': 2, 'plastic': 1}
+
+    response = client.put(f'/api/events/{second.id}', json={'tags': ['kelp']}, headers=headers)
+    assert response.status_code == 200
+    assert _facets(client) == {'beach': 1, 'plastic': 1, 'kelp': 1}
+
+    response = client.delete(f'/api/events/{first.id}', headers=headers)
+    assert response.status_code == 200
+    assert _facets(client) == {'kelp': 1}
@@ -0,0 +1,41 @@
+from flask_jwt_extended import create_access_token
+
+from app import db
+
+def test_role_comes_from_the_token_claim(client, make_user):
+    user = make_user('volunteer')
+    # The claim, not the users table, decides the role
+    token = create_access_token(identity=str(user.id), additional_claims={'user_type': 'organizer'})
+
+    response = client.get('/api/users/stats', headers={'Authorization': f'Bearer {token}'})
+    assert set(response.get_json()) == {'eventsCreated', 'totalVolunteers'}
+
+def test_tokens_without_a_role_claim_fall_back_to_the_user(client, make_user):
+    user = make_user('organizer')
+    token = create_access_token(identity=str(user.id))
+
+    response = client.get('/api/users/stats', headers={'Authorization': f'Bearer {token}'})
+    assert set(response.get_json()) == {'eventsCreated', 'totalVolunteers'}
+
+def test_snapshots_are_served_from_the_cache(client, make_user, auth_headers):
+    user = make_user()
+    headers = auth_headers(user)
+    original_name = user.full_name
+    assert client.get('/api/users/profile', headers=headers).get_json()['full_name'] == original_name
+
+    user.full_name = 'Changed Behind The Cache'
+    db.session.commit()
+
+    assert client.get('/api/users/profile', headers=headers).get_json()['full_name'] == original_name
+
+def test_profile_update_invalidates_the_snapshot(client, make_user, auth_headers):
+    user = make_user()
+    headers = auth_headers(user)
+    assert client.get('/api/auth/me', headers=headers).status_code == 200
+    assert client.get('/api/users/profile', headers=headers).status_code == 200
+
+    response = client.put('/api/users/profile', json={'fullName': 'Renamed'}, headers=headers)
+    assert response.status_code == 200
+
+    assert client.get('/api/users/profile', headers=headers).get_json()['full_name'] == 'Renamed'
+    assert client.get('/api/auth/me', headers=headers).get_json()['full_name'] == 'Renamed'
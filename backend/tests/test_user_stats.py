@@ -0,0 +1,52 @@
+from decimal import Decimal
+
+from app import db
+from models.event import EventRegistration
+from models.waste_log import WasteLog
+from services.user_stats_service import user_stats_service, CITY_SCOPE
+
+def test_city_leaderboard_follows_event_city_changes(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer, city='Santa Cruz')
+    volunteer = make_user()
+    log = WasteLog(event.id, volunteer.id, 'plastic', Decimal('2.5'), 'kg')
+    db.session.add(log)
+    user_stats_service.waste_log_created(log)
+    db.session.commit()
+
+    response = client.put(f'/api/events/{event.id}', json={'city': 'Monterey'}, headers=auth_headers(organizer))
+    assert response.status_code == 200
+
+    assert user_stats_service.get_leaderboard(CITY_SCOPE, 'santa cruz') == []
+    [entry] = user_stats_service.get_leaderboard(CITY_SCOPE, 'monterey')
+    assert entry.user_id == volunteer.id
+    assert entry.total_waste == Decimal('2.5')
+    assert entry.log_count == 1
+
+def test_rebuild_counts_registrations_for_attended_and_hosted(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer)
+    attended, registered = make_user(), make_user()
+    db.session.add_all([
+        EventRegistration(event.id, attended.id, status='attended'),
+        EventRegistration(event.id, registered.id),
+    ])
+    db.session.commit()
+
+    user_stats_service.rebuild()
+
+    response = client.get('/api/users/stats', headers=auth_headers(organizer))
+    assert response.get_json()['totalVolunteers'] == 2
+    response = client.get('/api/users/stats', headers=auth_headers(attended))
+    assert response.get_json()['eventsAttended'] == 1
+
+def test_joining_does_not_change_volunteers_hosted(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer)
+    volunteer = make_user()
+
+    response = client.post(f'/api/events/{event.id}/join', headers=auth_headers(volunteer))
+    assert response.status_code == 200
+
+    response = client.get('/api/users/stats', headers=auth_headers(organizer))
+    assert response.get_json()['totalVolunteers'] == 0
@@ -0,0 +1,54 @@
+import uuid
+
+from app import db
+from models.event import EventRegistration
+from models.waste_log import WasteLog
+
+def _register(user, event):
+    db.session.add(EventRegistration(event.id, user.id))
+    db.session.commit()
+
+def _post(client, headers, event, logs):
+    return client.post(f'/api/waste-logs/event/{event.id}/bulk', json={'logs': logs}, headers=headers)
+
+def test_retried_batch_is_deduplicated(client, make_user, make_event, auth_headers):
+    user, event = make_user(), make_event()
+    _register(user, event)
+    log_id = str(uuid.uuid4())
+    logs = [{'id': log_id, 'wasteType': 'plastic', 'quantity': '1.5', 'unit': 'kg'}]
+
+    first = _post(client, auth_headers(user), event, logs + logs)
+    assert first.status_code == 200
+    assert first.get_json()['created'] == 1
+    assert [r['status'] for r in first.get_json()['results']] == ['created', 'duplicate']
+
+    retry = _post(client, auth_headers(user), event, logs)
+    assert retry.get_json()['created'] == 0
+    assert retry.get_json()['results'][0]['status'] == 'duplicate'
+    assert WasteLog.query.count() == 1
+
+def test_id_owned_by_another_user_is_a_conflict(client, make_user, make_event, auth_headers):
+    owner, other, event = make_user(), make_user(), make_event()
+    _register(owner, event)
+    _register(other, event)
+    log = {'id': str(uuid.uuid4()), 'wasteType': 'glass', 'quantity': 2, 'unit': 'kg'}
+    _post(client, auth_headers(owner), event, [log])
+
+    response = _post(client, auth_headers(other), event, [log])
+    result = response.get_json()['results'][0]
+    assert result['status'] == 'conflict'
+    assert response.get_json()['created'] == 0
+    assert str(WasteLog.query.one().user_id) == str(owner.id)
+
+def test_invalid_items_are_reported_per_index(client, make_user, make_event, auth_headers):
+    user, event = make_user(), make_event()
+    _register(user, event)
+    response = _post(client, auth_headers(user), event, [
+        {'wasteType': 'x' * 51, 'quantity': 1, 'unit': 'kg'},
+        {'wasteType': 'paper', 'quantity': 1, 'unit': 'k' * 21},
+        {'wasteType': 'paper', 'quantity': 1, 'unit': 'kg', 'notes': 5},
+        {'wasteType': 'paper', 'quantity': 'NaN', 'unit': 'kg'},
+        {'wasteType': 'paper', 'quantity': 1, 'unit': 'kg', 'notes': None},
+    ])
+    statuses = [r['status'] for r in response.get_json()['results']]
+    assert statuses == ['error', 'error', 'error', 'error', 'created']
@@ -0,0 +1,22 @@
+from datetime import datetime
+
+from app import db
+from models.waste_log import WasteLog
+
+def test_date_only_date_to_includes_the_whole_day(client, make_user, make_event, auth_headers):
+    organizer = make_user('organizer')
+    event = make_event(organizer)
+    volunteer = make_user()
+    for created_at in (datetime(2030, 6, 1, 23, 30), datetime(2030, 6, 2, 0, 30)):
+        log = WasteLog(event.id, volunteer.id, 'plastic', 1, 'kg')
+        log.created_at = created_at
+        db.session.add(log)
+    db.session.commit()
+
+    response = client.get(
+        '/api/waste-logs/export?format=ndjson&date_to=2030-06-01',
+        headers=auth_headers(organizer)
+    )
+    assert response.status_code == 200
+    assert len(response.get_data().splitlines()) == 1
+    response.close()
@@ -0,0 +1,221 @@
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Returned by cache lookups on a miss, so that None can be cached as a value
+MISSING = object()
+
+# A ttl of zero or less: the value would be expired on arrival
+_EXPIRED = object()
+
+# SQLiteCache enforces max_entries at most once per this many writes per process
+EVICT_EVERY = 100
+
+def _resolve_ttl(ttl, default_ttl):
+    """Seconds to keep a value, None to keep it until evicted, or _EXPIRED to skip storing it."""
+    ttl = default_ttl if ttl is None else ttl
+    if ttl is not None and ttl <= 0:
+        return _EXPIRED
+    return ttl
+
+class MemoryCache:
+    """
+    Bounded in-process cache with LRU eviction and per-entry TTL.
+    """
+
+    def __init__(self, max_entries=1024, default_ttl=None):
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return MISSING
+            value, expires_at = entry
+            if expires_at is not None and expires_at <= time.time():
+                del self._entries[key]
+                return MISSING
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None):
+        ttl = _resolve_ttl(ttl, self.default_ttl)
+        if ttl is _EXPIRED:
+            return
+        with self._lock:
+            self._store(key, value, ttl)
+
+    def add(self, key, value, ttl=None):
+        """Set the key only if it is absent or expired. Returns True if it was set."""
+        ttl = _resolve_ttl(ttl, self.default_ttl)
+        if ttl is _EXPIRED:
+            return False
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and (entry[1] is None or entry[1] > time.time()):
+                return False
+            self._store(key, value, ttl)
+            return True
+
+    def _store(self, key, value, ttl):
+        expires_at = time.time() + ttl if ttl is not None else None
+        self._entries[key] = (value, expires_at)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+class SQLiteCache:
+    """
+    Cache stored in a SQLite file so it survives restarts and is shared by every
+    worker process on the host. Values are stored as JSON.
+
+    Lookups only read. Entries expire after their TTL, and past `max_entries`
+    the least recently written entries are evicted; the bound is enforced
+    every few writes rather than on each one, so it can be exceeded briefly.
+    Connections are opened lazily per process and thread, so a cache built
+    before gunicorn forks its workers (--preload) is safe to use in each.
+    """
+
+    def __init__(self, path, namespace='default', max_entries=10000, default_ttl=None):
+        self.path = path
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self.default_ttl = default_ttl
+        self._local = threading.local()
+        # Small caches evict more often so they overshoot by at most ~10%
+        self.evict_every = max(1, min(EVICT_EVERY, max_entries // 10))
+        self._writes = 0
+        self._writes_lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _connection(self):
+        # A forked child inherits the parent's thread-local; never reuse its connection
+        pid = os.getpid()
+        if getattr(self._local, 'pid', None) != pid:
+            conn = sqlite3.connect(self.path, timeout=10, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._init_schema(conn)
+            self._local.conn = conn
+            self._local.pid = pid
+        return self._local.conn
+
+    @staticmethod
+    def _init_schema(conn):
+        conn.execute(
+            'CREATE TABLE IF NOT EXISTS cache_entries ('
+            'namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, '
+            'expires_at REAL, accessed_at REAL NOT NULL, '
+            'PRIMARY KEY (namespace, key))'
+        )
+        conn.execute(
+            'CREATE INDEX IF NOT EXISTS ix_cache_entries_lru '
+            'ON cache_entries (namespace, accessed_at)'
+        )
+
+    def get(self, key):
+        row = self._connection().execute(
+            'SELECT value FROM cache_entries WHERE namespace = ? AND key = ? '
+            'AND (expires_at IS NULL OR expires_at > ?)',
+            (self.namespace, key, time.time())
+        ).fetchone()
+        if row is None:
+            return MISSING
+        return json.loads(row[0])
+
+    def set(self, key, value, ttl=None):
+        ttl = _resolve_ttl(ttl, self.default_ttl)
+        if ttl is _EXPIRED:
+            return
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        conn = self._connection()
+        conn.execute(
+            'INSERT OR REPLACE INTO cache_entries (namespace, key, value, expires_at, accessed_at) '
+            'VALUES (?, ?, ?, ?, ?)',
+            (self.namespace, key, json.dumps(value), expires_at, now)
+        )
+        if self._due_for_eviction():
+            self._evict(conn, now)
+
+    def _due_for_eviction(self):
+        with self._writes_lock:
+            self._writes += 1
+            return self._writes % self.evict_every == 0
+
+    def _evict(self, conn, now):
+        conn.execute(
+            'DELETE FROM cache_entries WHERE namespace = ? AND expires_at IS NOT NULL AND expires_at <= ?',
+            (self.namespace, now)
+        )
+        # Everything older than the max_entries-th newest entry goes
+        conn.execute(
+            'DELETE FROM cache_entries WHERE namespace = ? AND accessed_at < ('
+            'SELECT accessed_at FROM cache_entries WHERE namespace = ? '
+            'ORDER BY accessed_at DESC LIMIT 1 OFFSET ?)',
+            (self.namespace, self.namespace, self.max_entries - 1)
+        )
+
+    def add(self, key, value, ttl=None):
+        """Atomically set the key only if it is absent or expired. Returns True if it was set."""
+        ttl = _resolve_ttl(ttl, self.default_ttl)
+        if ttl is _EXPIRED:
+            return False
+        now = time.time()
+        expires_at = now + ttl if ttl is not None else None
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            conn.execute(
+                'DELETE FROM cache_entries WHERE namespace = ? AND key = ? '
+                'AND expires_at IS NOT NULL AND expires_at <= ?',
+                (self.namespace, key, now)
+            )
+            inserted = conn.execute(
+                'INSERT OR IGNORE INTO cache_entries (namespace, key, value, expires_at, accessed_at) '
+                'VALUES (?, ?, ?, ?, ?)',
+                (self.namespace, key, json.dumps(value), expires_at, now)
+            ).rowcount
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return inserted == 1
+
+    def delete(self, key):
+        self._connection().execute(
+            'DELETE FROM cache_entries WHERE namespace = ? AND key = ?',
+            (self.namespace, key)
+        )
+
+    def clear(self):
+        self._connection().execute(
+            'DELETE FROM cache_entries WHERE namespace = ?',
+            (self.namespace,)
+        )
+
+def create_cache(backend, namespace, max_entries, default_ttl=None, path=None):
+    """
+    Build a cache backend by name ('sqlite' or 'memory').
+    """
+    if backend == 'sqlite':
+        return SQLiteCache(path, namespace=namespace, max_entries=max_entries, default_ttl=default_ttl)
+    if backend == 'memory':
+        return MemoryCache(max_entries=max_entries, default_ttl=default_ttl)
+    raise ValueError(f"Unknown cache backend: {backend}")
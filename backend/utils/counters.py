@@ -0,0 +1,25 @@
+from sqlalchemy import update, insert
+from sqlalchemy.exc import IntegrityError
+from app import db
+
+def increment_counters(model, keys, deltas):
+    """
+    Atomically add `deltas` to the counter columns of the row identified by
+    `keys`, inserting the row with the deltas as initial values if it is missing.
+    Runs in the caller's transaction; the caller is responsible for committing.
+    """
+    stmt = (
+        update(model)
+        .where(*[getattr(model, column) == value for column, value in keys.items()])
+        .values({column: getattr(model, column) + delta for column, delta in deltas.items()})
+        .execution_options(synchronize_session=False)
+    )
+    if db.session.execute(stmt).rowcount:
+        return
+
+    # First write for this key; a concurrent insert may win the race
+    try:
+        with db.session.begin_nested():
+            db.session.execute(insert(model).values(**keys, **deltas))
+    except IntegrityError:
+        db.session.execute(stmt)
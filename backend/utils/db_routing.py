@@ -0,0 +1,216 @@
+import os
+import random
+from functools import wraps
+from flask import current_app, g, request, has_request_context
+from flask_jwt_extended import verify_jwt_in_request, get_jwt_identity
+from flask_sqlalchemy.session import Session
+from itsdangerous import BadSignature, URLSafeTimedSerializer
+from sqlalchemy import Select
+from utils.cache import MemoryCache, MISSING
+
+PRIMARY = 'primary'
+REPLICA = 'replica'
+# A read request whose route is chosen on its first query, once the view has
+# verified any token
+UNDECIDED = 'undecided'
+REPLICA_BIND_PREFIX = 'replica_'
+
+READ_METHODS = ('GET', 'HEAD', 'OPTIONS')
+
+STICKY_COOKIE = 'db_sticky'
+
+# Execution options marking a raw SQL read as safe to serve from a replica,
+# and a read (e.g. SELECT ... FOR UPDATE) that must stay on the primary
+REPLICA_SAFE_OPTION = 'db_replica_safe'
+PRIMARY_ONLY_OPTION = 'db_primary_only'
+
+def _setting(prefix, name, default):
+    """DB_REPLICA_<NAME> falls back to DB_<NAME>, so replicas inherit primary settings."""
+    if prefix != 'DB':
+        return os.getenv(f'{prefix}_{name}', os.getenv(f'DB_{name}', default))
+    return os.getenv(f'DB_{name}', default)
+
+def engine_options(url, prefix='DB'):
+    """
+    Engine options for one bind from <prefix>_POOL_SIZE, _MAX_OVERFLOW,
+    _POOL_RECYCLE, _POOL_PRE_PING and _STATEMENT_TIMEOUT_MS.
+    SQLite keeps SQLAlchemy's default pool, and statement timeouts apply to
+    PostgreSQL only.
+    """
+    options = {
+        'pool_pre_ping': _setting(prefix, 'POOL_PRE_PING', '1') not in ('0', 'false', 'False'),
+    }
+    if url.startswith('sqlite'):
+        return options
+
+    options.update(
+        pool_size=int(_setting(prefix, 'POOL_SIZE', '5')),
+        max_overflow=int(_setting(prefix, 'MAX_OVERFLOW', '10')),
+        pool_recycle=int(_setting(prefix, 'POOL_RECYCLE', '1800')),
+    )
+    statement_timeout = int(_setting(prefix, 'STATEMENT_TIMEOUT_MS', '0'))
+    if statement_timeout and url.startswith('postgresql'):
+        options['connect_args'] = {'options': f'-c statement_timeout={statement_timeout}'}
+    return options
+
+def configure(app, primary_url):
+    """
+    Set the primary URI and one SQLALCHEMY_BINDS entry per replica in
+    DATABASE_REPLICA_URLS (comma separated), each with its own engine options.
+    """
+    app.config['SQLALCHEMY_DATABASE_URI'] = primary_url
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(primary_url)
+    replica_urls = [url.strip() for url in os.getenv('DATABASE_REPLICA_URLS', '').split(',') if url.strip()]
+    app.config['SQLALCHEMY_BINDS'] = {
+        f'{REPLICA_BIND_PREFIX}{index}': dict(url=url, **engine_options(url, 'DB_REPLICA'))
+        for index, url in enumerate(replica_urls)
+    }
+
+class StickinessTracker:
+    """
+    Remembers users who wrote recently, so their reads go to the primary
+    until replicas have had time to catch up. The marker travels in a signed
+    cookie that expires with the window, so every worker can honour it
+    without a lookup. An in-process TTL cache covers clients that don't send
+    cookies back, as long as they stay on the same worker.
+    """
+
+    def __init__(self, secret_key):
+        self.window = int(os.getenv('DB_STICKY_SECONDS', '5'))
+        self.serializer = URLSafeTimedSerializer(secret_key, salt='db-sticky')
+        self.recent = MemoryCache(
+            max_entries=int(os.getenv('DB_STICKY_MAX_ENTRIES', '100000')),
+            default_ttl=self.window
+        )
+
+    def mark(self, identity, response):
+        identity = str(identity)
+        self.recent.set(identity, True)
+        response.set_cookie(
+            STICKY_COOKIE, self.serializer.dumps(identity),
+            max_age=self.window, httponly=True, samesite='Lax'
+        )
+
+    def is_sticky(self, identity):
+        if self.recent.get(identity) is not MISSING:
+            return True
+        cookie = request.cookies.get(STICKY_COOKIE)
+        if not cookie:
+            return False
+        try:
+            return self.serializer.loads(cookie, max_age=self.window) == identity
+        except BadSignature:
+            return False
+
+class RoutingSession(Session):
+    """
+    Sends plain SELECTs, and raw SQL marked with replica_safe(), to a replica
+    when the current request reads. Flushes, DML, reads marked with
+    primary_only(), other raw SQL and anything outside a request go to the
+    primary. A request that writes is pinned to the primary for the rest of
+    its queries.
+    """
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not has_request_context() or engine is not self._db.engine:
+            # Models on an explicit bind_key keep their own database
+            return engine
+        route = g.get('db_route')
+        if route not in (REPLICA, UNDECIDED):
+            return engine
+        if self._flushing or not _replica_readable(clause):
+            g.db_route = PRIMARY
+            return engine
+        if route == UNDECIDED:
+            route = _choose_read_route()
+        return self._db.engines[g.db_replica] if route == REPLICA else engine
+
+def _replica_readable(clause):
+    if clause is None:
+        return False
+    options = clause.get_execution_options()
+    if options.get(PRIMARY_ONLY_OPTION, False):
+        return False
+    return isinstance(clause, Select) or options.get(REPLICA_SAFE_OPTION, False)
+
+def replica_safe(statement):
+    """Allow a raw SQL read, e.g. a text() query, to run on a replica."""
+    return statement.execution_options(**{REPLICA_SAFE_OPTION: True})
+
+def primary_only(statement):
+    """Keep a read on the primary. Locking reads need this: replicas cannot take row locks."""
+    return statement.execution_options(**{PRIMARY_ONLY_OPTION: True})
+
+def use_primary(view):
+    """Route every query of a read-only view to the primary, e.g. for polling worker results."""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        g.db_route = PRIMARY
+        return view(*args, **kwargs)
+    return wrapper
+
+def mark_sticky(identity):
+    """
+    Pin `identity`'s next reads to the primary. For views that write before
+    the request carries a token, e.g. signup and login.
+    """
+    g.db_sticky_identity = str(identity)
+
+def _identity():
+    """
+    The request's JWT identity. Reuses the token the view already verified,
+    and otherwise decodes it once per request.
+    """
+    if 'db_identity' not in g:
+        try:
+            g.db_identity = get_jwt_identity()
+        except RuntimeError:
+            # No view has verified a token yet
+            try:
+                verify_jwt_in_request(optional=True)
+                g.db_identity = get_jwt_identity()
+            except Exception:
+                # Invalid tokens are rejected by the view itself; route as anonymous
+                g.db_identity = None
+    return g.db_identity
+
+def _choose_read_route():
+    """Send a read request to a replica unless its user wrote recently."""
+    routing = current_app.extensions['db_routing']
+    identity = _identity()
+    if identity is not None and routing['tracker'].is_sticky(identity):
+        g.db_route = PRIMARY
+    else:
+        g.db_route = REPLICA
+        # One replica per request keeps its reads on a single snapshot
+        g.db_replica = random.choice(routing['replicas'])
+    return g.db_route
+
+def init_app(app):
+    """Route each request's queries and record writers for read-your-writes."""
+    replicas = [key for key in app.config.get('SQLALCHEMY_BINDS', {}) if key.startswith(REPLICA_BIND_PREFIX)]
+    if not replicas:
+        return
+    tracker = StickinessTracker(app.config['SECRET_KEY'])
+    app.extensions['db_routing'] = {'tracker': tracker, 'replicas': replicas}
+    debug_header = os.getenv('DB_ROUTE_HEADER', '0') == '1'
+
+    @app.before_request
+    def route_request():
+        # Reads decide on their first query, so the view's JWT check comes first
+        g.db_route = UNDECIDED if request.method in READ_METHODS else PRIMARY
+
+    @app.after_request
+    def remember_writer(response):
+        if request.method not in READ_METHODS and response.status_code < 400:
+            identity = g.get('db_sticky_identity') or _identity()
+            if identity is not None:
+                tracker.mark(identity, response)
+        if debug_header:
+            route = g.get('db_route', PRIMARY)
+            if route == UNDECIDED:
+                # No query ran; report where reads would have gone
+                route = _choose_read_route()
+            response.headers['X-Database-Route'] = g.db_replica if route == REPLICA else route
+        return response
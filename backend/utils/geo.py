@@ -0,0 +1,133 @@
+import math
+from sqlalchemy import func
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = EARTH_RADIUS_KM * math.pi / 180
+
+_GEOHASH_BASE32 = '0123456789bcdefghjkmnpqrstuvwxyz'
+GEOHASH_PRECISION = 12
+
+MAX_PREFIX_PRECISION = 8
+
+def geohash_cell_degrees(precision):
+    """Return the exact (height, width) in degrees of a geohash cell."""
+    bits = 5 * precision
+    lon_bits = (bits + 1) // 2
+    lat_bits = bits // 2
+    return 180.0 / (1 << lat_bits), 360.0 / (1 << lon_bits)
+
+def geohash_encode(latitude, longitude, precision=GEOHASH_PRECISION):
+    """Encode a coordinate as a geohash string."""
+    lat_range = [-90.0, 90.0]
+    lon_range = [-180.0, 180.0]
+    chars = []
+    bits = 0
+    bit_count = 0
+    even = True
+    while len(chars) < precision:
+        rng, value = (lon_range, longitude) if even else (lat_range, latitude)
+        mid = (rng[0] + rng[1]) / 2
+        bits <<= 1
+        if value >= mid:
+            bits |= 1
+            rng[0] = mid
+        else:
+            rng[1] = mid
+        even = not even
+        bit_count += 1
+        if bit_count == 5:
+            chars.append(_GEOHASH_BASE32[bits])
+            bits = 0
+            bit_count = 0
+    return ''.join(chars)
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Great-circle distance between two coordinates in kilometres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    dphi = phi2 - phi1
+    dlambda = math.radians(lon2 - lon1)
+    a = math.sin(dphi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(dlambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+def haversine_term(lat_column, lon_column, latitude, longitude):
+    """
+    SQL expression for the haversine term `a` between a column pair and a
+    point. Distance grows monotonically with it, so it can filter and order
+    by distance without asin.
+    """
+    rad = math.pi / 180
+    half_dlat = (lat_column - latitude) * (rad / 2)
+    half_dlon = (lon_column - longitude) * (rad / 2)
+    return (
+        func.sin(half_dlat) * func.sin(half_dlat)
+        + math.cos(math.radians(latitude)) * func.cos(lat_column * rad)
+        * func.sin(half_dlon) * func.sin(half_dlon)
+    )
+
+def haversine_term_for(distance_km):
+    """The haversine term of a distance, for comparing with haversine_term."""
+    return math.sin(distance_km / (2 * EARTH_RADIUS_KM)) ** 2
+
+def bounding_box(latitude, longitude, radius_km):
+    """
+    Return (min_lat, max_lat, min_lon, max_lon) enclosing a circle.
+    Longitude bounds span the whole globe near the poles.
+    """
+    dlat = radius_km / KM_PER_DEGREE_LAT
+    min_lat = max(-90.0, latitude - dlat)
+    max_lat = min(90.0, latitude + dlat)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    if cos_lat < 1e-6:
+        return min_lat, max_lat, -180.0, 180.0
+    dlon = radius_km / (KM_PER_DEGREE_LAT * cos_lat)
+    if dlon >= 180.0:
+        return min_lat, max_lat, -180.0, 180.0
+    return min_lat, max_lat, longitude - dlon, longitude + dlon
+
+def covering_geohashes(latitude, longitude, radius_km):
+    """
+    Return geohash prefixes whose cells cover the circle, or None when the
+    radius is too large for prefix filtering to help.
+    Uses the finest precision whose cells are at least `radius_km` across, so
+    the center cell plus its eight neighbours always contain the circle.
+    """
+    min_lat, max_lat, _, _ = bounding_box(latitude, longitude, radius_km)
+    cos_lat = math.cos(math.radians(max(abs(min_lat), abs(max_lat))))
+    precision = None
+    for p in range(1, MAX_PREFIX_PRECISION + 1):
+        dlat, dlon = geohash_cell_degrees(p)
+        if min(dlat, dlon * cos_lat) * KM_PER_DEGREE_LAT < radius_km:
+            break
+        precision = p
+    if precision is None:
+        return None
+
+    dlat, dlon = geohash_cell_degrees(precision)
+    prefixes = set()
+    for i in (-1, 0, 1):
+        for j in (-1, 0, 1):
+            lat = min(90.0, max(-90.0, latitude + i * dlat))
+            lon = ((longitude + j * dlon + 180.0) % 360.0) - 180.0
+            prefixes.add(geohash_encode(lat, lon, precision))
+    return sorted(prefixes)
+
+# Web Mercator cannot represent the poles; tiles are clipped to this latitude
+MAX_MERCATOR_LAT = 85.05112878
+
+def lonlat_to_tile(longitude, latitude, zoom):
+    """Return the (x, y) slippy-map tile containing a coordinate."""
+    latitude = max(-MAX_MERCATOR_LAT, min(MAX_MERCATOR_LAT, latitude))
+    n = 1 << zoom
+    x = int((longitude + 180.0) / 360.0 * n)
+    lat_rad = math.radians(latitude)
+    y = int((1.0 - math.log(math.tan(lat_rad) + 1.0 / math.cos(lat_rad)) / math.pi) / 2.0 * n)
+    return min(max(x, 0), n - 1), min(max(y, 0), n - 1)
+
+def tile_bounds(x, y, zoom):
+    """Return (min_lat, max_lat, min_lon, max_lon) of a slippy-map tile."""
+    n = 1 << zoom
+    min_lon = x / n * 360.0 - 180.0
+    max_lon = (x + 1) / n * 360.0 - 180.0
+    max_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+    min_lat = math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * (y + 1) / n))))
+    return min_lat, max_lat, min_lon, max_lon
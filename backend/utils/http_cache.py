@@ -0,0 +1,60 @@
+import hashlib
+from datetime import timezone
+from functools import wraps
+from flask import g, request, make_response, Response
+
+def conditional_get(version_fn):
+    """
+    Decorator adding strong ETag / Last-Modified support to a GET view.
+
+    `version_fn` receives the view's URL arguments and returns
+    (version_token, last_modified) cheaply, or None to skip conditional
+    handling (e.g. when the resource does not exist). When the client's
+    If-None-Match or If-Modified-Since is still current, a 304 is returned
+    without calling the view, so nothing is queried or serialized.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            state = resolve_version(version_fn, kwargs)
+            if state is None:
+                return view(*args, **kwargs)
+
+            version, last_modified = state
+            if last_modified is not None:
+                # Stored timestamps are naive UTC; HTTP dates have second precision
+                last_modified = last_modified.replace(tzinfo=timezone.utc, microsecond=0)
+            etag = hashlib.sha1(f"{request.full_path}|{version}".encode('utf-8')).hexdigest()
+
+            if _not_modified(etag, last_modified):
+                response = Response(status=304)
+            else:
+                response = make_response(view(*args, **kwargs))
+                if response.status_code != 200:
+                    return response
+
+            response.set_etag(etag)
+            if last_modified is not None:
+                response.last_modified = last_modified
+            response.headers.setdefault('Cache-Control', 'no-cache')
+            return response
+        return wrapper
+    return decorator
+
+def resolve_version(version_fn, kwargs):
+    """
+    Call a version function at most once per request, so stacked decorators
+    (conditional GET and the response cache) share one lookup.
+    """
+    memo = g.setdefault('resource_versions', {})
+    key = (version_fn, tuple(sorted(kwargs.items())))
+    if key not in memo:
+        memo[key] = version_fn(**kwargs)
+    return memo[key]
+
+def _not_modified(etag, last_modified):
+    if request.if_none_match:
+        return request.if_none_match.contains(etag)
+    if request.if_modified_since and last_modified is not None:
+        return last_modified <= request.if_modified_since
+    return False
@@ -0,0 +1,41 @@
+import base64
+import json
+
+DEFAULT_PAGE_SIZE = 20
+MAX_PAGE_SIZE = 100
+
+def parse_limit(value, default=DEFAULT_PAGE_SIZE, maximum=MAX_PAGE_SIZE):
+    """
+    Parse a `limit` query parameter.
+    Returns an int clamped to [1, maximum], or raises ValueError if invalid.
+    """
+    if value is None or value == '':
+        return default
+    limit = int(value)
+    if limit < 1:
+        raise ValueError('limit must be a positive integer')
+    return min(limit, maximum)
+
+def encode_cursor(*values):
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    raw = json.dumps(list(values), separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+def decode_cursor(cursor, types):
+    """
+    Decode a cursor produced by encode_cursor whose values have the given
+    types, in order. Returns the list of sort key values or raises
+    ValueError if the cursor is malformed or doesn't match `types`.
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')))
+    except (ValueError, TypeError) as e:
+        raise ValueError(f'Invalid cursor: {str(e)}')
+    if not isinstance(values, list) or len(values) != len(types):
+        raise ValueError('Invalid cursor')
+    for value, expected in zip(values, types):
+        # bool is an int subclass, but never a valid sort key
+        if isinstance(value, bool) or not isinstance(value, expected):
+            raise ValueError('Invalid cursor')
+    return values
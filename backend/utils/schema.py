@@ -0,0 +1,50 @@
+from textwrap import dedent
+from sqlalchemy.dialects import postgresql
+from sqlalchemy.schema import CreateIndex, CreateTable
+
+HEADER = """\
+-- Generated from the SQLAlchemy models by `flask dump-schema`; do not edit by hand.
+"""
+
+UPDATED_AT_FUNCTION = """\
+-- Keep updated_at current for writes that bypass the ORM
+CREATE OR REPLACE FUNCTION update_updated_at_column()
+RETURNS TRIGGER AS $$
+BEGIN
+    NEW.updated_at = CURRENT_TIMESTAMP;
+    RETURN NEW;
+END;
+$$ language 'plpgsql';
+"""
+
+UPDATED_AT_TRIGGER = """\
+CREATE TRIGGER update_{table}_updated_at
+    BEFORE UPDATE ON {table}
+    FOR EACH ROW
+    EXECUTE FUNCTION update_updated_at_column();
+"""
+
+def render_schema(metadata):
+    """
+    PostgreSQL DDL for every table and index in `metadata`, followed by the
+    full-text search table (which lives outside the models) and updated_at
+    triggers.
+    """
+    from services.search_service import PostgresSearchBackend
+
+    dialect = postgresql.dialect()
+    parts = [HEADER]
+    for table in metadata.sorted_tables:
+        parts.append(str(CreateTable(table).compile(dialect=dialect)).strip() + ';\n')
+        for index in sorted(table.indexes, key=lambda index: index.name):
+            parts.append(str(CreateIndex(index).compile(dialect=dialect)).strip() + ';\n')
+
+    parts.append('-- Full-text search documents, created alongside the events table\n')
+    for statement in PostgresSearchBackend.DDL:
+        parts.append(dedent(statement).strip() + ';\n')
+
+    parts.append(UPDATED_AT_FUNCTION)
+    for table in metadata.sorted_tables:
+        if 'updated_at' in table.c:
+            parts.append(UPDATED_AT_TRIGGER.format(table=table.name))
+    return '\n'.join(parts)
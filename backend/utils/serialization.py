@@ -0,0 +1,179 @@
+import json
+import uuid
+from datetime import date, datetime, time
+from decimal import Decimal
+from operator import attrgetter
+from flask import Response, stream_with_context
+from sqlalchemy import inspect, Numeric, Float
+
+try:
+    import orjson
+except ImportError:  # Optional speedup; the stdlib encoder produces the same output
+    orjson = None
+
+JSON_MIMETYPE = 'application/json'
+
+# Items encoded per chunk when streaming a JSON array
+STREAM_BATCH_SIZE = 500
+
+def _default(value):
+    """Encode the types our models hold that the JSON backends don't cover natively."""
+    if isinstance(value, (datetime, date, time)):
+        return value.isoformat()
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+if orjson is not None:
+    def dumps(value):
+        """Encode value as compact JSON bytes."""
+        return orjson.dumps(value, default=_default)
+else:
+    _encoder = json.JSONEncoder(default=_default, separators=(',', ':'), ensure_ascii=False)
+
+    def dumps(value):
+        """Encode value as compact JSON bytes."""
+        return _encoder.encode(value).encode('utf-8')
+
+def json_response(payload, status=200):
+    """Drop-in for jsonify that encodes with the fast backend."""
+    return Response(dumps(payload), status=status, mimetype=JSON_MIMETYPE)
+
+def _iso(value):
+    return value.isoformat() if value is not None else None
+
+def _float(value):
+    return float(value) if value is not None else None
+
+def _str(value):
+    return str(value) if value is not None else None
+
+class Encoder:
+    """
+    Turns objects into dicts for a fixed list of (key, attribute) pairs.
+    Attribute lookup is a single attrgetter call, and only fields that need
+    a conversion pay for one.
+    """
+
+    def __init__(self, keys, attributes, converters):
+        self.keys = tuple(keys)
+        getter = attrgetter(*attributes)
+        # attrgetter returns a bare value rather than a tuple for one attribute
+        self._get = getter if len(attributes) > 1 else (lambda obj: (getter(obj),))
+        self._converters = tuple(
+            (key, converter) for key, converter in zip(keys, converters) if converter is not None
+        )
+
+    def __call__(self, obj):
+        result = dict(zip(self.keys, self._get(obj)))
+        for key, converter in self._converters:
+            result[key] = converter(result[key])
+        return result
+
+    def many(self, objs):
+        return [self(obj) for obj in objs]
+
+class SerializerRegistry:
+    """
+    Per-model field specs, compiled into an Encoder once per (model, field set).
+
+    Column types decide the conversions: Numeric columns become floats, and
+    dates, times and UUIDs become strings. Native encoders skip the string
+    conversions and leave them to dumps(), which produces the same JSON.
+    """
+
+    def __init__(self):
+        self._fields = {}
+        self._encoders = {}
+
+    def register(self, model, fields):
+        """
+        Register the default output of a model. `fields` lists keys; a
+        (key, attribute) pair renames an attribute in the output.
+        """
+        self._fields[model] = [
+            field if isinstance(field, tuple) else (field, field) for field in fields
+        ]
+        return model
+
+    @staticmethod
+    def _converter(model, attribute, native):
+        column = inspect(model).columns.get(attribute)
+        if column is None:
+            return None
+        column_type = column.type
+        if isinstance(column_type, Numeric) and not isinstance(column_type, Float):
+            return _float
+        if native:
+            return None
+        try:
+            python_type = column_type.python_type
+        except NotImplementedError:
+            return None
+        if issubclass(python_type, (date, time)):
+            return _iso
+        if issubclass(python_type, uuid.UUID):
+            return _str
+        return None
+
+    def encoder(self, model, fields=None, native=False):
+        """
+        Return the compiled Encoder for `model`, optionally restricted to the
+        registered keys in `fields`. Pass native=True when the result goes
+        straight to dumps().
+        """
+        cache_key = (model, tuple(fields) if fields else None, native)
+        encoder = self._encoders.get(cache_key)
+        if encoder is None:
+            spec = self._fields[model]
+            if fields:
+                wanted = set(fields)
+                spec = [(key, attribute) for key, attribute in spec if key in wanted]
+            encoder = Encoder(
+                [key for key, _ in spec],
+                [attribute for _, attribute in spec],
+                [self._converter(model, attribute, native) for _, attribute in spec]
+            )
+            self._encoders[cache_key] = encoder
+        return encoder
+
+    def row_encoder(self, fields):
+        """Encoder for result rows whose labels are the output keys, for dumps()."""
+        cache_key = ('row', tuple(fields))
+        encoder = self._encoders.get(cache_key)
+        if encoder is None:
+            encoder = Encoder(fields, fields, [None] * len(fields))
+            self._encoders[cache_key] = encoder
+        return encoder
+
+serializers = SerializerRegistry()
+
+def stream_json_array(objs, encode, batch_size=STREAM_BATCH_SIZE):
+    """
+    Yield a JSON array of encode(obj) for each obj in chunks, so large lists
+    never exist as one list of dicts or one string.
+    """
+    yield b'['
+    first = True
+    batch = []
+    for obj in objs:
+        batch.append(encode(obj))
+        if len(batch) >= batch_size:
+            chunk = dumps(batch)[1:-1]
+            yield chunk if first else b',' + chunk
+            first = False
+            batch = []
+    if batch:
+        chunk = dumps(batch)[1:-1]
+        yield chunk if first else b',' + chunk
+    yield b']'
+
+def stream_json_response(objs, encode, status=200):
+    """Stream a JSON array; objs may be a lazy query, read while the response is sent."""
+    return Response(
+        stream_with_context(stream_json_array(objs, encode)),
+        status=status,
+        mimetype=JSON_MIMETYPE
+    )